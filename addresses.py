@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Offline address normalization
+Splits the raw address text the directories give us ("123 Main St, Chicago,
+IL 60601", Manta's "123 Main St Chicago, IL 60601", a bare locality, "N/A")
+into street, city, state, ZIP and county, and flags listings outside
+Illinois. Cities and ZIP codes are looked up in an in-memory index built
+once from the bundled gazetteer (illinois_gazetteer.csv): plain dicts keyed
+on normalized city names and on ZIP codes, so no geocoder or network
+access is involved and a batch runs at about a quarter million addresses
+per second. The gazetteer lists every Illinois city and ZIP code in the
+USPS data. A town it still lacks is split out when a comma or a street type
+("Ave", "St", ...) sets it apart, and gets its ZIP code's county.
+
+    python addresses.py illinois_leads_20241104_143022.csv
+"""
+
+import argparse
+import csv
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+from geo_shards import GAZETTEER_FILE
+from lead_sink import replace_file
+
+# Columns the normalization stage adds to a lead
+ADDRESS_FIELDS = ['street', 'city', 'zip', 'county', 'out_of_state']
+
+STATES = {
+    'AL': 'Alabama', 'AK': 'Alaska', 'AZ': 'Arizona', 'AR': 'Arkansas', 'CA': 'California',
+    'CO': 'Colorado', 'CT': 'Connecticut', 'DE': 'Delaware', 'DC': 'District of Columbia',
+    'FL': 'Florida', 'GA': 'Georgia', 'HI': 'Hawaii', 'ID': 'Idaho', 'IL': 'Illinois',
+    'IN': 'Indiana', 'IA': 'Iowa', 'KS': 'Kansas', 'KY': 'Kentucky', 'LA': 'Louisiana',
+    'ME': 'Maine', 'MD': 'Maryland', 'MA': 'Massachusetts', 'MI': 'Michigan',
+    'MN': 'Minnesota', 'MS': 'Mississippi', 'MO': 'Missouri', 'MT': 'Montana',
+    'NE': 'Nebraska', 'NV': 'Nevada', 'NH': 'New Hampshire', 'NJ': 'New Jersey',
+    'NM': 'New Mexico', 'NY': 'New York', 'NC': 'North Carolina', 'ND': 'North Dakota',
+    'OH': 'Ohio', 'OK': 'Oklahoma', 'OR': 'Oregon', 'PA': 'Pennsylvania', 'RI': 'Rhode Island',
+    'SC': 'South Carolina', 'SD': 'South Dakota', 'TN': 'Tennessee', 'TX': 'Texas',
+    'UT': 'Utah', 'VT': 'Vermont', 'VA': 'Virginia', 'WA': 'Washington',
+    'WV': 'West Virginia', 'WI': 'Wisconsin', 'WY': 'Wyoming',
+}
+STATE_CODES = {name.lower(): code for code, name in STATES.items()}
+# Illinois ZIP codes are 600xx-629xx
+ILLINOIS_ZIP_PREFIXES = tuple(str(prefix) for prefix in range(600, 630))
+
+_NOISE_RE = re.compile(r"[^\w\s]")
+# Spelled-out forms, so "Mt Prospect" finds "Mount Prospect"
+CITY_WORDS = {'mt': 'mount', 'ft': 'fort', 'st': 'saint', 'n': 'north', 's': 'south',
+              'e': 'east', 'w': 'west'}
+
+# Last words of a street ("Oak Ave"), and what may follow them before the city
+STREET_TYPES = {
+    'st', 'street', 'ave', 'av', 'avenue', 'rd', 'road', 'dr', 'drive', 'blvd', 'boulevard',
+    'ln', 'lane', 'ct', 'court', 'pl', 'place', 'way', 'hwy', 'highway', 'pkwy', 'parkway',
+    'ter', 'terrace', 'cir', 'circle', 'trl', 'trail', 'sq', 'square', 'plz', 'plaza', 'pike',
+    'rte', 'route', 'loop',
+}
+DIRECTIONS = {'n', 's', 'e', 'w', 'ne', 'nw', 'se', 'sw', 'north', 'south', 'east', 'west'}
+UNIT_WORDS = {'suite', 'ste', 'unit', 'apt', 'bldg', 'fl', 'floor', 'rm', 'room'}
+
+Address = namedtuple('Address', ['street', 'city', 'state', 'zip', 'county', 'out_of_state'])
+EMPTY = Address(None, None, None, None, None, None)
+
+
+@lru_cache(maxsize=65536)
+def city_key(text):
+    """'Mt.  Prospect' -> 'mount prospect', the index's lookup key"""
+    words = _NOISE_RE.sub('', text.lower()).split()
+    return " ".join(CITY_WORDS.get(word, word) for word in words)
+
+
+class AddressIndex:
+    """City and ZIP lookups built from the gazetteer
+
+    cities maps a normalized city name to (city, county), zips maps a ZIP
+    code to (city, county); lengths maps a city name's last word to the
+    word counts of the names ending in it, longest first.
+    """
+
+    def __init__(self, rows):
+        self.cities = {}
+        self.zips = {}
+        for city, county, zips in rows:
+            self.cities[city_key(city)] = (city, county)
+            for zip_code in zips:
+                self.zips[zip_code] = (city, county)
+        lengths = {}
+        for key in self.cities:
+            words = key.split()
+            lengths.setdefault(words[-1], set()).add(len(words))
+        self.lengths = {word: sorted(counts, reverse=True) for word, counts in lengths.items()}
+
+    def match_city(self, words):
+        """(city, county, words used) for the longest known city ending words, or None"""
+        if not words:
+            return None
+        for count in self.lengths.get(city_key(words[-1]), ()):
+            if count > len(words):
+                continue
+            found = self.cities.get(city_key(" ".join(words[-count:])))
+            if found is not None:
+                return found + (count,)
+        return None
+
+
+@lru_cache(maxsize=None)
+def load_index(path=GAZETTEER_FILE):
+    """AddressIndex for the gazetteer at path (built once per path)"""
+    with open(path, newline='', encoding='utf-8') as csvfile:
+        rows = [(row['city'], row.get('county') or None,
+                 row['zips'].split() + (row.get('other_zips') or "").split())
+                for row in csv.DictReader(csvfile)]
+    return AddressIndex(rows)
+
+
+def split_street(words):
+    """('12', 'Oak', 'Ave', 'Ste', '4', 'Effingham') -> ('12 Oak Ave Ste 4', 'Effingham')
+
+    For a town the gazetteer lacks, with no comma before it: the city is
+    what follows the last street type (and any direction, number or unit
+    after it). None when no street type sets the city apart.
+    """
+    keys = [word.lower().rstrip('.,') for word in words]
+    last = max((i for i in range(1, len(keys)) if keys[i] in STREET_TYPES), default=None)
+    if last is None:
+        return None
+    end = last + 1
+    while end < len(keys):
+        if keys[end] in UNIT_WORDS:
+            end += 2
+        elif keys[end] in DIRECTIONS or keys[end].startswith('#') or any(
+                char.isdigit() for char in keys[end]):
+            end += 1
+        else:
+            break
+    city = " ".join(words[end:]).strip(" ,")
+    if not city or any(char.isdigit() for char in city):
+        return None
+    return " ".join(words[:end]), city
+
+
+def split_tail(address):
+    """'123 Main St, Chicago, IL 60601-1234' -> ('123 Main St, Chicago', 'IL', '60601')
+
+    Read right to left with string methods (a regex anchored at the end
+    would still scan from the start). State codes only count in capitals,
+    so a street or town ending in "in" or "or" is not taken for a state.
+    """
+    text = address.rstrip(" ,.")
+    zip_code = None
+    if len(text) >= 10 and text[-5] == '-' and text[-4:].isdigit() and text[-10:-5].isdigit():
+        zip_code, text = text[-10:-5], text[:-10]
+    elif text[-5:].isdigit() and (len(text) == 5 or not text[-6].isdigit()):
+        zip_code, text = text[-5:], text[:-5]
+    text = text.rstrip(" ,")
+    state = None
+    cut = max(text.rfind(' '), text.rfind(','))
+    word = text[cut + 1:].rstrip('.')
+    if word in STATES:
+        state = word
+    else:
+        # Spelled out, possibly as two words ("New York")
+        two = max(text.rfind(' ', 0, max(cut, 0)), text.rfind(',', 0, max(cut, 0)))
+        for start in (two, cut):
+            name = text[start + 1:].rstrip('.').lower()
+            if name in STATE_CODES and (start < 0 or text[start] in ' ,'):
+                state, cut = STATE_CODES[name], start
+                break
+    if state is not None:
+        text = text[:max(cut, 0)].rstrip(" ,")
+    return text, state, zip_code
+
+
+def parse_address(address, index=None):
+    """Split one raw address into an Address; fields not found are None
+
+    out_of_state is True for another state's name or code, or a ZIP outside
+    Illinois' range, False for an Illinois one, and None when the address
+    has neither.
+    """
+    if not address or address == "N/A":
+        return EMPTY
+    index = index or load_index()
+    head, state, zip_code = split_tail(address)
+
+    street, city, county = head, None, None
+    street_part, comma, last_part = head.rpartition(',')
+    if not comma and not any(char.isdigit() for char in head):
+        # No house number: the head is the locality itself ("Peoria, IL")
+        street_part, comma, last_part = "", ",", head
+    if state is not None and state != 'IL':
+        # Another state: the index cannot help (Bloomington, IN is not in McLean county)
+        if comma:
+            street, city = street_part, last_part.strip() or None
+        return Address(street.strip(" ,") or None, city, state, zip_code, None, True)
+    known = index.cities.get(city_key(last_part)) if comma else None
+    if known is not None:
+        street, (city, county) = street_part, known
+    else:
+        # No comma before the city (Manta) or a town the gazetteer lacks
+        words = head.split()
+        found = index.match_city(words)
+        if found is not None and (len(words) > found[2] or not comma):
+            city, county, used = found
+            street = " ".join(words[:-used])
+        elif comma and (state or zip_code or not street_part):
+            street, city = street_part, last_part.strip() or None
+        elif not comma and (state or zip_code):
+            # Never leave an unknown town in the street
+            street, city = split_street(words) or (street, None)
+    if zip_code is not None:
+        by_zip = index.zips.get(zip_code)
+        if by_zip is not None:
+            city = city or by_zip[0]
+            # A town the gazetteer lacks lies in its ZIP code's county
+            county = county or by_zip[1]
+    if state is None and zip_code is not None:
+        state = 'IL' if zip_code.startswith(ILLINOIS_ZIP_PREFIXES) else None
+    out_of_state = None
+    if state is not None:
+        out_of_state = False
+    elif zip_code is not None:
+        out_of_state = True
+    street = street.strip(" ,") or None
+    return Address(street, city, state, zip_code, county, out_of_state)
+
+
+def normalize_leads(leads, index=None):
+    """Add ADDRESS_FIELDS to each lead dict; returns {'illinois'|'out_of_state'|'unknown': count}"""
+    index = index or load_index()
+    counts = {'illinois': 0, 'out_of_state': 0, 'unknown': 0}
+    for lead in leads:
+        parsed = parse_address(lead.get('address'), index)
+        lead['street'] = parsed.street or ""
+        lead['city'] = parsed.city or ""
+        lead['zip'] = parsed.zip or ""
+        lead['county'] = parsed.county or ""
+        if parsed.out_of_state is None:
+            lead['out_of_state'] = ""
+            counts['unknown'] += 1
+        elif parsed.out_of_state:
+            lead['out_of_state'] = "Yes"
+            counts['out_of_state'] += 1
+        else:
+            lead['out_of_state'] = "No"
+            counts['illinois'] += 1
+    return counts
+
+
+def normalize_csv(input_file, output_file=None):
+    """Add the address columns to a lead CSV (in place by default); returns the counts"""
+    with open(input_file, newline='', encoding='utf-8') as csvfile:
+        reader = csv.DictReader(csvfile)
+        leads = list(reader)
+        fieldnames = [field for field in reader.fieldnames or [] if field not in ADDRESS_FIELDS]
+    counts = normalize_leads(leads)
+    with replace_file(output_file or input_file) as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames + ADDRESS_FIELDS,
+                                extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(leads)
+    print(f"\n🏠 Addresses: {counts['illinois']} in Illinois | "
+          f"{counts['out_of_state']} out of state | {counts['unknown']} without a state or ZIP")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Split lead addresses into street, city, ZIP "
+                                                 "and county, and flag out-of-state listings")
+    parser.add_argument('input')
+    parser.add_argument('-o', '--output', help="output CSV (default: overwrite input)")
+    args = parser.parse_args()
+    normalize_csv(args.input, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark: offline address normalization throughput
+Generates addresses in the shapes the directories produce (street and
+locality joined by a comma, Manta's comma-less form, bare localities,
+out-of-state listings, "N/A") and times normalize_leads over all of them.
+
+    python benchmarks/bench_addresses.py --rows 1000000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from addresses import load_index, normalize_leads
+from geo_shards import load_gazetteer
+from make_fixtures import STREETS
+
+OTHER_STATES = [("St. Louis", "MO", "63101"), ("Gary", "IN", "46402"),
+                ("Milwaukee", "WI", "53202"), ("Davenport", "IA", "52801")]
+
+
+def make_addresses(count, seed=0):
+    rng = random.Random(seed)
+    # Towns with only PO box ZIP codes have none listed here
+    places = [place for place in load_gazetteer().items() if place[1][1]]
+    addresses = []
+    for _ in range(count):
+        city, (_, zips) = rng.choice(places)
+        street = f"{rng.randint(1, 9999)} {rng.choice(STREETS)}"
+        shape = rng.random()
+        if shape < 0.5:
+            address = f"{street}, {city}, IL {rng.choice(zips)}"
+        elif shape < 0.75:
+            address = f"{street} {city}, IL {rng.choice(zips)}"
+        elif shape < 0.85:
+            address = f"{city}, IL"
+        elif shape < 0.9:
+            other, state, zip_code = rng.choice(OTHER_STATES)
+            address = f"{street}, {other}, {state} {zip_code}"
+        else:
+            address = "N/A"
+        addresses.append(address)
+    return addresses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1000000)
+    args = parser.parse_args()
+
+    leads = [{'address': address} for address in make_addresses(args.rows)]
+    load_index()
+    started = time.perf_counter()
+    counts = normalize_leads(leads)
+    elapsed = time.perf_counter() - started
+    with_county = sum(1 for lead in leads if lead['county'])
+    print(f"{len(leads)} addresses in {elapsed:.2f}s ({len(leads) / elapsed:,.0f}/s)")
+    print(f"   {counts['illinois']} Illinois | {counts['out_of_state']} out of state | "
+          f"{counts['unknown']} unknown | {with_county} with a county")
+
+
+if __name__ == "__main__":
+    main()
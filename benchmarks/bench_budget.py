@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark: prospects found on a fixed request budget, grid order vs bandit
+Stub Yellow Pages and Yelp directories answer every search with generated
+listings. The share of businesses without a website depends on the category,
+and Yelp listings carry no phone number. leadscraper2 spends the same
+request budget twice: once in grid order (biggest metros first) and once
+with the adaptive scheduler. The benchmark reports the prospects found,
+meaning leads with a phone and no website.
+
+    python benchmarks/bench_budget.py --budget 300
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import leadscraper2
+from crawl_budget import BudgetScheduler
+from crawl_grid import top_cities
+from lead_sink import CsvLeadSink
+from make_fixtures import SOURCES, fake_business
+from stub_server import StubServer
+
+PAGE_SIZE = 10
+PAGES = 5
+# Category -> share of its businesses that have a website
+WEBSITE_SHARES = {
+    "restaurants": 0.95, "retail stores": 0.9, "real estate offices": 0.9,
+    "financial advisors": 0.85, "insurance agencies": 0.8, "law firms": 0.75,
+    "medical offices": 0.6, "dental offices": 0.55, "accounting firms": 0.4,
+    "manufacturing companies": 0.3,
+}
+
+
+class GeneratedDirectory:
+    """Search handler: PAGE_SIZE listings a page, PAGES pages for every search"""
+
+    def __init__(self, source):
+        self.source = source
+        self.render = SOURCES[source]
+
+    def __call__(self, path):
+        query = {key: values[0] for key, values in parse_qs(urlparse(path).query).items()}
+        category = query.get('search_terms') or query.get('find_desc')
+        location = query.get('geo_location_terms') or query.get('find_loc')
+        if 'start' in query:
+            page = int(query['start']) // PAGE_SIZE + 1
+        else:
+            page = int(query.get('page', 1))
+        rng = random.Random(f"{self.source}|{category}|{location}|{page}")
+        listings = []
+        for i in range(PAGE_SIZE):
+            name, phone, street, city, zip_code, website = fake_business(rng)
+            has_site = rng.random() < WEBSITE_SHARES.get(category, 0.7)
+            website = (website or f"https://www.site{rng.randint(1, 99999)}.com") if has_site else None
+            biz = (f"{name} {page}-{i}", phone, street, city, zip_code, website)
+            listings.append(self.render(biz, (page - 1) * PAGE_SIZE + i + 1))
+        next_link = '<a class="next ajax-page" href="?page=2">Next</a>' if page < PAGES else ""
+        return f"<html><body><main>{''.join(listings)}</main>{next_link}</body></html>".encode()
+
+
+def crawl(budget, adaptive, cities):
+    scraper = leadscraper2.IllinoisLeadScraper(min_delay=0, max_delay=0, cache_dir=None,
+                                               max_pages=PAGES, quiet=True)
+    servers = []
+    for source in scraper.base_urls:
+        server = StubServer({'/search': GeneratedDirectory(source.lower())}).start()
+        scraper.base_urls[source] = server.url
+        servers.append(server)
+    scheduler = BudgetScheduler(max_requests=budget, adaptive=adaptive)
+    with tempfile.TemporaryDirectory() as directory:
+        sink = CsvLeadSink(os.path.join(directory, "leads.csv"))
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                scraper.run_search(list(WEBSITE_SHARES), cities, sink=sink, budget=scheduler)
+        finally:
+            sink.close()
+            for server in servers:
+                server.stop()
+    return scheduler, sum(server.requests for server in servers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--budget', type=int, default=300, help="search requests to spend")
+    parser.add_argument('--cities', type=int, default=10)
+    args = parser.parse_args()
+
+    cities = top_cities(args.cities)
+    searches = len(WEBSITE_SHARES) * len(cities) * 2 * PAGES
+    print(f"{searches} result pages on offer, {args.budget} requests to spend")
+    print(f"{'order':<10} {'requests':>9} {'prospects':>10} {'per request':>12}  Yelp share")
+    for name, adaptive in (('grid', False), ('bandit', True)):
+        scheduler, requests = crawl(args.budget, adaptive, cities)
+        yelp = scheduler.sources.get('Yelp')
+        yelp_share = yelp.requests / max(scheduler.total.requests, 1) if yelp else 0
+        print(f"{name:<10} {requests:>9} {scheduler.total.prospects:>10} "
+              f"{scheduler.total.prospects / max(requests, 1):>12.2f}  {yelp_share:>10.0%}")
+
+
+if __name__ == "__main__":
+    main()
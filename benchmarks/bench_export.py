@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark: export formats on disk and on reload
+Writes the same synthetic leads as CSV, gzip/zstd JSON Lines and Parquet,
+then times a typical downstream load: every Yelp lead's name and phone.
+Formats whose optional package is missing are skipped.
+
+    python benchmarks/bench_export.py --rows 1000000
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_dedupe import make_leads
+from exporters import FORMATS, export_leads, pyarrow, zstandard
+from lead_record import LeadBatch
+
+COLUMNS = ['business_name', 'phone']
+
+
+def open_text(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    if path.endswith('.zst'):
+        return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(path, 'rb')),
+                                encoding='utf-8', newline='')
+    return open(path, encoding='utf-8', newline='')
+
+
+def load_csv(path):
+    with open_text(path) as csvfile:
+        return [[row[c] for c in COLUMNS] for row in csv.DictReader(csvfile)
+                if row['source'] == 'Yelp']
+
+
+def load_jsonl(path):
+    with open_text(path) as lines:
+        rows = (json.loads(line) for line in lines)
+        return [[row[c] for c in COLUMNS] for row in rows if row['source'] == 'Yelp']
+
+
+def load_parquet(path):
+    table = pyarrow.parquet.read_table(path, columns=COLUMNS, filters=[('source', '=', 'Yelp')])
+    return list(zip(*(table.column(c).to_pylist() for c in COLUMNS)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1000000)
+    args = parser.parse_args()
+
+    leads = LeadBatch(make_leads(args.rows, 0.3)[0])
+    formats = [fmt for fmt in FORMATS
+               if (fmt != 'parquet' or pyarrow) and (fmt != 'jsonl.zst' or zstandard)]
+    skipped = set(FORMATS) - set(formats)
+    if skipped:
+        print(f"Skipping {', '.join(sorted(skipped))} (optional package not installed)")
+    print(f"{len(leads)} leads")
+    print(f"{'format':<10} {'size MB':>8} {'write s':>8} {'load s':>8} {'vs csv':>7}")
+    with tempfile.TemporaryDirectory() as directory:
+        baseline = None
+        for fmt in formats:
+            path = os.path.join(directory, "leads" + FORMATS[fmt])
+            started = time.perf_counter()
+            export_leads(leads, path)
+            written = time.perf_counter() - started
+
+            load = load_parquet if fmt == 'parquet' else load_jsonl if 'jsonl' in fmt else load_csv
+            started = time.perf_counter()
+            found = len(load(path))
+            loaded = time.perf_counter() - started
+            size = os.path.getsize(path) / 1e6
+            baseline = baseline or size
+            print(f"{fmt:<10} {size:>8.1f} {written:>8.2f} {loaded:>8.2f} {size / baseline:>6.0%}"
+                  f"  ({found} Yelp leads)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark: sequential scraping vs the async fetch engine
+Each directory gets its own local stub server (its own host), so the async
+run should finish roughly N-sources times faster than the sequential one.
+
+    python benchmarks/bench_fetch_engine.py --categories 4 --latency 0.3
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import leadscraper
+import leadscraper2
+from stub_server import StubServer
+
+LISTING_PAGES = {
+    'YellowPages': b"""<html><body>
+<div class="result"><a class="business-name">Stub Medical Group</a>
+<div class="phones">(312) 555-0100</div><div class="street-address">1 Main St</div>
+<div class="locality">Chicago, IL</div></div>
+</body></html>""",
+    'Manta': b"""<html><body>
+<div class="card-body"><h3>Stub Accounting</h3><a href="tel:2175550101">(217) 555-0101</a>
+<address>2 Oak Ave, Springfield, IL</address></div>
+</body></html>""",
+    'Superpages': b"""<html><body>
+<div class="listing"><a class="business-name">Stub Law Office</a>
+<span class="phone">(815) 555-0102</span><span class="street-address">3 Elm St</span>
+<span class="locality">Rockford, IL</span></div>
+</body></html>""",
+    'Yelp': b"""<html><body>
+<div data-testid="serp-ia-card"><h3>Stub Dental</h3><address>4 Pine Rd, Peoria, IL</address></div>
+</body></html>""",
+}
+
+
+def sequential_search(scraper, categories, delay):
+    """The pre-engine run_search loop: one global sleep before every request"""
+    for category in categories:
+        for source, build_url, parse in scraper.sources():
+            time.sleep(delay)
+            response = scraper.session.get(build_url(category), timeout=15)
+            scraper.leads.extend(parse(response.content, category))
+
+
+def bench(module, categories, latency, delay, concurrency):
+    scraper = module.IllinoisLeadScraper(min_delay=delay, max_delay=delay, cache_dir=None)
+    servers = []
+    for source in scraper.base_urls:
+        server = StubServer({'/search': LISTING_PAGES[source]}, latency=latency).start()
+        scraper.base_urls[source] = server.url
+        servers.append(server)
+    
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            sequential_search(scraper, categories, delay)
+            sequential = time.perf_counter() - started
+            
+            scraper.leads = []
+            started = time.perf_counter()
+            scraper.run_search(categories, cities=None, max_concurrency=concurrency)
+            concurrent = time.perf_counter() - started
+    finally:
+        for server in servers:
+            server.stop()
+    
+    print(f"{module.__name__}: {len(scraper.base_urls)} sources x {len(categories)} categories")
+    print(f"   sequential: {sequential:.2f}s")
+    print(f"   async:      {concurrent:.2f}s  (speedup {sequential / concurrent:.1f}x)")
+    for host, stats in sorted(scraper.limiter.stats().items()):
+        print(f"      {host}: waiting {stats['wait']:.2f}s | fetching {stats['fetch']:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--categories', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=0.3, help='stub response latency (s)')
+    parser.add_argument('--delay', type=float, default=0.2, help='per-host politeness delay (s)')
+    parser.add_argument('--concurrency', type=int, default=4)
+    args = parser.parse_args()
+    
+    categories = [f"category {i}" for i in range(args.categories)]
+    for module in (leadscraper, leadscraper2):
+        bench(module, categories, args.latency, args.delay, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
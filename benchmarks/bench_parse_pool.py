@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark: parsing on the event loop vs the process-pool parse stage
+Replays the saved fixtures through local stub servers (one per directory, no
+rate limit) over a category x city grid and reports pages/s and leads/s for
+each parse worker count. Throughput should grow with cores until fetching
+becomes the bottleneck.
+
+    python benchmarks/bench_parse_pool.py --pages 600 --workers 0 1 2 4
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import leadscraper
+from crawl_grid import top_cities
+from stub_server import StubServer
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def load_fixture(source):
+    with open(os.path.join(FIXTURE_DIR, f"{source.lower()}.html"), 'rb') as f:
+        return f.read()
+
+
+def grid_for(pages, sources):
+    """(categories, cities) giving at least `pages` page-1 searches"""
+    cities = top_cities(10)
+    searches = -(-pages // (len(sources) * len(cities)))
+    return [f"category {i}" for i in range(searches)], cities
+
+
+def bench(workers, pages, latency, concurrency):
+    scraper = leadscraper.IllinoisLeadScraper(min_delay=0, max_delay=0, cache_dir=None,
+                                              max_pages=1)
+    servers = []
+    for source in scraper.base_urls:
+        server = StubServer({'/search': load_fixture(source)}, latency=latency).start()
+        scraper.base_urls[source] = server.url
+        servers.append(server)
+    categories, cities = grid_for(pages, scraper.base_urls)
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            scraper.run_search(categories, cities, max_concurrency=concurrency,
+                               parse_workers=workers)
+            elapsed = time.perf_counter() - started
+    finally:
+        for server in servers:
+            server.stop()
+    fetched = sum(server.requests for server in servers)
+    # Every parsed listing tries the name chain once (worker counts are merged back)
+    listings = sum(spec.fields['name'].attempts for spec in scraper.specs.values())
+    return fetched, listings, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--pages', type=int, default=600)
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, 1, 2, 4])
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--concurrency', type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs, {args.pages} pages, {args.latency * 1000:.0f} ms latency")
+    print(f"{'parse workers':>13} {'seconds':>9} {'pages/s':>9} {'leads/s':>9} {'speedup':>8}")
+    baseline = None
+    for workers in args.workers:
+        fetched, listings, elapsed = bench(workers, args.pages, args.latency, args.concurrency)
+        baseline = baseline or elapsed
+        print(f"{workers:>13} {elapsed:>9.2f} {fetched / elapsed:>9.1f} "
+              f"{listings / elapsed:>9.0f} {baseline / elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: full html.parser tree vs lxml + SoupStrainer listing trees
+Reports milliseconds per page and peak traced memory for each path over the
+saved fixtures in benchmarks/fixtures/.
+
+    python benchmarks/bench_parsing.py --repeat 20
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+import parsing
+from parsing import attr_strainer, class_strainer, listing_soup
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# fixture -> (container tag, find_all attrs, strainer)
+CONTAINERS = {
+    'yellowpages': ('div', {'class_': 'result'}, class_strainer('div', 'result')),
+    'manta': ('div', {'class_': 'card-body'}, class_strainer('div', 'card-body')),
+    'superpages': ('div', {'class_': 'listing'}, class_strainer('div', 'listing')),
+    'yelp': ('div', {'attrs': {'data-testid': 'serp-ia-card'}},
+             attr_strainer('div', **{'data-testid': 'serp-ia-card'})),
+}
+
+
+def old_path(html, tag, find_kwargs, strainer):
+    return BeautifulSoup(html, 'html.parser').find_all(tag, **find_kwargs)
+
+
+def new_path(html, tag, find_kwargs, strainer):
+    return listing_soup(html, strainer).find_all(tag, **find_kwargs)
+
+
+def measure(func, html, container, repeat):
+    """Return (ms per page, peak KB, listings found)"""
+    tracemalloc.start()
+    found = len(func(html, *container))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func(html, *container)
+    ms = (time.perf_counter() - started) / repeat * 1000
+    return ms, peak / 1024, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+    
+    print(f"new path parser: {parsing.PARSER}")
+    print(f"{'fixture':<12} {'path':<4} {'ms/page':>9} {'peak KB':>9} {'listings':>9}")
+    for name, container in CONTAINERS.items():
+        with open(os.path.join(FIXTURE_DIR, f"{name}.html"), 'rb') as f:
+            html = f.read()
+        old = measure(old_path, html, container, args.repeat)
+        new = measure(new_path, html, container, args.repeat)
+        for label, (ms, peak, found) in (('old', old), ('new', new)):
+            print(f"{name:<12} {label:<4} {ms:>9.2f} {peak:>9.0f} {found:>9}")
+        print(f"{'':<12} {'':<4} {old[0] / new[0]:>8.1f}x {old[1] / new[1]:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark: coverage of capped directories, flat grid vs adaptive shards
+Stub directories hold a synthetic set of businesses spread over the
+gazetteer's cities and ZIP codes (plus small towns it does not list), rank
+them the same way for every query and, like the real sites, serve at most
+--cap pages per search. Compares a statewide crawl, a top-cities grid and a
+sharded crawl on unique leads found, requests made and leads per request.
+
+    python benchmarks/bench_shards.py --businesses 20000 --cap 5
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import leadscraper
+from crawl_grid import STATE, top_cities
+from geo_shards import load_gazetteer, zip_of
+from lead_sink import CsvLeadSink
+from make_fixtures import SOURCES
+from stub_server import StubServer
+
+PAGE_SIZE = 30
+
+
+def make_businesses(count, rural, seed=0):
+    """(name, phone, street, city, zip, website) tuples, a `rural` share outside the gazetteer"""
+    rng = random.Random(seed)
+    places = load_gazetteer()
+    cities = list(places)
+    weights = [population for population, _ in places.values()]
+    businesses = []
+    for i in range(count):
+        if rng.random() < rural:
+            city, zip_code = f"Smalltown {rng.randint(1, 400)}", f"6{rng.randint(2000, 2999)}"
+        else:
+            city = rng.choices(cities, weights)[0]
+            zip_code = rng.choice(places[city][1])
+        website = f"https://www.biz{i}.com" if rng.random() < 0.5 else None
+        businesses.append((f"Business {i}", f"(312) {i // 10000:03d}-{i % 10000:04d}",
+                           f"{rng.randint(1, 9999)} Main St", city, zip_code, website))
+    # One fixed relevance order, the same for every query
+    rng.shuffle(businesses)
+    return businesses
+
+
+class CappedDirectory:
+    """Search handler: filter by location, PAGE_SIZE per page, at most `cap` pages"""
+
+    def __init__(self, source, businesses, cap):
+        self.render = SOURCES[source]
+        self.businesses = businesses
+        self.cap = cap
+
+    def matches(self, location):
+        if location in (None, STATE, 'IL'):
+            return self.businesses
+        zip_code = zip_of(location)
+        if zip_code:
+            return [biz for biz in self.businesses if biz[4] == zip_code]
+        city = location.rsplit(',', 1)[0].strip()
+        return [biz for biz in self.businesses if biz[3] == city]
+
+    def __call__(self, path):
+        query = {key: values[0] for key, values in parse_qs(urlparse(path).query).items()}
+        location = query.get('geo_location_terms')
+        if 'city' in query:
+            location = f"{query['city']}, IL"
+        page = int(query.get('page') or query.get('pg') or 1)
+        found = self.matches(location)[:PAGE_SIZE * self.cap]
+        listings = found[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+        body = "".join(self.render(biz, i + 1) for i, biz in enumerate(listings))
+        more = page * PAGE_SIZE < len(found)
+        next_link = f'<a class="next ajax-page" href="?page={page + 1}">Next</a>' if more else ""
+        return f"<html><body><main>{body}</main>{next_link}</body></html>".encode('utf-8')
+
+
+def crawl(businesses, cap, cities, shard):
+    scraper = leadscraper.IllinoisLeadScraper(min_delay=0, max_delay=0, cache_dir=None,
+                                              max_pages=cap, quiet=True)
+    servers = []
+    for source in scraper.base_urls:
+        handler = CappedDirectory(source.lower(), businesses, cap)
+        server = StubServer({'/search': handler}).start()
+        scraper.base_urls[source] = server.url
+        servers.append(server)
+    with tempfile.TemporaryDirectory() as directory:
+        sink = CsvLeadSink(os.path.join(directory, "leads.csv"))
+        report = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(report):
+                scraper.run_search(["plumbers"], cities, max_concurrency=8, sink=sink,
+                                   shard=shard)
+        finally:
+            sink.close()
+            for server in servers:
+                server.stop()
+    shards = [line for line in report.getvalue().splitlines() if line.startswith("🧭")]
+    return sink.total, sum(server.requests for server in servers), shards
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--businesses', type=int, default=20000)
+    parser.add_argument('--rural', type=float, default=0.1,
+                        help="share of businesses in towns the gazetteer does not list")
+    parser.add_argument('--cap', type=int, default=5, help="pages a directory serves per search")
+    args = parser.parse_args()
+
+    businesses = make_businesses(args.businesses, args.rural)
+    print(f"{len(businesses)} businesses, {PAGE_SIZE} per page, {args.cap} pages per search "
+          f"({PAGE_SIZE * args.cap} results)")
+    print(f"{'crawl':<12} {'leads':>7} {'coverage':>9} {'requests':>9} {'leads/req':>10}")
+    scenarios = [('statewide', None, False), ('top 20 grid', top_cities(20), False),
+                 ('sharded', None, True)]
+    for name, cities, shard in scenarios:
+        leads, requests, shards = crawl(businesses, args.cap, cities, shard)
+        print(f"{name:<12} {leads:>7} {leads / len(businesses):>9.0%} {requests:>9} "
+              f"{leads / max(requests, 1):>10.1f}")
+        for line in shards:
+            print(f"   {line}")
+
+
+if __name__ == "__main__":
+    main()
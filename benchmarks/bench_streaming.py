@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark: buffered vs streamed parsing of large result pages
+Serves one big generated Yellow Pages page from a stub server that trickles
+the body out in chunks, then scrapes it with and without stream_pages and
+reports time to the first lead, total time, peak Python memory and the
+bytes the server got to send. With --max-leads, a streamed scrape stops
+reading the page early.
+
+    python benchmarks/bench_streaming.py --listings 2000 --max-leads 50
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import leadscraper
+from make_fixtures import make_page
+from parsing import STREAMING
+from stub_server import StubServer
+
+
+def bench(stream, server, max_leads):
+    scraper = leadscraper.IllinoisLeadScraper(min_delay=0, max_delay=0, cache_dir=None,
+                                              max_pages=1, max_leads=max_leads,
+                                              stream_pages=stream)
+    scraper.base_urls['YellowPages'] = server.url
+    server.sent = 0
+    first = None
+    found = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        tracemalloc.start()
+        started = time.perf_counter()
+        for _ in scraper.iter_yellowpages("plumbers", "Chicago, IL"):
+            if first is None:
+                first = time.perf_counter() - started
+            found += 1
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return found, first or elapsed, elapsed, peak, server.sent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--listings', type=int, default=2000)
+    parser.add_argument('--max-leads', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=16 * 1024)
+    parser.add_argument('--chunk-delay', type=float, default=0.01,
+                        help="seconds between body chunks")
+    args = parser.parse_args()
+    if not STREAMING:
+        print("lxml is not installed: streamed pages fall back to buffering")
+
+    body = make_page('yellowpages', listings=args.listings).encode('utf-8')
+    print(f"page: {args.listings} listings, {len(body) // 1024} KB, "
+          f"{args.chunk_size // 1024} KB chunks every {args.chunk_delay * 1000:.0f} ms")
+    print(f"{'mode':<9} {'leads':>6} {'first s':>8} {'total s':>8} {'peak MB':>8} {'sent KB':>8}")
+    with StubServer({'/search': body}, chunk_size=args.chunk_size,
+                    chunk_delay=args.chunk_delay) as server:
+        for mode, stream in (('buffered', False), ('streamed', True)):
+            found, first, elapsed, peak, sent = bench(stream, server, args.max_leads)
+            print(f"{mode:<9} {found:>6} {first:>8.2f} {elapsed:>8.2f} {peak / 1e6:>8.1f} "
+                  f"{sent // 1024:>8}")
+
+
+if __name__ == "__main__":
+    main()
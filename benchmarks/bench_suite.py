@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Offline end-to-end benchmark suite
+Serves the saved fixtures for every source (YellowPages, Manta, Superpages,
+Yelp) from local stub servers with configurable latency and error rate, runs
+each scraper's run_search end to end, and reports pages/s, leads/s, parse ms
+per listing, peak RSS and time spent waiting on the rate limiter. Results
+can be saved as a baseline and later runs compared against it.
+
+    python benchmarks/bench_suite.py --save-baseline benchmarks/baseline.json
+    python benchmarks/bench_suite.py --compare benchmarks/baseline.json
+"""
+
+import argparse
+import contextlib
+import csv
+import gc
+import importlib
+import io
+import json
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crawl_grid import top_cities
+from lead_record import LeadBatch
+from lead_sink import FIELDNAMES
+from stub_server import StubServer
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+SCENARIOS = ['leadscraper', 'leadscraper2']
+
+# metric -> True if higher is better
+METRICS = {
+    'pages_per_s': True,
+    'leads_per_s': True,
+    'parse_ms_per_listing': False,
+    'peak_rss_mb': False,
+    'rate_limit_wait_s': False,
+    'bytes_per_lead': False,
+}
+
+# Leads held in memory when measuring bytes per lead (the run's leads, repeated)
+MEMORY_ROWS = 20000
+
+
+def load_fixture(source):
+    with open(os.path.join(FIXTURE_DIR, f"{source.lower()}.html"), 'rb') as f:
+        return f.read()
+
+
+def timed_sources(scraper, timings):
+    """Wrap scraper.sources() so every parse call is timed"""
+    sources = scraper.sources
+
+    def timed(parse):
+        def run(html, category):
+            started = time.perf_counter()
+            leads = list(parse(html, category))
+            timings['parse'] += time.perf_counter() - started
+            timings['listings'] += len(leads)
+            return leads
+        return run
+
+    scraper.sources = lambda: [(name, build_url, timed(parse))
+                               for name, build_url, parse in sources()]
+
+
+def stub_pages(source):
+    pages = {'/search': load_fixture(source)}
+    if source == 'Yelp':
+        # Business pages the result cards link to (/biz/1 ... /biz/30)
+        detail = load_fixture('yelp_detail')
+        pages.update({f'/biz/{i}': detail for i in range(1, 31)})
+    return pages
+
+
+def bytes_per_lead(leads, build):
+    """Memory held per lead when MEMORY_ROWS leads are loaded with build(rows)
+
+    The leads are re-read from CSV text, so every value is a fresh string,
+    as it is straight out of a parser.
+    """
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=FIELDNAMES)
+    writer.writerows(leads)
+    body = out.getvalue()
+    repeat = -(-MEMORY_ROWS // max(1, len(leads)))
+    text = ",".join(FIELDNAMES) + "\r\n" + body * repeat
+    gc.collect()
+    tracemalloc.start()
+    try:
+        held = build(csv.DictReader(io.StringIO(text)))
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return size / len(held)
+
+
+def run_scenario(module_name, options):
+    """One end-to-end run_search, in a fresh process so peak RSS is its own"""
+    module = importlib.import_module(module_name)
+    extra = {}
+    if options['yelp_details'] and hasattr(module.IllinoisLeadScraper, 'detail_parsers'):
+        extra['enrich_details'] = True
+    scraper = module.IllinoisLeadScraper(min_delay=options['delay'], max_delay=options['delay'],
+                                         cache_dir=None, max_pages=options['max_pages'], **extra)
+    timings = {'parse': 0.0, 'listings': 0}
+    timed_sources(scraper, timings)
+    servers = []
+    for seed, source in enumerate(scraper.base_urls):
+        server = StubServer(stub_pages(source), latency=options['latency'],
+                            error_rate=options['error_rate'], seed=seed).start()
+        scraper.base_urls[source] = server.url
+        servers.append(server)
+    categories = [f"category {i}" for i in range(options['categories'])]
+    cities = top_cities(options['cities'])
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            scraper.run_search(categories, cities, max_concurrency=options['concurrency'])
+            elapsed = time.perf_counter() - started
+    finally:
+        for server in servers:
+            server.stop()
+
+    pages = sum(server.requests for server in servers)
+    listings = timings['listings']
+    leads = list(scraper.leads)
+    return {
+        'sources': len(servers),
+        'pages': pages,
+        'errors': sum(server.errors for server in servers),
+        'leads': listings,
+        'seconds': elapsed,
+        'pages_per_s': pages / elapsed,
+        'leads_per_s': listings / elapsed,
+        'parse_ms_per_listing': timings['parse'] * 1000 / listings if listings else 0.0,
+        # ru_maxrss is KB on Linux
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'rate_limit_wait_s': sum(stats['wait'] for stats in scraper.limiter.stats().values()),
+        # A list of lead dicts vs the columnar LeadBatch run_search keeps
+        'dict_bytes_per_lead': bytes_per_lead(leads, list) if leads else 0.0,
+        'bytes_per_lead': bytes_per_lead(leads, LeadBatch) if leads else 0.0,
+    }
+
+
+def run_suite(options):
+    results = {}
+    for module_name in SCENARIOS:
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            results[module_name] = executor.submit(run_scenario, module_name, options).result()
+    return results
+
+
+def print_results(results):
+    print(f"{'scenario':<13} {'pages':>6} {'errors':>6} {'pages/s':>8} {'leads/s':>8} "
+          f"{'parse ms/lst':>12} {'peak MB':>8} {'rate wait s':>11} {'B/lead dict -> batch':>22}")
+    for name, r in results.items():
+        drop = 1 - r['bytes_per_lead'] / r['dict_bytes_per_lead'] if r['dict_bytes_per_lead'] else 0.0
+        memory = f"{r['dict_bytes_per_lead']:.0f} -> {r['bytes_per_lead']:.0f} (-{drop * 100:.0f}%)"
+        print(f"{name:<13} {r['pages']:>6} {r['errors']:>6} {r['pages_per_s']:>8.1f} "
+              f"{r['leads_per_s']:>8.0f} {r['parse_ms_per_listing']:>12.3f} "
+              f"{r['peak_rss_mb']:>8.1f} {r['rate_limit_wait_s']:>11.2f} {memory:>22}")
+
+
+def compare(results, baseline, tolerance):
+    """Print changes vs baseline; returns the list of regressed (scenario, metric)"""
+    regressions = []
+    print(f"\nvs baseline (tolerance {tolerance * 100:.0f}%):")
+    for name, r in results.items():
+        old = baseline.get(name)
+        if old is None:
+            print(f"   {name}: not in baseline")
+            continue
+        for metric, higher_is_better in METRICS.items():
+            if not old.get(metric):
+                continue
+            change = (r[metric] - old[metric]) / old[metric]
+            worse = -change if higher_is_better else change
+            flag = "  ⚠ regression" if worse > tolerance else ""
+            if flag:
+                regressions.append((name, metric))
+            print(f"   {name} {metric}: {old[metric]:.3f} -> {r[metric]:.3f} "
+                  f"({change * 100:+.1f}%){flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--categories', type=int, default=4)
+    parser.add_argument('--cities', type=int, default=3)
+    parser.add_argument('--max-pages', type=int, default=2)
+    parser.add_argument('--latency', type=float, default=0.02, help="seconds per response")
+    parser.add_argument('--error-rate', type=float, default=0.05, help="fraction of 503s")
+    parser.add_argument('--delay', type=float, default=0.01, help="rate limit per host (s)")
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--yelp-details', action='store_true',
+                        help="also fetch every Yelp business page (scrapers that support it)")
+    parser.add_argument('--save-baseline', metavar='FILE')
+    parser.add_argument('--compare', metavar='FILE')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="relative slowdown reported as a regression (default: %(default)s)")
+    args = parser.parse_args()
+
+    options = {key: getattr(args, key) for key in
+               ('categories', 'cities', 'max_pages', 'latency', 'error_rate', 'delay', 'concurrency',
+                'yelp_details')}
+    results = run_suite(options)
+    print_results(results)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump({'options': options, **results}, f, indent=2)
+        print(f"\nSaved baseline to {args.save_baseline}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get('options') != options:
+            print("\n⚠ baseline was recorded with different options; numbers may not compare")
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark: plain requests.Session vs the pooled transport
+Replays the saved fixtures through keep-alive, gzip-capable stub servers
+(one per directory, no rate limit) over a category x city grid, once with a
+stock HTTPAdapter (10 connections kept per host, the old hard-coded
+Accept-Encoding) and once with the scraper's TransportAdapter sized to the
+concurrency. Reports connections the servers accepted, how many requests
+reused one, and body bytes on the wire vs decoded.
+
+    python benchmarks/bench_transport.py --pages 600 --concurrency 24
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+from requests.adapters import HTTPAdapter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import leadscraper
+from stub_server import StubServer
+from bench_parse_pool import grid_for, load_fixture
+
+
+def bench(pooled, pages, latency, concurrency):
+    scraper = leadscraper.IllinoisLeadScraper(min_delay=0, max_delay=0, cache_dir=None,
+                                              max_pages=1)
+    if not pooled:
+        plain = HTTPAdapter()
+        scraper.session.mount('https://', plain)
+        scraper.session.mount('http://', plain)
+        scraper.session.headers['Accept-Encoding'] = 'gzip, deflate, br'
+    servers = []
+    for source in scraper.base_urls:
+        server = StubServer({'/search': load_fixture(source)}, latency=latency,
+                            keep_alive=True, gzip=True).start()
+        scraper.base_urls[source] = server.url
+        servers.append(server)
+    categories, cities = grid_for(pages, scraper.base_urls)
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            scraper.run_search(categories, cities, max_concurrency=concurrency)
+            elapsed = time.perf_counter() - started
+    finally:
+        for server in servers:
+            server.stop()
+    requests = sum(server.requests for server in servers)
+    connections = sum(server.connections for server in servers)
+    wire = sum(server.sent for server in servers)
+    decoded = scraper.metrics.total('response_bytes')
+    return requests, connections, wire, decoded, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--pages', type=int, default=600)
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--concurrency', type=int, default=24)
+    args = parser.parse_args()
+
+    print(f"{args.pages} pages, {args.concurrency} at a time, {args.latency * 1000:.0f} ms latency")
+    print(f"{'transport':<10} {'requests':>9} {'connections':>12} {'reused':>7} "
+          f"{'wire KB':>8} {'decoded KB':>11} {'pages/s':>8}")
+    for name, pooled in (('plain', False), ('pooled', True)):
+        requests, connections, wire, decoded, elapsed = bench(pooled, args.pages, args.latency,
+                                                              args.concurrency)
+        reused = max(requests - connections, 0) / max(requests, 1)
+        print(f"{name:<10} {requests:>9} {connections:>12} {reused:>7.0%} {wire / 1024:>8.0f} "
+              f"{decoded / 1024:>11.0f} {requests / elapsed:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark: serial vs concurrent website verification
+Starts one local stub server per "site" (some live, some redirecting, some
+parked, some gone) with a fixed response latency and checks them all, first
+one at a time and then through WebsiteChecker's concurrent pool.
+
+    python benchmarks/bench_website_check.py --sites 200 --latency 0.2
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stub_server import StubServer
+from website_check import WebsiteChecker, verify_leads
+
+PARKED_PAGE = b"<html><body><h1>This domain is for sale!</h1></body></html>"
+
+
+def start_sites(count, latency):
+    """Servers whose root is live, redirected off-domain, parked or 404, in turn"""
+    target = StubServer({'/': b"<html>new home</html>"}, latency=latency).start()
+    # 'localhost' vs '127.0.0.1' makes the redirect cross domains
+    moved = f"http://localhost:{target.url.rsplit(':', 1)[1]}/"
+    kinds = [
+        {'/': b"<html><body>Welcome</body></html>"},
+        {'/': (301, {'Location': moved}, b"")},
+        {'/': PARKED_PAGE},
+        {},
+    ]
+    servers = [StubServer(kinds[i % len(kinds)], latency=latency, allow_head=i % len(kinds) != 2)
+               for i in range(count)]
+    return [target] + [server.start() for server in servers]
+
+
+def bench(servers, concurrency):
+    leads = [{'website': server.url + '/'} for server in servers[1:]]
+    checker = WebsiteChecker(max_concurrency=concurrency)
+    started = time.perf_counter()
+    counts = verify_leads(leads, checker, progress=False)
+    return time.perf_counter() - started, counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sites', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.2, help="seconds per response")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 16, 64])
+    args = parser.parse_args()
+
+    servers = start_sites(args.sites, args.latency)
+    try:
+        print(f"{args.sites} sites, {args.latency * 1000:.0f} ms latency")
+        print(f"{'concurrency':>11} {'seconds':>9} {'sites/s':>9} {'speedup':>8}  labels")
+        baseline = None
+        for concurrency in args.concurrency:
+            elapsed, counts = bench(servers, concurrency)
+            baseline = baseline or elapsed
+            labels = " ".join(f"{label}={count}" for label, count in sorted(counts.items()))
+            print(f"{concurrency:>11} {elapsed:>9.2f} {args.sites / elapsed:>9.1f} "
+                  f"{baseline / elapsed:>7.1f}x  {labels}")
+    finally:
+        for server in servers:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
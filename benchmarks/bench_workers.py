@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark: several worker processes draining one shared crawl ledger
+Serves the fixtures from local stub servers with latency, plans a category
+x city grid into a fresh ledger, and runs N worker processes on it (each a
+full run_search with worker=...). Checks that every unit finished, that no
+page was fetched twice, and that the combined request rate per host stayed
+within the shared limit. --kill-after stops one worker mid-run without
+letting it release anything; its units come back when their leases expire.
+
+    python benchmarks/bench_workers.py --workers 1 2 4
+    python benchmarks/bench_workers.py --workers 3 --kill-after 2 --lease 3
+"""
+
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_suite import stub_pages
+from crawl_grid import plan_grid, top_cities
+from crawl_ledger import DONE, CrawlLedger
+from lead_sink import CsvLeadSink
+from stub_server import StubServer
+from workers import part_filename
+
+import leadscraper
+
+
+def make_scraper(options, base_urls):
+    scraper = leadscraper.IllinoisLeadScraper(min_delay=1 / options.rate, max_delay=1 / options.rate,
+                                              cache_dir=None, max_pages=1)
+    scraper.base_urls.update(base_urls)
+    return scraper
+
+
+def work(options, base_urls, ledger_path, output, worker):
+    scraper = make_scraper(options, base_urls)
+    ledger = CrawlLedger(ledger_path).join(worker, lease=options.lease)
+    sink = CsvLeadSink(part_filename(output, worker))
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            scraper.run_search(ledger.meta('categories'), ledger.meta('cities'), sink=sink,
+                               ledger=ledger, max_concurrency=options.concurrency, worker=worker)
+    finally:
+        sink.close()
+        ledger.close()
+
+
+def run(count, options, base_urls, directory):
+    ledger_path = os.path.join(directory, f"ledger-{count}.sqlite3")
+    output = os.path.join(directory, f"leads-{count}.csv")
+    categories = [f"category {i}" for i in range(options.categories)]
+    cities = top_cities(options.cities)
+    ledger = CrawlLedger(ledger_path)
+    ledger.reset(categories=categories, cities=cities, output=output)
+    units = ledger.plan(plan_grid(categories, cities, list(base_urls)))
+
+    processes = [multiprocessing.Process(target=work, args=(options, base_urls, ledger_path,
+                                                            output, f"w{i}"))
+                 for i in range(count)]
+    started = time.perf_counter()
+    for process in processes:
+        process.start()
+    if options.kill_after is not None:
+        time.sleep(options.kill_after)
+        # No Ctrl-C, no release: the lease has to run out
+        processes[0].kill()
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - started
+    counts = ledger.counts()
+    ledger.close()
+    return len(units), counts, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--categories', type=int, default=8)
+    parser.add_argument('--cities', type=int, default=10)
+    parser.add_argument('--latency', type=float, default=0.2, help="seconds per stub response")
+    parser.add_argument('--rate', type=float, default=20.0,
+                        help="shared requests/s allowed per host (default: %(default)s)")
+    parser.add_argument('--concurrency', type=int, default=2, help="per worker and host")
+    parser.add_argument('--lease', type=float, default=10.0)
+    parser.add_argument('--kill-after', type=float, metavar='SECONDS',
+                        help="kill the first worker this long after the start")
+    options = parser.parse_args()
+
+    sources = list(leadscraper.IllinoisLeadScraper.BASE_URLS)
+    servers = {source: StubServer(stub_pages(source), latency=options.latency, seed=seed).start()
+               for seed, source in enumerate(sources)}
+    base_urls = {source: server.url for source, server in servers.items()}
+    print(f"{'workers':>7} {'units':>6} {'done':>6} {'fetches':>8} {'seconds':>8} "
+          f"{'pages/s':>8} {'max host req/s':>15}")
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            for count in options.workers:
+                before = {source: server.requests for source, server in servers.items()}
+                units, counts, elapsed = run(count, options, base_urls, directory)
+                fetches = {source: server.requests - before[source]
+                           for source, server in servers.items()}
+                total = sum(fetches.values())
+                busiest = max(fetches.values()) / elapsed
+                print(f"{count:>7} {units:>6} {counts[DONE]:>6} {total:>8} {elapsed:>8.2f} "
+                      f"{total / elapsed:>8.1f} {busiest:>15.1f}")
+    finally:
+        for server in servers.values():
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Generate the offline HTML fixtures used by the benchmarks
+Pages mimic each directory's result markup (the parts our parsers read)
+wrapped in the heavy navigation, script and footer boilerplate of a real
+search page. Output is deterministic, so regenerating gives identical files.
+
+    python benchmarks/make_fixtures.py
+"""
+
+import os
+import random
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+WORDS = ["Prairie", "Lincoln", "Lakeshore", "Midwest", "Heritage", "Summit", "Riverside",
+         "Oak", "Capital", "Union", "Northern", "Harbor", "Pioneer", "Cardinal", "Liberty"]
+KINDS = ["Medical Group", "Family Dental", "Law Offices", "Accounting", "Insurance Agency",
+         "Financial Advisors", "Realty", "Manufacturing Co", "Clinic", "Tax Services"]
+SUFFIXES = ["", "", ", LLC", " LLC", ", Inc.", " P.C.", " Ltd"]
+STREETS = ["Main St", "State St", "Washington Ave", "Lincoln Hwy", "Broadway", "Elm St",
+           "Jefferson St", "Madison Ave", "Oak St", "Park Ave"]
+CITIES = [("Chicago", "60601"), ("Chicago", "60614"), ("Springfield", "62701"),
+          ("Rockford", "61101"), ("Peoria", "61602"), ("Naperville", "60540"),
+          ("Aurora", "60505"), ("Joliet", "60432"), ("Champaign", "61820"),
+          ("Evanston", "60201")]
+
+
+def fake_business(rng):
+    name = f"{rng.choice(WORDS)} {rng.choice(KINDS)}{rng.choice(SUFFIXES)}"
+    phone = f"({rng.choice(['312', '217', '815', '309', '630'])}) 555-{rng.randint(0, 9999):04d}"
+    street = f"{rng.randint(1, 9999)} {rng.choice(STREETS)}"
+    city, zip_code = rng.choice(CITIES)
+    website = f"https://www.{name.split()[0].lower()}{rng.randint(1, 999)}.com" if rng.random() < 0.55 else None
+    return name, phone, street, city, zip_code, website
+
+
+def boilerplate_head(rng, title):
+    nav = "".join(f'<li class="nav-item"><a href="/c/{i}" class="nav-link">Category {i}</a></li>'
+                  for i in range(250))
+    script = "var tracking = {" + ",".join(f'"k{i}": "{rng.random():.12f}"' for i in range(1500)) + "};"
+    return (f"<!DOCTYPE html><html><head><title>{title}</title>"
+            f"<script>{script}</script><style>{'.c{color:#333}' * 800}</style></head>"
+            f"<body><header><ul class=\"nav\">{nav}</ul></header><main>")
+
+
+def boilerplate_tail(rng):
+    ads = "".join(f'<div class="ad-slot"><img src="/ad/{i}.png" alt="ad"><p>Sponsored offer {i}</p></div>'
+                  for i in range(60))
+    footer = "".join(f'<a href="/f/{i}">Footer link {i}</a>' for i in range(300))
+    return (f"<aside>{ads}</aside></main><a class=\"next ajax-page\" href=\"?page=2\">Next</a>"
+            f"<footer>{footer}</footer></body></html>")
+
+
+def yellowpages_listing(biz, i):
+    name, phone, street, city, zip_code, website = biz
+    link = f'<a class="track-visit-website" href="{website}">Website</a>' if website else ""
+    return (f'<div class="result" id="lid-{i}"><div class="srp-listing"><div class="info">'
+            f'<h2 class="n">{i}. <a class="business-name" href="/biz/{i}"><span>{name}</span></a></h2>'
+            f'<div class="phones phone primary">{phone}</div>'
+            f'<div class="adr"><div class="street-address">{street}</div>'
+            f'<div class="locality">{city}, IL {zip_code}</div></div>'
+            f'<div class="links">{link}<a class="directions" href="/dir/{i}">Directions</a></div>'
+            f'<div class="snippet">Serving {city} since {1950 + i}.</div></div></div></div>')
+
+
+def manta_listing(biz, i):
+    name, phone, street, city, zip_code, website = biz
+    link = f'<a href="{website}" rel="nofollow">Visit Website</a>' if website else ""
+    return (f'<div class="card"><div class="card-body"><h3>{name}</h3>'
+            f'<address>{street}, {city}, IL {zip_code}</address>'
+            f'<a href="tel:{phone}">{phone}</a>{link}'
+            f'<p class="desc">Family owned business in {city}.</p></div></div>')
+
+
+def superpages_listing(biz, i):
+    name, phone, street, city, zip_code, website = biz
+    link = f'<a class="weblink" href="{website}">Visit Website</a>' if website else ""
+    return (f'<div class="listing" id="l{i}"><a class="business-name" href="/bp/{i}">{name}</a>'
+            f'<span class="phone">{phone}</span><span class="street-address">{street}</span>'
+            f'<span class="locality">{city}, IL {zip_code}</span>{link}</div>')
+
+
+def yelp_listing(biz, i):
+    name, phone, street, city, zip_code, website = biz
+    return (f'<div data-testid="serp-ia-card"><div class="container"><h3>'
+            f'<a class="css-businessname-19v1" href="/biz/{i}">{name}</a></h3>'
+            f'<div class="rating" aria-label="{(i % 5) + 1} star rating"></div>'
+            f'<address>{street}, {city}, IL {zip_code}</address>'
+            f'<p class="snippet">"Great service in {city}!"</p></div></div>')
+
+
+def yelp_detail(biz, i):
+    name, phone, street, city, zip_code, website = biz
+    link = ""
+    if website:
+        target = website.replace(':', '%3A').replace('/', '%2F')
+        link = (f'<p>Business website</p><p><a href="/biz_redir?url={target}&amp;cachebuster={i}" '
+                f'rel="noopener">{website.split("//")[1]}</a></p>')
+    return (f'<div data-testid="biz-details"><h1>{name}</h1>{link}'
+            f'<p>Phone number</p><p data-testid="biz-phone">{phone}</p>'
+            f'<p>Get Directions</p><address>{street}, {city}, IL {zip_code}</address></div>')
+
+
+SOURCES = {
+    'yellowpages': yellowpages_listing,
+    'manta': manta_listing,
+    'superpages': superpages_listing,
+    'yelp': yelp_listing,
+}
+
+
+def make_page(source, listings=30, seed=0):
+    rng = random.Random(f"{source}-{seed}")
+    render = SOURCES[source]
+    body = "".join(render(fake_business(rng), i + 1) for i in range(listings))
+    return boilerplate_head(rng, f"{source} results") + body + boilerplate_tail(rng)
+
+
+def make_detail_page(seed=0):
+    """A Yelp business page (the one business a detail request asks for)"""
+    rng = random.Random(f"yelp-detail-{seed}")
+    biz = fake_business(rng)
+    while biz[-1] is None:
+        biz = fake_business(rng)
+    return boilerplate_head(rng, biz[0]) + yelp_detail(biz, 1) + boilerplate_tail(rng)
+
+
+def main():
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    pages = {source: make_page(source) for source in SOURCES}
+    pages['yelp_detail'] = make_detail_page()
+    for source, page in pages.items():
+        path = os.path.join(FIXTURE_DIR, f"{source}.html")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(page)
+        print(f"wrote {path} ({os.path.getsize(path) // 1024} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Local stub HTTP server for offline benchmarks
+Serves canned directory pages with configurable latency, errors and ETags
+"""
+
+import gzip
+import hashlib
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    def setup(self):
+        super().setup()
+        self.server.stub.connections += 1
+    
+    def do_GET(self):
+        self._respond(send_body=True)
+    
+    def do_HEAD(self):
+        if not self.server.stub.allow_head:
+            self.send_response(405)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self._respond(send_body=False)
+    
+    def _respond(self, send_body):
+        stub = self.server.stub
+        stub.requests += 1
+        if stub.latency:
+            time.sleep(stub.latency)
+        if stub.error_rate and stub.roll() < stub.error_rate:
+            stub.errors += 1
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        
+        path = urlparse(self.path).path
+        body = stub.pages.get(path)
+        if body is None:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if callable(body):
+            body = body(self.path)
+        if isinstance(body, tuple):
+            # (status, headers, body) for redirects and error pages
+            status, headers, body = body
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if send_body:
+                self.wfile.write(body)
+            return
+        
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('ETag', etag)
+        if stub.gzip and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body, compresslevel=6)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if send_body:
+            try:
+                if stub.chunk_size:
+                    # Trickle the body out, like a slow upstream
+                    for start in range(0, len(body), stub.chunk_size):
+                        self.wfile.write(body[start:start + stub.chunk_size])
+                        self.wfile.flush()
+                        stub.sent += min(stub.chunk_size, len(body) - start)
+                        time.sleep(stub.chunk_delay)
+                else:
+                    self.wfile.write(body)
+                    stub.sent += len(body)
+            except (BrokenPipeError, ConnectionResetError):
+                # Client went away mid-response (e.g. a killed worker)
+                pass
+    
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer:
+    """Threaded HTTP server on 127.0.0.1 serving {path: bytes} pages
+
+    A page may also be a (status, headers, body) tuple, e.g. for redirects.
+    error_rate is the fraction of requests answered with 503 (seeded, so a
+    run is repeatable). With allow_head=False, HEAD requests get 405. With
+    chunk_size, 200 bodies are sent chunk_size bytes at a time, chunk_delay
+    seconds apart. keep_alive answers in HTTP/1.1, so clients can reuse a
+    connection; gzip compresses 200 bodies for clients that accept it.
+    """
+    
+    def __init__(self, pages, latency=0.0, error_rate=0.0, seed=0, allow_head=True,
+                 chunk_size=0, chunk_delay=0.0, keep_alive=False, gzip=False):
+        self.pages = pages
+        self.gzip = gzip
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self.allow_head = allow_head
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        # TCP connections accepted
+        self.connections = 0
+        # Body bytes written to clients (a client that hangs up stops the count)
+        self.sent = 0
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        handler = _StubHandler
+        if keep_alive:
+            handler = type('_KeepAliveHandler', (_StubHandler,), {'protocol_version': 'HTTP/1.1'})
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        self._httpd.daemon_threads = True
+        self._httpd.stub = self
+        self._thread = None
+    
+    def roll(self):
+        with self._rng_lock:
+            return self._rng.random()
+    
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc):
+        self.stop()
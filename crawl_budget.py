@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Budgeted crawl scheduling
+Gives a run a fixed budget of requests and/or wall-clock seconds and spends
+it where the useful leads are. A prospect is a lead with a phone number and
+no website; each (source, category) arm and each (source, category,
+location) cell learns its prospects per request as pages come back.
+
+Units reach the fetch engine a few at a time through its refill hook: every
+host is kept busy with one unit per engine worker, taken from the arm with
+the highest upper confidence bound (UCB1 over prospects per request; every
+arm is tried once first, and an arm's mean is pulled toward its source's
+and the run's until it has data) and, inside the arm, from the cell that
+has yielded best so far. Under a request budget an arm whose upper bound
+falls below the best arm's lower bound gets no more requests while better
+arms have work, so a host whose listings carry no phones (Yelp without
+detail pages) stops taking requests from hosts that do. Under a time
+budget alone an idle host costs nothing, so each host only orders its own
+work. Later pages and detail pages go back to the scheduler instead of
+straight to the engine, so both are counted against the budget before they
+are sent (an arm's detail pages go before its further searches); once the
+budget is spent, units in flight finish and the rest stay pending in the
+ledger for --resume, along with the leads still waiting on a detail page.
+"""
+
+import math
+import time
+from collections import Counter
+
+from crawl_grid import unit_priority
+from detail_pages import is_detail_job
+from fetch_engine import host_of
+
+# Requests' worth of weight the parent estimate (source, run) carries in a
+# child's mean, so one lucky page does not decide an arm
+PRIOR_REQUESTS = 4
+# Arms listed in the report
+REPORT_ARMS = 5
+
+
+def is_prospect(lead):
+    """A lead we can call that has no website: what the budget is spent on"""
+    return lead.get('has_website') == "No" and lead.get('phone') not in (None, "", "N/A")
+
+
+class Yield:
+    """Requests spent and prospects found"""
+
+    __slots__ = ('requests', 'prospects')
+
+    def __init__(self):
+        self.requests = 0
+        self.prospects = 0
+
+    def rate(self):
+        return self.prospects / self.requests if self.requests else 0.0
+
+    def mean(self, prior):
+        """Prospects per request, shrunk toward prior"""
+        return (self.prospects + prior * PRIOR_REQUESTS) / (self.requests + PRIOR_REQUESTS)
+
+
+class BudgetScheduler:
+    """Hands out crawl jobs best-yield first until max_requests or max_seconds is spent
+
+    Jobs are engine jobs, (unit, url). Pass refill to AsyncFetchEngine.fetch_all,
+    add() the jobs to crawl (first pages, then follow-ups as they are found),
+    and record() what each unit brought. depth is the number of units in
+    flight per host, the engine's workers per host. With adaptive=False the
+    grid order (biggest metros first) is kept and only the budget applies;
+    exploration scales the confidence bonus (0 always takes the best mean).
+    """
+
+    def __init__(self, max_requests=None, max_seconds=None, depth=4, adaptive=True,
+                 exploration=0.5):
+        self.max_requests = max_requests
+        self.max_seconds = max_seconds
+        self.depth = depth
+        self.adaptive = adaptive
+        self.exploration = exploration
+        # (source, category) -> pending jobs
+        self.pending = {}
+        self.in_flight = Counter()
+        # Unit of each search in flight (the job itself for a detail page) -> host
+        self._hosts = {}
+        self.total = Yield()
+        self.sources = {}
+        self.arms = {}
+        self.cells = {}
+        # Arms sent at least one request: the rest are tried once before any is ranked
+        self.tried = set()
+        self.issued = 0
+        self.started = None
+        self.stopped = None
+
+    def add(self, jobs):
+        for job in jobs:
+            unit = job[0]
+            self.pending.setdefault((unit.source, unit.category), []).append(job)
+
+    def left(self):
+        """Searches not sent yet"""
+        return sum(not is_detail_job(job) for jobs in self.pending.values() for job in jobs)
+
+    def details_left(self):
+        """Detail pages not sent yet"""
+        return sum(is_detail_job(job) for jobs in self.pending.values() for job in jobs)
+
+    def elapsed(self):
+        return time.monotonic() - self.started if self.started is not None else 0.0
+
+    def record(self, unit, prospects, requests=1, finished=True, job=None):
+        """Credit unit's cell with requests spent and prospects found
+
+        finished frees the unit's slot on its host, or with job (a detail
+        job) that detail page's slot; leads written after their detail page
+        are credited with finished=False.
+        """
+        for stats in (self.total, self.sources.setdefault(unit.source, Yield()),
+                      self.arms.setdefault((unit.source, unit.category), Yield()),
+                      self.cells.setdefault(unit[:3], Yield())):
+            stats.requests += requests
+            stats.prospects += prospects
+        if finished:
+            host = self._hosts.pop(job if job is not None else unit, None)
+            if host is not None:
+                self.in_flight[host] -= 1
+
+    def _spent(self):
+        """Why the budget is used up, or None"""
+        if self.max_requests is not None and self.total.requests >= self.max_requests:
+            return f"request budget of {self.max_requests} spent"
+        if self.max_seconds is not None and self.elapsed() >= self.max_seconds:
+            return f"time budget of {self.max_seconds:.0f}s spent"
+        return None
+
+    def arm_bounds(self, arm):
+        """(mean, exploration bonus) for an arm, in prospects per request"""
+        source, _ = arm
+        if arm not in self.tried:
+            return 0.0, math.inf
+        overall = self.total.rate()
+        mean = self.arms.get(arm, Yield()).mean(self.sources.get(source, Yield()).mean(overall))
+        pulls = self.arms[arm].requests if arm in self.arms else 0
+        if self.sources.get(source, Yield()).requests >= PRIOR_REQUESTS:
+            # The source's mean is already worth PRIOR_REQUESTS requests of evidence
+            pulls += PRIOR_REQUESTS
+        # Rewards are counts, not 0/1: scale the bonus to the run's yield
+        scale = max(overall, 1.0)
+        bonus = self.exploration * scale * math.sqrt(
+            2 * math.log(self.total.requests + 1) / (pulls + 1))
+        return mean, bonus
+
+    def _next_job(self, arm):
+        """Pop the arm's next job: detail pages first, then the best cell's (grid order between equals)"""
+        jobs = self.pending[arm]
+        if self.adaptive:
+            prior = self.arm_bounds(arm)[0]
+            index = min(range(len(jobs)), key=lambda i: (
+                not is_detail_job(jobs[i]),
+                -self.cells.get(jobs[i][0][:3], Yield()).mean(prior), unit_priority(jobs[i][0])))
+        else:
+            index = min(range(len(jobs)), key=lambda i: (not is_detail_job(jobs[i]),
+                                                          unit_priority(jobs[i][0])))
+        job = jobs.pop(index)
+        if not jobs:
+            del self.pending[arm]
+        return job
+
+    def _pick(self):
+        """Next job to send, or None while no host with a free slot has one worth sending"""
+        open_arms = [arm for arm, jobs in self.pending.items()
+                     if self.in_flight[host_of(jobs[0][1])] < self.depth]
+        if not open_arms:
+            return None
+        if not self.adaptive:
+            arm = min(open_arms, key=lambda arm: min(unit_priority(job[0])
+                                                     for job in self.pending[arm]))
+            return self._next_job(arm)
+        bounds = {arm: self.arm_bounds(arm) for arm in self.pending}
+        upper = {arm: mean + bonus for arm, (mean, bonus) in bounds.items()}
+        if self.max_requests is not None:
+            # Requests are the scarce resource: leave a host idle rather than
+            # spend one on an arm that is almost surely worse than the best
+            best_lower = max(mean - bonus for mean, bonus in bounds.values())
+            open_arms = [arm for arm in open_arms if upper[arm] >= best_lower]
+            if not open_arms:
+                return None
+        return self._next_job(max(open_arms, key=upper.get))
+
+    def refill(self, outstanding):
+        """AsyncFetchEngine refill hook: jobs for free slots, None once the budget is spent"""
+        if self.started is None:
+            self.started = time.monotonic()
+        self.stopped = self._spent()
+        if self.stopped is not None or (not self.pending and not self._hosts):
+            return None
+        jobs = []
+        while self.max_requests is None or self.total.requests + len(self._hosts) < self.max_requests:
+            job = self._pick()
+            if job is None:
+                break
+            host = host_of(job[1])
+            self.tried.add((job[0].source, job[0].category))
+            self.in_flight[host] += 1
+            self._hosts[job if is_detail_job(job) else job[0]] = host
+            self.issued += 1
+            jobs.append(job)
+        return jobs
+
+    def report(self):
+        requests = f"{self.total.requests}"
+        if self.max_requests is not None:
+            requests += f"/{self.max_requests}"
+        seconds = f"{self.elapsed():.0f}s"
+        if self.max_seconds is not None:
+            seconds += f"/{self.max_seconds:.0f}s"
+        print(f"\n🎯 Budget: {requests} requests in {seconds} | {self.total.prospects} prospects "
+              f"(phone, no website), {self.total.rate():.2f} per request")
+        if self.stopped is not None:
+            print(f"   Stopped: {self.stopped}, {self.left()} units left for --resume")
+            if self.details_left():
+                print(f"   {self.details_left()} detail pages not fetched: their leads are "
+                      f"written when --resume searches again")
+        ranked = sorted(((stats.rate(), arm, stats) for arm, stats in self.arms.items()
+                         if stats.requests), reverse=True)
+        for label, arms in (("Best", ranked[:REPORT_ARMS]),
+                            ("Worst", ranked[REPORT_ARMS:][-REPORT_ARMS:])):
+            for rate, (source, category), stats in arms:
+                print(f"   {label}: {source} / {category}: {stats.prospects} prospects in "
+                      f"{stats.requests} requests ({rate:.2f}/request)")
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Category x city crawl grid
+Expands categories x cities x sources into crawl units, orders them so the
+biggest metros are fetched first, and keeps per-cell lead counts so progress
+can be reported while the crawl runs.
+"""
+
+from crawl_ledger import CrawlUnit
+
+STATE = "Illinois"
+STATE_CODE = "IL"
+
+# Largest Illinois cities (2020 census population)
+ILLINOIS_CITIES = {
+    'Chicago': 2746388,
+    'Aurora': 180542,
+    'Joliet': 150362,
+    'Naperville': 149540,
+    'Rockford': 148655,
+    'Elgin': 114797,
+    'Springfield': 114394,
+    'Peoria': 113150,
+    'Waukegan': 89321,
+    'Champaign': 88302,
+    'Cicero': 85268,
+    'Bloomington': 78680,
+    'Schaumburg': 78723,
+    'Evanston': 78110,
+    'Arlington Heights': 77676,
+    'Bolingbrook': 73922,
+    'Decatur': 70522,
+    'Palatine': 67908,
+    'Skokie': 67824,
+    'Des Plaines': 60675,
+}
+
+
+def top_cities(count):
+    """The `count` most populous cities, biggest first"""
+    return sorted(ILLINOIS_CITIES, key=ILLINOIS_CITIES.get, reverse=True)[:count]
+
+
+def location_for(city):
+    """Search location for a city ('Chicago' -> 'Chicago, IL'); None means statewide"""
+    if city is None or city == STATE:
+        return STATE
+    return f"{city}, {STATE_CODE}"
+
+
+def city_of(location):
+    """City part of a search location, or None for a statewide search"""
+    if location == STATE:
+        return None
+    return location.rsplit(',', 1)[0].strip()
+
+
+def unit_priority(unit):
+    """Sort key for a crawl unit: bigger metros first, then earlier pages"""
+    city = city_of(unit.location)
+    population = ILLINOIS_CITIES.get(city, 0) if city else float('inf')
+    return (-population, unit.page)
+
+
+def plan_grid(categories, cities, sources):
+    """Page-1 units for every category x city x source, highest priority first"""
+    locations = [location_for(city) for city in cities or [None]]
+    units = [CrawlUnit(source, category, location, 1)
+             for location in locations for category in categories for source in sources]
+    return sorted(units, key=unit_priority)
+
+
+class GridProgress:
+    """Pages done vs. planned, and leads found per (category, location) cell"""
+
+    def __init__(self, units=()):
+        self.planned = 0
+        self.done = 0
+        self.cells = {}
+        self.plan(units)
+
+    def plan(self, units):
+        for unit in units:
+            self.planned += 1
+            self.cells.setdefault((unit.category, unit.location), 0)
+
+    def record(self, unit, leads):
+        """Count one finished unit; returns the cell's running lead count"""
+        self.done += 1
+        key = (unit.category, unit.location)
+        self.cells[key] = self.cells.get(key, 0) + leads
+        return self.cells[key]
+
+    def status(self):
+        """'[12/63 pages]' for progress lines"""
+        return f"[{self.done}/{self.planned} pages]"
+
+    def report(self):
+        """Print leads per cell as a category x city table"""
+        if not self.cells:
+            return
+        categories = list(dict.fromkeys(category for category, _ in self.cells))
+        locations = list(dict.fromkeys(location for _, location in self.cells))
+        names = [city_of(location) or location for location in locations]
+        width = max(len(category) for category in categories) + 2
+        print(f"\n🗺  Leads per cell ({self.done}/{self.planned} pages):")
+        print("   " + " " * width + " ".join(f"{name[:12]:>12}" for name in names))
+        for category in categories:
+            counts = (self.cells.get((category, location)) for location in locations)
+            print(f"   {category:<{width}}" +
+                  " ".join(f"{'-' if count is None else count:>12}" for count in counts))
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+SQLite work ledger for resumable crawls
+Every (source, category, location, page) unit is recorded as pending, done
+or failed, so an interrupted run can resume with only the unfinished work.
+
+The same file doubles as a work queue for several worker processes: a
+worker claims units under a time-limited lease and renews it from a
+heartbeat thread; units whose worker died are handed out again once the
+lease runs out. The database runs in WAL mode so workers keep reading while
+another one writes, which also means every worker must be on the same
+machine as the file (WAL needs shared memory, not a network filesystem).
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+# Seconds a claim stays valid without a heartbeat
+LEASE_SECONDS = 60.0
+# Failed (or abandoned) units are handed out again until they have this many attempts
+MAX_ATTEMPTS = 3
+
+CrawlUnit = namedtuple('CrawlUnit', ['source', 'category', 'location', 'page'])
+
+
+def connect(path, timeout=30.0):
+    """SQLite connection in WAL mode that waits up to timeout for other writers"""
+    db = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+    db.execute("PRAGMA journal_mode=WAL")
+    return db
+
+
+class CrawlLedger:
+    """Work ledger for one crawl plan, stored in a local SQLite file"""
+
+    def __init__(self, path='crawl_ledger.sqlite3'):
+        self.path = path
+        self._db = connect(path)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS units (
+                source TEXT NOT NULL,
+                category TEXT NOT NULL,
+                location TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                leads INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                updated_at REAL,
+                lease_owner TEXT,
+                lease_expires REAL,
+                PRIMARY KEY (source, category, location, page)
+            );
+            CREATE INDEX IF NOT EXISTS units_status ON units (status);
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+        # Ledgers written before leases existed
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(units)")}
+        for column, kind in (('lease_owner', 'TEXT'), ('lease_expires', 'REAL')):
+            if column not in columns:
+                self._db.execute(f"ALTER TABLE units ADD COLUMN {column} {kind}")
+        self._db.commit()
+        # Set by join(): units planned from here on are leased to this worker
+        self.owner = None
+        self.lease = LEASE_SECONDS
+        self._heartbeat = None
+
+    def reset(self, **meta):
+        """Start a new plan: forget all units and store run metadata"""
+        with self._db:
+            self._db.execute("DELETE FROM units")
+            self._db.execute("DELETE FROM meta")
+            self._db.executemany("INSERT INTO meta VALUES (?, ?)",
+                                 [(k, json.dumps(v)) for k, v in meta.items()])
+
+    def meta(self, key, default=None):
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def plan(self, units):
+        """Record units as pending and return the ones that were new
+
+        Units already in the ledger keep their status, so re-planning after a
+        crash never resets finished work or queues the same page twice. A
+        worker's new units (next pages it found) are leased to it straight
+        away, so no other worker fetches them as well.
+        """
+        added = []
+        now = time.time()
+        if self.owner is None:
+            status, owner, expires = PENDING, None, None
+        else:
+            status, owner, expires = LEASED, self.owner, now + self.lease
+        with self._db:
+            for unit in units:
+                cursor = self._db.execute(
+                    "INSERT OR IGNORE INTO units (source, category, location, page, status, "
+                    "updated_at, lease_owner, lease_expires) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    tuple(unit) + (status, now, owner, expires))
+                if cursor.rowcount:
+                    added.append(unit)
+        return added
+
+    def unfinished(self):
+        """Units still to do: pending first, then failed ones to retry"""
+        rows = self._db.execute(
+            "SELECT source, category, location, page FROM units WHERE status != ? "
+            "ORDER BY status = ?, rowid", (DONE, FAILED)).fetchall()
+        return [CrawlUnit(*row) for row in rows]
+
+    def join(self, owner, lease=LEASE_SECONDS):
+        """Work as `owner` on a shared plan: claim() units, with leases renewed every lease/3s"""
+        self.owner = owner
+        self.lease = lease
+        self._heartbeat = LeaseHeartbeat(self.path, owner, lease).start()
+        return self
+
+    def _expire(self, now):
+        # The worker holding these stopped heartbeating: count an attempt, hand them out again
+        self._db.execute(
+            "UPDATE units SET status = ?, attempts = attempts + 1, "
+            "error = 'lease expired (' || lease_owner || ')', lease_owner = NULL, "
+            "lease_expires = NULL, updated_at = ? WHERE status = ? AND lease_expires < ?",
+            (FAILED, now, LEASED, now))
+
+    def claim(self, limit, sources=None):
+        """Lease up to limit units to this worker: pending first, then failed ones to retry"""
+        now = time.time()
+        where = "(status = ? OR (status = ? AND attempts < ?))"
+        params = [PENDING, FAILED, MAX_ATTEMPTS]
+        if sources is not None:
+            where += f" AND source IN ({', '.join('?' * len(sources))})"
+            params.extend(sources)
+        with self._db:
+            # Take the write lock before reading, so two workers never claim the same rows
+            self._db.execute("BEGIN IMMEDIATE")
+            self._expire(now)
+            rows = self._db.execute(
+                f"SELECT rowid, source, category, location, page FROM units WHERE {where} "
+                "ORDER BY status = ?, rowid LIMIT ?", params + [FAILED, limit]).fetchall()
+            self._db.executemany(
+                "UPDATE units SET status = ?, lease_owner = ?, lease_expires = ?, updated_at = ? "
+                "WHERE rowid = ?",
+                [(LEASED, self.owner, now + self.lease, now, row[0]) for row in rows])
+        return [CrawlUnit(*row[1:]) for row in rows]
+
+    def heartbeat(self):
+        """Extend every lease this worker holds; returns how many"""
+        now = time.time()
+        with self._db:
+            cursor = self._db.execute(
+                "UPDATE units SET lease_expires = ? WHERE status = ? AND lease_owner = ?",
+                (now + self.lease, LEASED, self.owner))
+        return cursor.rowcount
+
+    def leased_elsewhere(self):
+        """Units other workers hold live leases on (they may still fail and come back)"""
+        row = self._db.execute(
+            "SELECT COUNT(*) FROM units WHERE status = ? AND lease_owner IS NOT ? "
+            "AND lease_expires >= ?", (LEASED, self.owner, time.time())).fetchone()
+        return row[0]
+
+    def release(self):
+        """Hand this worker's leased units back as pending (e.g. on Ctrl-C)"""
+        with self._db:
+            cursor = self._db.execute(
+                "UPDATE units SET status = ?, lease_owner = NULL, lease_expires = NULL "
+                "WHERE status = ? AND lease_owner = ?", (PENDING, LEASED, self.owner))
+        return cursor.rowcount
+
+    def mark_done(self, unit, leads=0):
+        with self._db:
+            self._db.execute(
+                "UPDATE units SET status = ?, attempts = attempts + 1, leads = ?, error = NULL, "
+                "updated_at = ?, lease_owner = NULL, lease_expires = NULL "
+                "WHERE source = ? AND category = ? AND location = ? AND page = ?",
+                (DONE, leads, time.time()) + tuple(unit))
+
+    def mark_failed(self, unit, error):
+        with self._db:
+            self._db.execute(
+                "UPDATE units SET status = ?, attempts = attempts + 1, error = ?, "
+                "updated_at = ?, lease_owner = NULL, lease_expires = NULL "
+                "WHERE source = ? AND category = ? AND location = ? AND page = ?",
+                (FAILED, str(error)[:500], time.time()) + tuple(unit))
+
+    def counts(self):
+        """{status: number of units}"""
+        rows = self._db.execute("SELECT status, COUNT(*) FROM units GROUP BY status").fetchall()
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        counts.update(dict(rows))
+        return counts
+
+    def report(self):
+        counts = self.counts()
+        leased = f" | {counts[LEASED]} leased" if counts[LEASED] else ""
+        print(f"\n📒 Crawl ledger ({self.path}): {counts[DONE]} done | "
+              f"{counts[FAILED]} failed | {counts[PENDING]} pending{leased}")
+
+    def close(self):
+        if self._heartbeat is not None:
+            self._heartbeat.stop()
+            self._heartbeat = None
+            # Anything still leased (interrupted run) goes straight back to the queue
+            self.release()
+        self._db.close()
+
+
+class LeaseHeartbeat:
+    """Background thread that keeps one worker's leases alive"""
+
+    def __init__(self, path, owner, lease=LEASE_SECONDS):
+        self.path = path
+        self.owner = owner
+        self.lease = lease
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        # Own connection: the worker's may be mid-transaction on another thread
+        ledger = CrawlLedger(self.path)
+        ledger.owner = self.owner
+        ledger.lease = self.lease
+        try:
+            while not self._stop.wait(self.lease / 3):
+                try:
+                    ledger.heartbeat()
+                except sqlite3.OperationalError:
+                    # Busy for longer than the timeout: try again next beat
+                    pass
+        finally:
+            ledger.close()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name=f"heartbeat-{self.owner}",
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Fuzzy duplicate detection
+Normalizes names (legal suffixes, punctuation) and phones (digits only), then
+only compares leads that share a blocking key -- same phone, same name
+soundex + ZIP, or same normalized name -- and merges each matching group
+into one lead with its sources combined. Never compares all pairs.
+
+    python dedupe.py illinois_leads_20241104_143022.csv [-o merged.csv]
+"""
+
+import argparse
+import gc
+import re
+import string
+from collections import defaultdict
+from functools import lru_cache
+
+from lead_record import LeadBatch
+from lead_store import normalize_phone
+
+LEGAL_SUFFIXES = {
+    'llc', 'inc', 'incorporated', 'corp', 'corporation', 'co', 'company', 'ltd',
+    'limited', 'pc', 'pllc', 'llp', 'lp', 'plc', 'pa', 'sc',
+}
+# One translate() pass: drop dots and apostrophes, spell out '&', blank other punctuation
+_NAME_TABLE = str.maketrans({**{c: ' ' for c in string.punctuation}, '.': None, "'": None, '&': ' and '})
+_NON_ALPHA_RE = re.compile(r'[^a-z]')
+_ZIP_RE = re.compile(r'\b(\d{5})(?:-\d{4})?\b')
+_SOUNDEX_CODES = str.maketrans('aeiouybfpvcgjkqsxzdtlmnr', '000000111122222222334556', 'hw')
+
+# Blocks bigger than this are compared with a sorted sliding window instead of all pairs
+MAX_BLOCK = 64
+WINDOW = 8
+
+
+def normalize_name(name):
+    """'The Smith Law, L.L.C.' -> 'smith law'"""
+    tokens = (name or "").lower().translate(_NAME_TABLE).split()
+    if tokens and tokens[0] == 'the':
+        tokens = tokens[1:]
+    while len(tokens) > 1 and (tokens[-1] in LEGAL_SUFFIXES or tokens[-1] == 'and'):
+        tokens.pop()
+    return ' '.join(tokens)
+
+
+@lru_cache(maxsize=65536)
+def soundex(word):
+    """Four-character American soundex code ('' for words without letters)"""
+    word = _NON_ALPHA_RE.sub('', word.lower())
+    if not word:
+        return ""
+    codes = word.translate(_SOUNDEX_CODES)
+    result = [word[0].upper()]
+    previous = codes[0]
+    for code in codes[1:]:
+        if code != '0' and code != previous:
+            result.append(code)
+        previous = code
+    return (''.join(result) + '000')[:4]
+
+
+def extract_zip(address):
+    """Last 5-digit ZIP in an address; directories put it at the end"""
+    address = address or ""
+    matches = _ZIP_RE.findall(address[-12:]) or _ZIP_RE.findall(address)
+    return matches[-1] if matches else ""
+
+
+class _Record:
+    __slots__ = ('key', 'tokens', 'phone', 'zip')
+
+    def __init__(self, name, phone, address):
+        self.key = normalize_name(name)
+        self.tokens = frozenset(self.key.split())
+        phone = normalize_phone(phone)
+        self.phone = phone if len(phone) == 10 else ""
+        self.zip = extract_zip(address)
+
+
+def _similarity(a, b):
+    if a.key == b.key:
+        return 1.0
+    if not a.tokens or not b.tokens:
+        return 0.0
+    return len(a.tokens & b.tokens) / len(a.tokens | b.tokens)
+
+
+def _records_match(a, b):
+    if a.phone and b.phone:
+        if a.phone != b.phone:
+            return False
+        # Same number: tolerate wording differences in the name
+        return _similarity(a, b) >= 0.5
+    if a.zip and b.zip and a.zip != b.zip:
+        return False
+    return _similarity(a, b) >= 0.8
+
+
+def is_match(a, b):
+    """Are two leads the same business? Conflicting phones or ZIPs never match"""
+    return _records_match(_Record(a['business_name'], a['phone'], a['address']),
+                          _Record(b['business_name'], b['phone'], b['address']))
+
+
+def _pick(values, empty=("", "N/A", "Check Yelp", "Unknown")):
+    for value in values:
+        if value not in empty:
+            return value
+    return values[0]
+
+
+def merge_leads(group):
+    """One lead from a group of duplicates, with sources combined"""
+    merged = dict(group[0])
+    sources = []
+    for lead in group:
+        for source in lead['source'].split(';'):
+            if source not in sources:
+                sources.append(source)
+    merged['source'] = ';'.join(sources)
+    merged['phone'] = _pick([lead['phone'] for lead in group if normalize_phone(lead['phone'])]
+                            or [lead['phone'] for lead in group])
+    merged['address'] = max((lead['address'] for lead in group),
+                            key=lambda a: (a not in ("", "N/A"), len(a)))
+    merged['website'] = _pick([lead['website'] for lead in group])
+    flags = [lead['has_website'] for lead in group]
+    merged['has_website'] = 'Yes' if 'Yes' in flags else ('No' if 'No' in flags else flags[0])
+    return merged
+
+
+def _match_columns(leads):
+    """(name, phone, address) per lead; read straight from the columns of a LeadBatch"""
+    if isinstance(leads, LeadBatch):
+        return zip(leads.column('business_name'), leads.column('phone'), leads.column('address'))
+    return ((lead['business_name'], lead['phone'], lead['address']) for lead in leads)
+
+
+def find_duplicate_groups(leads):
+    """Lists of lead indexes that refer to the same business"""
+    records = [_Record(*row) for row in _match_columns(leads)]
+    parent = list(range(len(records)))
+    # Root -> the one phone its group holds ('' for none): pairs are only
+    # checked one at a time, so without it a listing with no phone would
+    # chain two businesses with different numbers into one group
+    phones = [record.phone for record in records]
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    blocks = defaultdict(list)
+    for i, record in enumerate(records):
+        if not record.key:
+            continue
+        if record.phone:
+            blocks[('phone', record.phone)].append(i)
+        if record.zip:
+            blocks[('name', soundex(record.key.split()[0]), record.zip)].append(i)
+        # Always, so a listing with a ZIP still meets one without (Yelp's "Check Yelp")
+        blocks[('key', record.key)].append(i)
+
+    for members in blocks.values():
+        if len(members) < 2:
+            continue
+        if len(members) <= MAX_BLOCK:
+            pairs = ((members[x], members[y]) for x in range(len(members))
+                     for y in range(x + 1, len(members)))
+        else:
+            members = sorted(members, key=lambda i: records[i].key)
+            pairs = ((members[x], members[y]) for x in range(len(members))
+                     for y in range(x + 1, min(x + 1 + WINDOW, len(members))))
+        for i, j in pairs:
+            root_i, root_j = find(i), find(j)
+            if root_i == root_j:
+                continue
+            if phones[root_i] and phones[root_j] and phones[root_i] != phones[root_j]:
+                continue
+            if _records_match(records[i], records[j]):
+                parent[root_j] = root_i
+                phones[root_i] = phones[root_i] or phones[root_j]
+
+    groups = defaultdict(list)
+    for i in range(len(records)):
+        groups[find(i)].append(i)
+    return sorted(groups.values(), key=lambda group: group[0])
+
+
+def resolve_duplicates(leads):
+    """Merge fuzzy duplicates; returns the unique leads in first-seen order
+
+    A LeadBatch comes back as a LeadBatch, anything else as a list.
+    """
+    columnar = isinstance(leads, LeadBatch)
+    if columnar:
+        names = leads.column('business_name')
+        if "N/A" in names:
+            leads = leads.take(i for i, name in enumerate(names) if name != "N/A")
+    else:
+        leads = [lead for lead in leads if lead['business_name'] != "N/A"]
+    # Millions of small acyclic objects: cyclic GC passes would only cost time
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        groups = find_duplicate_groups(leads)
+        if not columnar:
+            return [merge_leads([leads[i] for i in group]) if len(group) > 1 else leads[group[0]]
+                    for group in groups]
+        # Copy each group's first row column-wise, then overwrite the merged ones
+        unique = leads.take(group[0] for group in groups)
+        for row, group in enumerate(groups):
+            if len(group) > 1:
+                unique[row] = merge_leads([leads.row(i) for i in group])
+        return unique
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def resolve_csv(input_file, output_file=None):
+    """Merge duplicates in a lead CSV (in place by default); returns (before, after)"""
+    leads = LeadBatch.read_csv(input_file)
+    merged = resolve_duplicates(leads)
+    merged.write_csv(output_file or input_file)
+    return len(leads), len(merged)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge fuzzy duplicate leads in a CSV")
+    parser.add_argument('input')
+    parser.add_argument('-o', '--output', help="output CSV (default: overwrite input)")
+    args = parser.parse_args()
+    before, after = resolve_csv(args.input, args.output)
+    print(f"🔗 Merged {before - after} duplicates: {before} -> {after} leads")
+
+
+if __name__ == "__main__":
+    main()
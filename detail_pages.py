@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Detail-page enrichment
+Some directories only show a business's phone, website and full address on
+its own detail page. Leads from their result pages are parked here until
+that page has been fetched; each distinct detail URL is fetched once per
+run, and every lead waiting on it is filled in and released as soon as it
+arrives, so a slow page only holds back its own leads.
+"""
+
+from urllib.parse import parse_qs, urlparse
+
+# Third item of an engine job (unit, url, DETAIL) that fetches a detail page
+DETAIL = 'detail'
+
+
+def detail_job(unit, url):
+    """Engine job for the detail page at url, found on unit's result page"""
+    return (unit, url, DETAIL)
+
+
+def is_detail_job(job):
+    return len(job) > 2 and job[2] == DETAIL
+
+
+def unwrap_redirect(href, param='url'):
+    """Target of a directory click-tracking link ('/biz_redir?url=https%3A...' -> 'https:...')"""
+    values = parse_qs(urlparse(href).query).get(param)
+    return values[0] if values else href
+
+
+class DetailQueue:
+    """Leads waiting on detail pages, keyed by detail URL"""
+
+    def __init__(self):
+        # url -> {field: value} once fetched; None when the fetch failed
+        self.details = {}
+        # url -> [(unit, lead)] parked until the page arrives
+        self.waiting = {}
+        # unit -> leads still parked; unit -> leads found, for units waiting to be marked done
+        self.outstanding = {}
+        self.deferred = {}
+        self.fetched = 0
+        self.failed = 0
+        self.reused = 0
+
+    def known(self, url):
+        """True if url was already fetched (or failed) this run"""
+        return url in self.details
+
+    def reuse(self, url):
+        """Details of an already fetched page ({} if it failed), without another fetch"""
+        self.reused += 1
+        return self.details[url] or {}
+
+    def wait(self, unit, lead, url):
+        """Park lead until url is fetched; True if url needs a fetch queued"""
+        self.outstanding[unit] = self.outstanding.get(unit, 0) + 1
+        waiters = self.waiting.setdefault(url, [])
+        waiters.append((unit, lead))
+        if len(waiters) > 1:
+            # Already being fetched for another lead
+            self.reused += 1
+            return False
+        return True
+
+    def finish(self, url, details):
+        """Record a fetched page (None on failure); returns the (unit, lead) pairs it releases"""
+        self.details[url] = details
+        if details is None:
+            self.failed += 1
+        else:
+            self.fetched += 1
+        return self.waiting.pop(url, [])
+
+    def defer(self, unit, found):
+        """Hold unit's completion while any of its leads are parked; True if deferred"""
+        if self.outstanding.get(unit):
+            self.deferred[unit] = found
+            return True
+        return False
+
+    def release(self, unit):
+        """One parked lead of unit was written; returns its lead count once the unit is complete"""
+        self.outstanding[unit] -= 1
+        if self.outstanding[unit]:
+            return None
+        del self.outstanding[unit]
+        return self.deferred.pop(unit, None)
+
+    def report(self, name):
+        print(f"\n🔎 {name} detail pages: {self.fetched} fetched | {self.reused} reused | "
+              f"{self.failed} failed")
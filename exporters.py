@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Pluggable lead exporters
+Leads stream out one at a time to CSV, gzip/zstd-compressed JSON Lines, or
+(with pyarrow installed) Parquet written in row groups with typed columns:
+has_website as a nullable boolean, phone as normalized digits, low-cardinality
+columns dictionary-encoded. Any format can be partitioned by source,
+category or county (after addresses.py) into hive-style directories
+(source=YellowPages/...), which pyarrow.dataset and most query engines
+filter on without opening other files.
+
+    python exporters.py illinois_leads_20241104_143022.csv -o leads.parquet
+    python exporters.py illinois_leads_20241104_143022.csv -o out/ --format jsonl.zst --partition-by source
+"""
+
+import abc
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+from urllib.parse import quote
+
+from addresses import ADDRESS_FIELDS
+from lead_sink import FIELDNAMES
+from lead_store import normalize_phone
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Format name -> file extension; the format is picked from the output path
+FORMATS = {
+    'csv': '.csv',
+    'csv.gz': '.csv.gz',
+    'jsonl': '.jsonl',
+    'jsonl.gz': '.jsonl.gz',
+    'jsonl.zst': '.jsonl.zst',
+    'parquet': '.parquet',
+}
+PARTITION_FIELDS = ('source', 'category', 'county')
+# Added by verify_csv and normalize_csv; exported when the leads carry them
+OPTIONAL_FIELDS = ('website_status',) + tuple(ADDRESS_FIELDS)
+ROW_GROUP_SIZE = 64 * 1024
+
+
+def format_of(path):
+    """'leads.jsonl.gz' -> 'jsonl.gz'; longest matching extension wins"""
+    for name, extension in sorted(FORMATS.items(), key=lambda item: -len(item[1])):
+        if path.endswith(extension):
+            return name
+    raise ValueError(f"Unknown export format for {path!r} (use one of {', '.join(FORMATS)})")
+
+
+def check_format(fmt):
+    """Raise RuntimeError if fmt needs an optional package that is not installed"""
+    if fmt == 'parquet' and pyarrow is None:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+    if fmt.endswith('.zst') and zstandard is None:
+        raise RuntimeError("zstd export needs the zstandard package (pip install zstandard)")
+
+
+def fields_of(lead, exclude=()):
+    """Lead columns plus any optional ones this lead has"""
+    fields = list(FIELDNAMES) + [field for field in OPTIONAL_FIELDS if field in lead]
+    return [field for field in fields if field not in exclude]
+
+
+def typed_row(lead, fields=FIELDNAMES):
+    """Lead fields with Yes/No flags as True/False/None and phone as digits (None if none)"""
+    row = {field: lead.get(field, "") for field in fields}
+    for field in ('has_website', 'out_of_state'):
+        if field in row:
+            flag = row[field]
+            row[field] = True if flag == "Yes" else False if flag == "No" else None
+    row['phone'] = normalize_phone(row['phone']) or None
+    for field in ('address', 'website', 'street', 'city', 'zip', 'county'):
+        if row.get(field) in ("", "N/A"):
+            row[field] = None
+    return row
+
+
+def _open_text(path, compression):
+    if compression == 'gzip':
+        return gzip.open(path, 'wt', encoding='utf-8', newline='', compresslevel=6)
+    if compression == 'zstd':
+        check_format('jsonl.zst')
+        raw = open(path, 'wb')
+        stream = zstandard.ZstdCompressor(level=6).stream_writer(raw, closefd=True)
+        return io.TextIOWrapper(stream, encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+class Exporter(abc.ABC):
+    """Write leads one at a time; close() finishes the file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.written = 0
+
+    @abc.abstractmethod
+    def write(self, lead):
+        """Write one lead"""
+
+    def write_all(self, leads):
+        for lead in leads:
+            self.write(lead)
+        return self
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CsvExporter(Exporter):
+    """Plain or gzip-compressed CSV with the usual lead columns"""
+
+    def __init__(self, path, compression=None):
+        super().__init__(path)
+        self._file = _open_text(path, compression)
+        self._writer = None
+
+    def write(self, lead):
+        if self._writer is None:
+            self._writer = csv.DictWriter(self._file, fieldnames=fields_of(lead),
+                                          extrasaction='ignore')
+            self._writer.writeheader()
+        self._writer.writerow(lead)
+        self.written += 1
+
+    def close(self):
+        if self._writer is None:
+            csv.writer(self._file).writerow(FIELDNAMES)
+        self._file.close()
+
+
+class JsonlExporter(Exporter):
+    """One typed JSON object per line, optionally gzip or zstd compressed"""
+
+    def __init__(self, path, compression=None):
+        super().__init__(path)
+        self._file = _open_text(path, compression)
+        self._fields = None
+
+    def write(self, lead):
+        if self._fields is None:
+            self._fields = fields_of(lead)
+        self._file.write(json.dumps(typed_row(lead, self._fields), ensure_ascii=False,
+                                    separators=(',', ':')))
+        self._file.write("\n")
+        self.written += 1
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetExporter(Exporter):
+    """Typed Parquet columns, buffered and written one row group at a time
+
+    Columns in `exclude` are left out (a partition column lives in the
+    directory name, and readers reject it appearing in both places).
+    """
+
+    def __init__(self, path, row_group_size=ROW_GROUP_SIZE, compression='zstd', exclude=()):
+        check_format('parquet')
+        super().__init__(path)
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.exclude = exclude
+        self.schema = None
+        self._columns = None
+        self._writer = None
+
+    def _open(self, fields):
+        dictionary = pyarrow.dictionary(pyarrow.int32(), pyarrow.string())
+        types = {'has_website': pyarrow.bool_(), 'out_of_state': pyarrow.bool_(),
+                 'source': dictionary, 'category': dictionary, 'state': dictionary,
+                 'website_status': dictionary, 'city': dictionary, 'county': dictionary}
+        self.schema = pyarrow.schema([(field, types.get(field, pyarrow.string()))
+                                      for field in fields])
+        self._columns = {field: [] for field in fields}
+        self._writer = pyarrow.parquet.ParquetWriter(self.path, self.schema,
+                                                     compression=self.compression)
+
+    def write(self, lead):
+        if self._writer is None:
+            self._open(fields_of(lead, self.exclude))
+        for field, value in typed_row(lead, self.schema.names).items():
+            self._columns[field].append(value)
+        self.written += 1
+        if len(self._columns['business_name']) >= self.row_group_size:
+            self._flush()
+
+    def _flush(self):
+        if not self._columns['business_name']:
+            return
+        table = pyarrow.table({field: pyarrow.array(values, type=self.schema.field(field).type)
+                               for field, values in self._columns.items()}, schema=self.schema)
+        self._writer.write_table(table, row_group_size=self.row_group_size)
+        self._columns = {field: [] for field in self.schema.names}
+
+    def close(self):
+        if self._writer is None:
+            # Nothing written: still leave a valid (empty) file behind
+            self._open(fields_of({}, self.exclude))
+        self._flush()
+        self._writer.close()
+
+
+def make_exporter(path, fmt=None, partition_field=None):
+    """Exporter for path, by explicit format or by its extension"""
+    fmt = fmt or format_of(path)
+    if fmt == 'parquet':
+        return ParquetExporter(path, exclude=(partition_field,) if partition_field else ())
+    compression = {'gz': 'gzip', 'zst': 'zstd'}.get(fmt.rsplit('.', 1)[-1])
+    if fmt.startswith('jsonl'):
+        return JsonlExporter(path, compression)
+    if fmt.startswith('csv'):
+        return CsvExporter(path, compression)
+    raise ValueError(f"Unknown export format {fmt!r}")
+
+
+class PartitionedExporter(Exporter):
+    """One file per value of a field, under directory/<field>=<value>/part-0<ext>
+
+    Values are percent-encoded in directory names ('law firms' ->
+    category=law%20firms), which hive-partitioned readers decode again.
+    """
+
+    def __init__(self, directory, fmt, by='source'):
+        if by not in PARTITION_FIELDS:
+            raise ValueError(f"Can only partition by {', '.join(PARTITION_FIELDS)}")
+        super().__init__(directory)
+        self.fmt = fmt
+        self.by = by
+        self.partitions = {}
+
+    def _partition(self, value):
+        exporter = self.partitions.get(value)
+        if exporter is None:
+            name = quote(value, safe='') or "unknown"
+            directory = os.path.join(self.path, f"{self.by}={name}")
+            os.makedirs(directory, exist_ok=True)
+            exporter = self.partitions[value] = make_exporter(
+                os.path.join(directory, "part-0" + FORMATS[self.fmt]), self.fmt, self.by)
+        return exporter
+
+    def write(self, lead):
+        self._partition(lead.get(self.by) or "").write(lead)
+        self.written += 1
+
+    def close(self):
+        for exporter in self.partitions.values():
+            exporter.close()
+
+
+def open_exporter(path, fmt=None, partition_by=None):
+    """Exporter for a file, or for a directory of partitions when partition_by is set"""
+    if partition_by:
+        return PartitionedExporter(path, fmt or format_of(path.rstrip('/\\')), partition_by)
+    return make_exporter(path, fmt)
+
+
+def export_leads(leads, path, fmt=None, partition_by=None):
+    """Stream leads (dicts, Leads or a LeadBatch) to path; returns the number written"""
+    with open_exporter(path, fmt, partition_by) as exporter:
+        exporter.write_all(leads)
+    return exporter.written
+
+
+def export_csv(input_file, path, fmt=None, partition_by=None):
+    """Convert a lead CSV row by row (constant memory); returns the number written"""
+    with open(input_file, newline='', encoding='utf-8') as csvfile:
+        return export_leads(csv.DictReader(csvfile), path, fmt, partition_by)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a lead CSV to JSONL or Parquet")
+    parser.add_argument('input')
+    parser.add_argument('-o', '--output', required=True,
+                        help="output file, or directory with --partition-by")
+    parser.add_argument('--format', choices=sorted(FORMATS),
+                        help="default: from the output extension")
+    parser.add_argument('--partition-by', choices=PARTITION_FIELDS)
+    args = parser.parse_args()
+    written = export_csv(args.input, args.output, args.format, args.partition_by)
+    print(f"✅ Exported {written} leads to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
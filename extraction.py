@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Declarative listing extraction
+Each source is a table of fields, each field a chain of fallback selectors.
+Chains are compiled once and reorder themselves so the selector that matches
+most often is tried first; the hit counts double as a markup-change alarm.
+
+Selector syntax (a small CSS subset):
+    div.result            tag with a CSS class
+    a[href]               tag with an attribute
+    a[href^=tel:]         attribute starts with
+    a[class*=businessname] attribute contains
+    a:contains(website)   tag whose text contains a word (case-insensitive)
+    @data-business-name   attribute of the listing element itself
+    ...->href             return an attribute instead of the element text
+"""
+
+import re
+
+from bs4 import SoupStrainer
+
+from parsing import STREAMING, class_strainer, element_soup, listing_soup, pull_elements, release
+
+SPEC_RE = re.compile(
+    r'^(?P<tag>[\w-]+)?'
+    r'(?:\.(?P<cls>[\w-]+))?'
+    r'(?:\[(?P<attr>[\w-]+)(?:(?P<op>[\^*]?=)(?P<val>[^\]]*))?\])?'
+    r'(?::contains\((?P<text>[^)]*)\))?'
+    r'(?:->(?P<out>[\w-]+))?$')
+
+# A required field whose hit rate falls below this is reported as a likely markup change
+LOW_HIT_RATE = 0.5
+
+
+class Selector:
+    """One compiled selector; finds an element (or value) inside a listing"""
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.hits = 0
+        self.own_attr = None
+        self.output = None
+        self.tag = None
+        self.kwargs = {}
+
+        if spec.startswith('@'):
+            self.own_attr = spec[1:]
+            return
+
+        match = SPEC_RE.match(spec)
+        if not match:
+            raise ValueError(f"Unsupported selector: {spec!r}")
+        self.tag = match.group('tag')
+        self.output = match.group('out')
+        if match.group('cls'):
+            self.kwargs['class_'] = match.group('cls')
+        attr = match.group('attr')
+        if attr:
+            op, val = match.group('op'), match.group('val')
+            if op is None:
+                value = True
+            elif op == '^=':
+                value = re.compile('^' + re.escape(val))
+            elif op == '*=':
+                value = re.compile(re.escape(val))
+            else:
+                value = val
+            if attr == 'class':
+                self.kwargs['class_'] = value
+            else:
+                self.kwargs.setdefault('attrs', {})[attr] = value
+        if match.group('text'):
+            self.kwargs['string'] = re.compile(re.escape(match.group('text')), re.I)
+
+    def strainer(self):
+        """SoupStrainer that keeps only elements this selector can match"""
+        if self.own_attr:
+            return SoupStrainer(attrs={self.own_attr: True})
+        if list(self.kwargs) == ['class_'] and isinstance(self.kwargs['class_'], str):
+            return class_strainer(self.tag, self.kwargs['class_'])
+        return SoupStrainer(self.tag, **self.kwargs)
+
+    def find_all(self, soup):
+        if self.own_attr:
+            return soup.find_all(attrs={self.own_attr: True})
+        return soup.find_all(self.tag, **self.kwargs)
+
+    def matches(self, element):
+        """True if find_all would return this lxml element (streamed pages)"""
+        if not isinstance(element.tag, str):
+            # Comments and processing instructions
+            return False
+        if self.own_attr:
+            return element.get(self.own_attr) is not None
+        if self.tag and element.tag != self.tag:
+            return False
+        for key, expected in self.kwargs.items():
+            if key == 'class_':
+                if not _class_matches(element.get('class'), expected):
+                    return False
+            elif key == 'attrs':
+                if not all(_value_matches(element.get(attr), value)
+                           for attr, value in expected.items()):
+                    return False
+            elif key == 'string':
+                if not expected.search("".join(element.itertext())):
+                    return False
+        return True
+
+    def extract(self, element):
+        """Return (matched, value) for this selector inside element"""
+        if self.own_attr:
+            value = element.get(self.own_attr)
+            return value is not None, value
+        found = element.find(self.tag, **self.kwargs)
+        if found is None:
+            return False, None
+        if self.output:
+            return True, found.get(self.output, '')
+        return True, found.text.strip()
+
+
+def _value_matches(actual, expected):
+    if actual is None:
+        return False
+    if expected is True:
+        return True
+    if isinstance(expected, str):
+        return actual == expected
+    return expected.search(actual) is not None
+
+
+def _class_matches(actual, expected):
+    # Like BeautifulSoup: any single class, or the whole attribute, may match
+    if actual is None:
+        return False
+    return any(_value_matches(value, expected) for value in actual.split() + [actual])
+
+
+class SelectorChain:
+    """Fallback selectors for one field, most successful first"""
+
+    def __init__(self, field, specs):
+        self.field = field
+        self.selectors = [Selector(spec) for spec in specs]
+        self.attempts = 0
+        self.misses = 0
+
+    def record_hit(self, index):
+        selector = self.selectors[index]
+        selector.hits += 1
+        # Promote a selector once it beats the one in front of it
+        if index and selector.hits > self.selectors[index - 1].hits:
+            self.selectors.sort(key=lambda s: -s.hits)
+
+    def extract(self, element):
+        """Value from the first matching selector, or None"""
+        self.attempts += 1
+        for index, selector in enumerate(self.selectors):
+            matched, value = selector.extract(element)
+            if matched:
+                self.record_hit(index)
+                return value
+        self.misses += 1
+        return None
+
+    def hit_rate(self):
+        return (self.attempts - self.misses) / self.attempts if self.attempts else None
+
+
+class SourceSpec:
+    """Compiled extraction table for one directory"""
+
+    def __init__(self, name, containers, fields, required=('name',)):
+        self.name = name
+        self.containers = SelectorChain('listing', containers)
+        self.fields = {field: SelectorChain(field, specs) for field, specs in fields.items()}
+        # Fields every listing should have; optional ones (website) miss legitimately
+        self.required = ('listing',) + tuple(required)
+        self.pages = 0
+        self.empty_pages = 0
+
+    def listings(self, html):
+        """Listing elements on a result page
+
+        Each container selector parses only its own elements; the selector
+        that found listings last time is tried first, so normally the page is
+        parsed once. html may also be an iterable of body chunks (a page still
+        downloading): listings then come out one by one as they close.
+        """
+        if not isinstance(html, (bytes, str)):
+            if STREAMING:
+                return self._stream_listings(html)
+            html = b"".join(html)
+        self.pages += 1
+        chain = self.containers
+        chain.attempts += 1
+        for index, selector in enumerate(chain.selectors):
+            results = selector.find_all(listing_soup(html, selector.strainer()))
+            if results:
+                chain.record_hit(index)
+                return results
+        chain.misses += 1
+        self.empty_pages += 1
+        return []
+
+    def _stream_listings(self, chunks):
+        """Listings of a page fed chunk by chunk, each yielded as soon as its element closes
+
+        The best container selector's matches go out straight away. Matches
+        of the fallbacks are held back until the page ends, and only used if
+        the best one found nothing (the same choice listings() makes).
+        """
+        self.pages += 1
+        chain = self.containers
+        chain.attempts += 1
+        best, *fallbacks = chain.selectors
+        held = {selector: [] for selector in fallbacks}
+        committed = False
+        for element in pull_elements(chunks):
+            if best.matches(element):
+                if not committed:
+                    committed = True
+                    held.clear()
+                    chain.record_hit(chain.selectors.index(best))
+                yield element_soup(element)
+                release(element)
+            elif not committed:
+                for selector in fallbacks:
+                    if selector.matches(element):
+                        held[selector].append(element_soup(element))
+        if committed:
+            return
+        for selector in fallbacks:
+            if held[selector]:
+                chain.record_hit(chain.selectors.index(selector))
+                yield from held[selector]
+                return
+        chain.misses += 1
+        self.empty_pages += 1
+
+    def extract(self, listing):
+        """{field: value or None} for one listing element"""
+        return {field: chain.extract(listing) for field, chain in self.fields.items()}
+
+    def stats(self):
+        """Hit counts per field and selector, in current (best-first) order"""
+        chains = [self.containers] + list(self.fields.values())
+        return {
+            chain.field: {
+                'attempts': chain.attempts,
+                'hit_rate': chain.hit_rate(),
+                'selectors': [(s.spec, s.hits) for s in chain.selectors],
+            }
+            for chain in chains
+        }
+
+    def counters(self):
+        """Raw page and hit counters, e.g. for shipping a parse worker's counts home"""
+        chains = [self.containers] + list(self.fields.values())
+        return {
+            'pages': self.pages,
+            'empty_pages': self.empty_pages,
+            'chains': {chain.field: (chain.attempts, chain.misses,
+                                     {s.spec: s.hits for s in chain.selectors})
+                       for chain in chains},
+        }
+
+    def add_counters(self, counters):
+        """Add counters() taken elsewhere (or a subtract_counters delta) to this spec"""
+        self.pages += counters['pages']
+        self.empty_pages += counters['empty_pages']
+        chains = [self.containers] + list(self.fields.values())
+        for chain in chains:
+            attempts, misses, hits = counters['chains'][chain.field]
+            chain.attempts += attempts
+            chain.misses += misses
+            for selector in chain.selectors:
+                selector.hits += hits.get(selector.spec, 0)
+            chain.selectors.sort(key=lambda s: -s.hits)
+
+    def report(self):
+        """Print selector hit rates and flag fields that look broken"""
+        print(f"\n🧩 {self.name} selectors ({self.pages} pages):")
+        for field, stats in self.stats().items():
+            if not stats['attempts']:
+                continue
+            rate = stats['hit_rate']
+            best = ", ".join(f"{spec}={hits}" for spec, hits in stats['selectors'])
+            broken = field in self.required and rate < LOW_HIT_RATE
+            flag = "  ⚠ markup may have changed" if broken else ""
+            print(f"   {field}: {rate * 100:.0f}% [{best}]{flag}")
+
+
+def subtract_counters(after, before):
+    """Counter growth between two SourceSpec.counters() snapshots"""
+    chains = {}
+    for field, (attempts, misses, hits) in after['chains'].items():
+        old_attempts, old_misses, old_hits = before['chains'][field]
+        chains[field] = (attempts - old_attempts, misses - old_misses,
+                         {spec: count - old_hits.get(spec, 0) for spec, count in hits.items()})
+    return {
+        'pages': after['pages'] - before['pages'],
+        'empty_pages': after['empty_pages'] - before['empty_pages'],
+        'chains': chains,
+    }
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Async fetch engine
+Runs directory requests concurrently while keeping per-host politeness limits
+"""
+
+import asyncio
+import functools
+import itertools
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from resilience import CircuitOpenError, retry_after
+
+
+def host_of(url):
+    """Return the host (netloc) a URL points at"""
+    return urlparse(url).netloc.lower()
+
+
+class AsyncFetchEngine:
+    """Fetch many URLs at once with a global concurrency cap
+
+    Politeness is enforced per host by a HostRateLimiter: each request waits
+    only on its own host's token bucket, so requests to *different*
+    directories interleave freely and no time is lost to a global sleep.
+
+    Jobs go into one priority queue per host, drained by a fixed pool of
+    max_concurrency workers per host, so a large crawl grid costs a few
+    coroutines rather than one task per page, and high-priority jobs are
+    fetched first. With a parser, fetching and parsing form a two-stage
+    pipeline joined by a bounded queue.
+
+    With a RetryPolicy, transient failures are put back on their host's
+    queue after a backoff instead of reaching the callback; with Breakers,
+    jobs for a host whose breaker is open are set aside (holding no worker)
+    until it lets a probe through, so healthy hosts keep every worker busy.
+    If nothing but set-aside jobs is left, they fail with CircuitOpenError
+    rather than waiting out the cooldown.
+    """
+
+    def __init__(self, session, limiter, max_concurrency=4, timeout=15, cache=None, parser=None,
+                 retry=None, breakers=None):
+        self.session = session
+        self.limiter = limiter
+        self.cache = cache
+        # Optional ParsePool: 200 responses are parsed in worker processes and
+        # reach the callback with the result in response.parsed
+        self.parser = parser
+        self.retry = retry
+        self.breakers = breakers
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.timeout = timeout
+        self._semaphore = None
+        self._executor = None
+        # Jobs queued and finished in the current fetch_all (follow-ups included)
+        self.queued = 0
+        self.completed = 0
+        # Retries sent per host in the current fetch_all
+        self.retried = Counter()
+
+    async def _fetch(self, url):
+        """Take a concurrency slot, wait for the host's token bucket, then fetch in a worker thread
+
+        The token is taken once the slot is held, right before the send: a
+        token taken earlier would let requests that queued on the semaphore
+        go out back to back once slots free up, closer together than the
+        host's limit.
+        """
+        host = host_of(url)
+        async with self._semaphore:
+            # Fresh cache hits never reach the network, so they skip the limiter
+            if self.cache is None or not self.cache.is_fresh(url, self.session.headers):
+                await self.limiter.acquire(host)
+            loop = asyncio.get_event_loop()
+            get = functools.partial(self.session.get, url, timeout=self.timeout)
+            started = time.perf_counter()
+            try:
+                return await loop.run_in_executor(self._executor, get)
+            finally:
+                self.limiter.record_fetch(host, time.perf_counter() - started)
+
+    async def _run(self, jobs, callback, priority, refill, poll):
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        loop = asyncio.get_event_loop()
+        queues = {}
+        workers = []
+        order = itertools.count()
+        idle = asyncio.Event()
+        # Fetched pages waiting for the parse stage; fetch workers block when it is full
+        parse_queue = asyncio.Queue(self.parser.queue_size) if self.parser else None
+        # Attempts made per job being retried; job -> (timer, held by an open breaker)
+        attempts = {}
+        parked = {}
+        self.queued = 0
+        self.completed = 0
+        self.retried = Counter()
+
+        def enqueue(job):
+            host = host_of(job[1])
+            if host not in queues:
+                queues[host] = asyncio.PriorityQueue()
+                workers.extend(asyncio.ensure_future(fetch_worker(queues[host]))
+                               for _ in range(self.max_concurrency))
+            # Ties keep submission order
+            queues[host].put_nowait((priority(job), next(order), job))
+
+        def spawn(job):
+            enqueue(job)
+            self.queued += 1
+
+        def complete(job, response, error):
+            try:
+                # Callbacks may return new jobs (e.g. the next result page)
+                for next_job in callback(job, response, error) or ():
+                    spawn(next_job)
+            finally:
+                self.completed += 1
+                settle()
+
+        def top_up():
+            """Queue what refill hands out; False once it says no more work will come"""
+            if refill is None:
+                return False
+            more = refill(self.queued - self.completed)
+            for next_job in more or ():
+                spawn(next_job)
+            return more is not None
+
+        def settle():
+            more = top_up()
+            if self.completed < self.queued:
+                give_up_if_blocked()
+            elif more:
+                # Nothing to do right now, but refill expects more later
+                loop.call_later(poll, settle)
+            else:
+                idle.set()
+
+        def park(job, delay, blocked):
+            """Take job off its queue for delay seconds (blocked: by an open breaker)"""
+            parked[job] = (loop.call_later(delay, unpark, job), blocked)
+            give_up_if_blocked()
+
+        def unpark(job):
+            if parked.pop(job, None) is not None:
+                enqueue(job)
+
+        def give_up_if_blocked():
+            # Only jobs held by open breakers remain: fail them now (the ledger
+            # keeps them for --resume) instead of idling through the cooldown
+            outstanding = self.queued - self.completed
+            if not parked or len(parked) != outstanding:
+                return
+            if not all(blocked for _, blocked in parked.values()):
+                return
+            held = list(parked.items())
+            parked.clear()
+            for job, (timer, _) in held:
+                timer.cancel()
+            for job, _ in held:
+                host = host_of(job[1])
+                complete(job, None, CircuitOpenError(host, self.breakers.get(host).retry_in()))
+
+        async def fetch_worker(queue):
+            while True:
+                _, _, job = await queue.get()
+                host = host_of(job[1])
+                breaker = self.breakers.get(host) if self.breakers is not None else None
+                if breaker is not None and not breaker.allow():
+                    park(job, max(breaker.retry_in(), 0.1), blocked=True)
+                    continue
+                response = error = None
+                try:
+                    response = await self._fetch(job[1])
+                except Exception as e:
+                    error = e
+                if breaker is not None and breaker.record(response, error):
+                    # Probe succeeded: release everything held for this host
+                    for held in [held for held in parked if host_of(held[1]) == host]:
+                        parked[held][0].cancel()
+                        unpark(held)
+                if self.retry is not None:
+                    attempt = attempts.get(job, 1)
+                    delay = self.retry.backoff(attempt, response, error)
+                    if delay is not None:
+                        attempts[job] = attempt + 1
+                        self.retried[host] += 1
+                        if retry_after(response) is not None:
+                            # The server named a time: hold the whole host, not just this job
+                            self.limiter.pause(host, delay)
+                        park(job, delay, blocked=False)
+                        continue
+                    attempts.pop(job, None)
+                if error is not None:
+                    complete(job, None, error)
+                    continue
+                if parse_queue is not None and response.status_code == 200:
+                    await parse_queue.put((job, response))
+                else:
+                    complete(job, response, None)
+
+        async def parse_worker():
+            while True:
+                job, response = await parse_queue.get()
+                try:
+                    response.parsed = await self.parser.parse(job, response.content)
+                except Exception as e:
+                    complete(job, None, e)
+                else:
+                    complete(job, response, None)
+
+        if parse_queue is not None:
+            workers.extend(asyncio.ensure_future(parse_worker())
+                           for _ in range(self.parser.workers))
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            self._executor = executor
+            for job in jobs:
+                spawn(job)
+            settle()
+            waiter = asyncio.ensure_future(idle.wait())
+            try:
+                while True:
+                    await asyncio.wait([waiter] + workers, return_when=asyncio.FIRST_COMPLETED)
+                    # Workers only stop on an error raised by the callback
+                    for worker in workers:
+                        if worker.done():
+                            worker.result()
+                    if waiter.done():
+                        break
+            finally:
+                for task in [waiter] + workers:
+                    task.cancel()
+                await asyncio.gather(waiter, *workers, return_exceptions=True)
+        self._executor = None
+
+    def fetch_all(self, jobs, callback, priority=None, refill=None, poll=1.0):
+        """Fetch every job and hand each result to callback as it arrives
+
+        jobs is a list of tuples whose second item is the URL. callback is
+        called as callback(job, response, error) on the event loop thread,
+        so it may safely append to shared lists; any jobs it returns are
+        queued too. priority(job) returns a sort key, lowest first; without
+        it jobs run in submission order. Returns elapsed seconds.
+
+        refill(outstanding), if given, is called at the start and after every
+        finished job to top the queues up from an outside source (e.g. units
+        claimed from a shared ledger). It returns jobs to add, [] for nothing
+        yet (asked again every poll seconds once the queues are empty), or
+        None when no more work will come; the run ends at the first None
+        with nothing outstanding.
+        """
+        started = time.perf_counter()
+        asyncio.run(self._run(list(jobs), callback, priority or (lambda job: 0), refill, poll))
+        return time.perf_counter() - started
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Adaptive geographic sharding
+A directory only shows a capped number of results for one search, so a
+statewide query reaches a small share of the state's businesses. Sharded
+crawls start from the given locations (the whole state by default) and
+split a search that saturates - its last reachable page is full, or still
+links to a next one - into the state's cities, and a saturated city into
+its ZIP codes, using the offline gazetteer in illinois_gazetteer.csv (every
+Illinois city and ZIP code in the USPS data). A search whose pages brought
+only leads the same directory already gave us is pruned: it is not split,
+since its smaller shards would mostly repeat it as well.
+"""
+
+import csv
+import os
+from functools import lru_cache
+
+from crawl_grid import STATE, STATE_CODE, city_of, location_for
+from lead_sink import lead_key
+
+GAZETTEER_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'illinois_gazetteer.csv')
+
+STATE_LEVEL, CITY_LEVEL, ZIP_LEVEL = 0, 1, 2
+LEVEL_NAMES = ('state', 'city', 'ZIP')
+
+# Deepest page a directory serves for one search, whatever max_pages says
+SITE_PAGE_CAPS = {
+    'YellowPages': 100,
+    'Superpages': 100,
+    'Yelp': 24,
+}
+# Manta searches by state and city only: a ZIP shard would repeat its city
+MAX_LEVELS = {
+    'Manta': CITY_LEVEL,
+}
+
+
+@lru_cache(maxsize=None)
+def load_gazetteer(path=GAZETTEER_FILE):
+    """{city: (population, [ZIP codes])}, biggest cities first (read once per path)
+
+    Only the delivery ZIP codes a search can be narrowed to are listed
+    (not PO box or single-organization ones); a town with no population
+    figure counts as 0 and keeps its place in the file, most ZIP codes first.
+    """
+    with open(path, newline='', encoding='utf-8') as csvfile:
+        rows = [(row['city'], int(row['population'] or 0), row['zips'].split())
+                for row in csv.DictReader(csvfile)]
+    rows.sort(key=lambda row: -row[1])
+    return {city: (population, zips) for city, population, zips in rows}
+
+
+def zip_location(city, zip_code):
+    """('Chicago', '60601') -> 'Chicago, IL 60601' (city_of still finds the city)"""
+    return f"{city}, {STATE_CODE} {zip_code}"
+
+
+def zip_of(location):
+    """ZIP code of a ZIP shard's location, else None"""
+    last = location.rsplit(' ', 1)[-1]
+    return last if len(last) == 5 and last.isdigit() else None
+
+
+def shard_level(location):
+    if location == STATE:
+        return STATE_LEVEL
+    return ZIP_LEVEL if zip_of(location) else CITY_LEVEL
+
+
+def sub_locations(location, places=None):
+    """Locations one level below location: the state's cities, or a city's ZIP codes"""
+    places = places if places is not None else load_gazetteer()
+    level = shard_level(location)
+    if level == STATE_LEVEL:
+        return [location_for(city) for city in places]
+    if level == CITY_LEVEL:
+        city = city_of(location)
+        return [zip_location(city, zip_code) for zip_code in places.get(city, (0, []))[1]]
+    return []
+
+
+class ShardPlanner:
+    """Decides, page by page, whether a search continues, splits or stops
+
+    Leads are remembered per directory by their dedupe key, so a search is
+    pruned when every lead on all its pages was already found by another
+    search of the same directory (any category). Its first pages alone say
+    little: they hold the best-ranked listings, which the bigger area's
+    search has usually shown already. A page counts as full when it has
+    as many listings as the directory's biggest page so far.
+    """
+
+    def __init__(self, max_pages, places=None):
+        self.max_pages = max_pages
+        self.places = places if places is not None else load_gazetteer()
+        self.seen = set()
+        # (source, category, location) -> new leads over the search's pages so far
+        self.found = {}
+        self.page_sizes = {}
+        self.searches = set()
+        self.planned = [0] * len(LEVEL_NAMES)
+        self.new_leads = [0] * len(LEVEL_NAMES)
+        self.split = 0
+        self.pruned = 0
+
+    def plan(self, units):
+        """Register page-1 searches; returns the ones not planned before"""
+        added = []
+        for unit in units:
+            if unit[:3] not in self.searches:
+                self.searches.add(unit[:3])
+                self.planned[shard_level(unit.location)] += 1
+                added.append(unit)
+        return added
+
+    def page_limit(self, source):
+        return min(self.max_pages, SITE_PAGE_CAPS.get(source, self.max_pages))
+
+    def record(self, unit, leads):
+        """Remember a page's leads; returns how many were new for its directory"""
+        new = 0
+        for lead in leads:
+            if lead['business_name'] == "N/A":
+                continue
+            key = (unit.source, lead_key(lead))
+            if key not in self.seen:
+                self.seen.add(key)
+                new += 1
+        self.new_leads[shard_level(unit.location)] += new
+        return new
+
+    def follow_ups(self, unit, has_next, leads):
+        """Units to fetch after one search page: its next page, smaller shards, or none"""
+        key = unit[:3]
+        self.found[key] = self.found.get(key, 0) + self.record(unit, leads)
+        full = len(leads) >= self.page_sizes.get(unit.source, 1)
+        self.page_sizes[unit.source] = max(len(leads), self.page_sizes.get(unit.source, 0))
+        if unit.page < self.page_limit(unit.source):
+            return [unit._replace(page=unit.page + 1)] if has_next else []
+        # Last reachable page: saturated if the site would (or could) show more
+        if not (has_next or full):
+            return []
+        if not self.found[key]:
+            self.pruned += 1
+            return []
+        if shard_level(unit.location) >= MAX_LEVELS.get(unit.source, ZIP_LEVEL):
+            return []
+        children = self.plan(unit._replace(location=location, page=1)
+                             for location in sub_locations(unit.location, self.places))
+        if children:
+            self.split += 1
+        return children
+
+    def report(self):
+        searches = " | ".join(f"{count} {name}" for name, count in zip(LEVEL_NAMES, self.planned)
+                              if count)
+        leads = " | ".join(f"{count} from {name}" for name, count in zip(LEVEL_NAMES, self.new_leads)
+                           if count)
+        print(f"\n🧭 Shards: {searches} searches | {self.split} split when saturated | "
+              f"{self.pruned} pruned as already seen")
+        if leads:
+            print(f"   New leads by level: {leads}")
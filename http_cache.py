@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Persistent on-disk HTTP response cache
+Mounted under the requests.Session as a transport adapter, so every scrape_*
+call goes through it. Bodies are stored content-addressed (by SHA-256) next to
+a small SQLite index holding TTLs, validators and LRU timestamps.
+"""
+
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from fetch_engine import host_of
+from transport import TransportAdapter, accept_encoding
+
+# Request headers that change what a directory sends back
+VARY_HEADERS = ('Accept', 'Accept-Language')
+
+# Response headers that no longer apply once the body is stored decoded
+# (lowercase: servers send them in any case)
+_DROP_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding')
+
+
+class HttpCache:
+    """Content-addressed response store with per-host TTL and LRU size cap"""
+
+    def __init__(self, directory='.http_cache', default_ttl=12 * 3600, ttls=None,
+                 max_bytes=256 * 1024 * 1024):
+        self.directory = directory
+        self.default_ttl = default_ttl
+        self.ttls = dict(ttls or {})
+        self.max_bytes = max_bytes
+        self.counters = {'hits': 0, 'misses': 0, 'revalidated': 0, 'stored': 0, 'evicted': 0}
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.join(directory, 'blobs'), exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(directory, 'index.sqlite3'),
+                                   check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                url TEXT,
+                status INTEGER,
+                headers TEXT,
+                body_hash TEXT,
+                size INTEGER,
+                stored_at REAL,
+                last_used REAL,
+                etag TEXT,
+                last_modified TEXT
+            )""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+        self._db.commit()
+
+    def set_ttl(self, host, seconds):
+        """Override the TTL for one host"""
+        self.ttls[host] = seconds
+
+    @staticmethod
+    def key(url, headers):
+        """Cache key over the URL and the headers in VARY_HEADERS"""
+        parts = [url] + [f"{name}:{headers.get(name, '')}" for name in VARY_HEADERS]
+        return hashlib.sha256("\n".join(parts).encode('utf-8')).hexdigest()
+
+    def _blob_path(self, body_hash):
+        return os.path.join(self.directory, 'blobs', body_hash[:2], body_hash)
+
+    def lookup(self, key):
+        """Return the stored entry as a dict, or None"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT url, status, headers, body_hash, stored_at, etag, last_modified "
+                "FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        url, status, headers, body_hash, stored_at, etag, last_modified = row
+        return {'url': url, 'status': status, 'headers': json.loads(headers),
+                'body_hash': body_hash, 'stored_at': stored_at,
+                'etag': etag, 'last_modified': last_modified}
+
+    def is_fresh(self, url, headers, entry=None):
+        """True when url can be answered from disk without touching the network"""
+        if entry is None:
+            entry = self.lookup(self.key(url, headers))
+        if entry is None:
+            return False
+        ttl = self.ttls.get(host_of(url), self.default_ttl)
+        return time.time() - entry['stored_at'] < ttl
+
+    def read_body(self, entry):
+        with open(self._blob_path(entry['body_hash']), 'rb') as f:
+            return f.read()
+
+    def touch(self, key, refreshed=False):
+        """Mark an entry as used; refreshed=True restarts its TTL (after a 304)"""
+        now = time.time()
+        with self._lock:
+            if refreshed:
+                self._db.execute("UPDATE entries SET last_used = ?, stored_at = ? WHERE key = ?",
+                                 (now, now, key))
+            else:
+                self._db.execute("UPDATE entries SET last_used = ? WHERE key = ?", (now, key))
+            self._db.commit()
+
+    def store(self, key, url, status, headers, body):
+        """Write body (content-addressed) and its index entry, then enforce the size cap"""
+        body_hash = hashlib.sha256(body).hexdigest()
+        path = self._blob_path(body_hash)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, 'wb') as f:
+                f.write(body)
+            os.replace(tmp, path)
+
+        headers = CaseInsensitiveDict((k, v) for k, v in headers.items()
+                                      if k.lower() not in _DROP_HEADERS)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, status, json.dumps(dict(headers)), body_hash, len(body), now, now,
+                 headers.get('ETag'), headers.get('Last-Modified')))
+            self._db.commit()
+            self.counters['stored'] += 1
+            self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries until the blobs fit in max_bytes"""
+        total = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT body_hash, size FROM entries)"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._db.execute("SELECT key, body_hash, size FROM entries ORDER BY last_used").fetchall()
+        for key, body_hash, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self.counters['evicted'] += 1
+            still_used = self._db.execute(
+                "SELECT 1 FROM entries WHERE body_hash = ? LIMIT 1", (body_hash,)).fetchone()
+            if not still_used:
+                total -= size
+                try:
+                    os.remove(self._blob_path(body_hash))
+                except OSError:
+                    pass
+        self._db.commit()
+
+    def count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def report(self):
+        """Print hit/miss counters"""
+        c = self.counters
+        lookups = c['hits'] + c['misses'] + c['revalidated']
+        hit_rate = (c['hits'] + c['revalidated']) / lookups * 100 if lookups else 0.0
+        print(f"\n💾 HTTP cache: {c['hits']} hits | {c['revalidated']} revalidated (304) | "
+              f"{c['misses']} misses | {hit_rate:.0f}% served from disk | "
+              f"{c['stored']} stored | {c['evicted']} evicted")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class CachingAdapter(TransportAdapter):
+    """TransportAdapter that answers GETs from an HttpCache and revalidates stale entries"""
+
+    def __init__(self, cache, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+
+    def _cached_response(self, request, entry):
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response._content = self.cache.read_body(entry)
+        # Body already in memory: close() and iter_content() must not touch .raw
+        response._content_consumed = True
+        response.url = request.url
+        response.request = request
+        response.reason = 'OK'
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.from_cache = True
+        return response
+
+    def send(self, request, **kwargs):
+        if request.method != 'GET':
+            return super().send(request, **kwargs)
+
+        key = self.cache.key(request.url, request.headers)
+        entry = self.cache.lookup(key)
+        if entry is not None and self.cache.is_fresh(request.url, request.headers, entry):
+            self.cache.count('hits')
+            self.cache.touch(key)
+            return self._cached_response(request, entry)
+
+        # Stale: ask the server whether our copy is still good
+        if entry is not None:
+            if entry['etag']:
+                request.headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                request.headers['If-Modified-Since'] = entry['last_modified']
+
+        response = super().send(request, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            response.close()
+            self.cache.count('revalidated')
+            self.cache.touch(key, refreshed=True)
+            return self._cached_response(request, entry)
+
+        self.cache.count('misses')
+        if response.status_code == 200 and 'no-store' not in response.headers.get('Cache-Control', ''):
+            store = functools.partial(self.cache.store, key, request.url, response.status_code,
+                                      response.headers)
+            if kwargs.get('stream'):
+                # Reading .content here would download the whole body up front; the
+                # reader stores it once it has read it all (see pagination.PageStream)
+                response.cache_store = store
+            else:
+                store(response.content)
+        response.from_cache = False
+        return response
+
+
+def install_cache(session, cache, **kwargs):
+    """Mount a CachingAdapter for http:// and https:// on session (kwargs: TransportAdapter's)"""
+    adapter = CachingAdapter(cache, **kwargs)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['Accept-Encoding'] = accept_encoding()
+    return adapter
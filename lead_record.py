@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Compact lead records
+A lead dict costs a hash table plus its own copy of strings that repeat in
+every record ('Illinois', 'YellowPages', 'No', 'N/A', the category). Lead
+keeps the eight fields in __slots__ with those values interned; LeadBatch
+stores many leads column by column, free text in lists and low-cardinality
+fields as small integer codes into a per-column vocabulary.
+
+Both read like the lead dicts the parsers yield (lead['phone'], .get(),
+.keys()), so csv.DictWriter, LeadStore and dedupe take them unchanged.
+"""
+
+import csv
+import sys
+from array import array
+
+from lead_sink import FIELDNAMES, replace_file
+
+# Few distinct values across a whole run: stored as codes in a LeadBatch
+CODED_FIELDS = ('source', 'has_website', 'category', 'state')
+TEXT_FIELDS = tuple(field for field in FIELDNAMES if field not in CODED_FIELDS)
+# Placeholders that fill free-text fields over and over
+COMMON_VALUES = frozenset(("N/A", "Check Yelp", "Unknown", "Yes", "No", ""))
+# Set-like, as csv.DictWriter expects from keys()
+_KEYS = dict.fromkeys(FIELDNAMES).keys()
+
+
+def _shared(field, value):
+    """One string object per low-cardinality value"""
+    if isinstance(value, str) and (field in CODED_FIELDS or value in COMMON_VALUES):
+        return sys.intern(value)
+    return value
+
+
+class Lead:
+    """One lead in __slots__ (no per-record dict), repeated values interned"""
+
+    __slots__ = tuple(FIELDNAMES)
+
+    def __init__(self, source="", business_name="N/A", phone="N/A", address="N/A",
+                 has_website="No", website="N/A", category="", state="Illinois"):
+        for field, value in zip(FIELDNAMES, (source, business_name, phone, address,
+                                             has_website, website, category, state)):
+            object.__setattr__(self, field, _shared(field, value))
+
+    @classmethod
+    def from_dict(cls, lead):
+        """Lead from a lead dict (or another Lead); extra keys are dropped"""
+        if isinstance(lead, cls):
+            return lead
+        return cls(*(lead.get(field, "") for field in FIELDNAMES))
+
+    def __setattr__(self, field, value):
+        object.__setattr__(self, field, _shared(field, value))
+
+    def __getitem__(self, field):
+        try:
+            return getattr(self, field)
+        except (AttributeError, TypeError):
+            raise KeyError(field) from None
+
+    def __setitem__(self, field, value):
+        if field not in self.__slots__:
+            raise KeyError(field)
+        setattr(self, field, value)
+
+    def get(self, field, default=None):
+        return getattr(self, field, default) if field in self.__slots__ else default
+
+    def keys(self):
+        return _KEYS
+
+    def values(self):
+        return [getattr(self, field) for field in FIELDNAMES]
+
+    def items(self):
+        return list(zip(FIELDNAMES, self.values()))
+
+    def __iter__(self):
+        return iter(FIELDNAMES)
+
+    def __len__(self):
+        return len(FIELDNAMES)
+
+    def __contains__(self, field):
+        return field in self.__slots__
+
+    def __eq__(self, other):
+        if isinstance(other, (Lead, dict)):
+            return all(self[field] == other.get(field) for field in FIELDNAMES)
+        return NotImplemented
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def __getstate__(self):
+        return self.values()
+
+    def __setstate__(self, values):
+        for field, value in zip(FIELDNAMES, values):
+            setattr(self, field, value)
+
+    def __repr__(self):
+        return f"Lead({self.business_name!r}, source={self.source!r}, phone={self.phone!r})"
+
+
+class LeadBatch:
+    """Leads stored column by column
+
+    Appending takes a lead dict or Lead; indexing or iterating hands back
+    Lead records built on the fly. Low-cardinality columns hold 2-byte
+    codes (widened to 4 bytes past 65535 distinct values).
+    """
+
+    def __init__(self, leads=()):
+        self._text = {field: [] for field in TEXT_FIELDS}
+        self._codes = {field: array('H') for field in CODED_FIELDS}
+        self._vocab = {field: [] for field in CODED_FIELDS}
+        self._index = {field: {} for field in CODED_FIELDS}
+        self.extend(leads)
+
+    def _code(self, field, value):
+        index = self._index[field]
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(self._vocab[field])
+            self._vocab[field].append(sys.intern(value) if isinstance(value, str) else value)
+            if code > 0xFFFF and self._codes[field].typecode == 'H':
+                self._codes[field] = array('I', self._codes[field])
+        return code
+
+    def append(self, lead):
+        for field in TEXT_FIELDS:
+            self._text[field].append(_shared(field, lead.get(field, "")))
+        for field in CODED_FIELDS:
+            # Code first: a new code may swap the column for a wider array
+            code = self._code(field, lead.get(field, ""))
+            self._codes[field].append(code)
+
+    def extend(self, leads):
+        for lead in leads:
+            self.append(lead)
+
+    def __len__(self):
+        return len(self._text['business_name'])
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self.take(range(*i.indices(len(self))))
+        if i < 0:
+            i += len(self)
+        return Lead(*(self._value(field, i) for field in FIELDNAMES))
+
+    def __setitem__(self, i, lead):
+        """Overwrite row i with a lead dict or Lead"""
+        for field in TEXT_FIELDS:
+            self._text[field][i] = _shared(field, lead.get(field, ""))
+        for field in CODED_FIELDS:
+            self._codes[field][i] = self._code(field, lead.get(field, ""))
+
+    def take(self, indexes):
+        """New batch of the given rows, copied column by column"""
+        indexes = list(indexes)
+        batch = LeadBatch()
+        for field in TEXT_FIELDS:
+            column = self._text[field]
+            batch._text[field] = [column[i] for i in indexes]
+        for field in CODED_FIELDS:
+            codes = self._codes[field]
+            batch._codes[field] = array(codes.typecode, [codes[i] for i in indexes])
+            batch._vocab[field] = list(self._vocab[field])
+            batch._index[field] = dict(self._index[field])
+        return batch
+
+    def row(self, i):
+        """Row i as a plain lead dict (cheaper than a Lead for short-lived use)"""
+        return {field: self._value(field, i) for field in FIELDNAMES}
+
+    def _value(self, field, i):
+        if field in self._text:
+            return self._text[field][i]
+        return self._vocab[field][self._codes[field][i]]
+
+    def __iter__(self):
+        columns = [self.column(field) for field in FIELDNAMES]
+        return (Lead(*values) for values in zip(*columns))
+
+    def column(self, field):
+        """Every value of one field, in row order"""
+        if field in self._text:
+            return self._text[field]
+        vocab = self._vocab[field]
+        return [vocab[code] for code in self._codes[field]]
+
+    def count(self, field, value):
+        """Rows whose field equals value (a code comparison for coded fields)"""
+        if field in self._text:
+            return self._text[field].count(value)
+        code = self._index[field].get(value)
+        return 0 if code is None else self._codes[field].count(code)
+
+    def statistics(self):
+        """{'total', 'no_website'} as printed after an export"""
+        return {'total': len(self), 'no_website': self.count('has_website', 'No')}
+
+    def write_csv(self, filename):
+        """Write every row to a lead CSV, replacing it atomically; returns the row count"""
+        columns = [self.column(field) for field in FIELDNAMES]
+        with replace_file(filename) as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(FIELDNAMES)
+            writer.writerows(zip(*columns))
+        return len(self)
+
+    @classmethod
+    def read_csv(cls, filename):
+        """Load a lead CSV straight into columns"""
+        batch = cls()
+        with open(filename, newline='', encoding='utf-8') as csvfile:
+            batch.extend(csv.DictReader(csvfile))
+        return batch
+
+    def __repr__(self):
+        return f"<LeadBatch of {len(self)} leads>"
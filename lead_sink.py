@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Streaming CSV export
+Writes each new (deduplicated) lead to disk as soon as it is produced, so a
+crash or Ctrl-C never loses the leads found so far and memory stays flat.
+"""
+
+import contextlib
+import csv
+import hashlib
+import os
+import shutil
+import tempfile
+from datetime import datetime
+
+FIELDNAMES = ['source', 'business_name', 'phone', 'address',
+              'has_website', 'website', 'category', 'state']
+
+
+def timestamped_filename(prefix="illinois_leads", extension="csv"):
+    """illinois_leads_YYYYMMDD_HHMMSS.csv"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return f"{prefix}_{timestamp}.{extension}"
+
+
+@contextlib.contextmanager
+def replace_file(filename):
+    """Open a temp file next to filename for writing; it replaces filename once complete
+
+    The temp file is fsynced and then os.replace()d over filename, so a
+    crash or Ctrl-C mid-write leaves the old file whole instead of truncated.
+    """
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, tmp = tempfile.mkstemp(prefix=f".{os.path.basename(filename)}.", suffix=".tmp",
+                               dir=directory)
+    try:
+        with os.fdopen(fd, 'w', newline='', encoding='utf-8') as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(filename):
+            shutil.copymode(filename, tmp)
+        os.replace(tmp, filename)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp)
+        raise
+
+
+def lead_key(lead):
+    """8-byte digest of the (name, phone) dedupe key used by run_search"""
+    raw = f"{lead['business_name'].lower()}\x1f{lead['phone']}".encode('utf-8')
+    return hashlib.blake2b(raw, digest_size=8).digest()
+
+
+class CsvLeadSink:
+    """Append-only CSV writer with batched flushes and fsync checkpoints
+
+    Only an 8-byte digest per unique lead is kept in memory for dedupe.
+    Re-opening an existing file continues it: its rows seed the dedupe set
+    and the statistics, and new rows are appended below them.
+    """
+
+    def __init__(self, filename, batch_size=25, checkpoint_every=250):
+        self.filename = filename
+        self.batch_size = batch_size
+        self.checkpoint_every = checkpoint_every
+        self.seen = set()
+        self.total = 0
+        self.no_website = 0
+        self.duplicates = 0
+        self._pending = 0
+        self._since_checkpoint = 0
+
+        resuming = os.path.exists(filename) and os.path.getsize(filename) > 0
+        if resuming:
+            with open(filename, newline='', encoding='utf-8') as csvfile:
+                for lead in csv.DictReader(csvfile):
+                    self._count(lead)
+        self._file = open(filename, 'a', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=FIELDNAMES)
+        if not resuming:
+            self._writer.writeheader()
+            self.checkpoint()
+
+    def _count(self, lead):
+        self.seen.add(lead_key(lead))
+        self.total += 1
+        if lead['has_website'] == 'No':
+            self.no_website += 1
+
+    def add(self, lead):
+        """Write lead unless it is a duplicate; returns True if it was written"""
+        if lead['business_name'] == "N/A":
+            return False
+        if lead_key(lead) in self.seen:
+            self.duplicates += 1
+            return False
+
+        self._writer.writerow(lead)
+        self._count(lead)
+        self._pending += 1
+        self._since_checkpoint += 1
+        if self._since_checkpoint >= self.checkpoint_every:
+            self.checkpoint()
+        elif self._pending >= self.batch_size:
+            self.flush()
+        return True
+
+    def flush(self):
+        """Hand buffered rows to the OS"""
+        self._file.flush()
+        self._pending = 0
+
+    def checkpoint(self):
+        """Flush and fsync so rows survive a crash or power loss"""
+        self.flush()
+        os.fsync(self._file.fileno())
+        self._since_checkpoint = 0
+
+    def close(self):
+        """Final checkpoint; a file that never got a lead is removed"""
+        if self._file.closed:
+            return
+        self.checkpoint()
+        self._file.close()
+        if self.total == 0:
+            os.remove(self.filename)
+
+    def print_statistics(self):
+        """Same summary export_to_csv prints, computed as rows were written"""
+        if not self.total:
+            print("\n❌ No leads to export!")
+            return
+        print(f"\n✅ Exported {self.total} leads to {self.filename}")
+        if self.duplicates:
+            print(f"   Skipped {self.duplicates} duplicates")
+        print(f"\n📊 Statistics:")
+        print(f"   Total leads: {self.total}")
+        print(f"   Without website: {self.no_website} ({self.no_website/self.total*100:.1f}%)")
+        print(f"   With website: {self.total - self.no_website}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Persistent SQLite lead store
+Leads from every run are upserted on a normalized (name, phone) key with
+first-seen / last-seen timestamps, so weekly runs can export just the leads
+that are new or have changed since last time. Changes are tracked per
+source: each directory formats the same business's address differently, so
+a lead only counts as changed when the source that listed it before lists
+it differently now.
+"""
+
+import csv
+import hashlib
+import re
+import sqlite3
+import time
+from datetime import datetime
+
+from lead_sink import FIELDNAMES, replace_file
+
+NEW = 'new'
+CHANGED = 'changed'
+UNCHANGED = 'unchanged'
+
+_PUNCT_RE = re.compile(r'[^\w\s]')
+_SPACE_RE = re.compile(r'\s+')
+_DIGITS_RE = re.compile(r'\D')
+
+# Fields whose change makes a stored lead count as "changed"
+TRACKED_FIELDS = ('address', 'has_website', 'website', 'phone')
+
+
+def normalize_text(text):
+    """Lowercase, drop punctuation and collapse whitespace"""
+    if not text or text == "N/A":
+        return ""
+    return _SPACE_RE.sub(' ', _PUNCT_RE.sub(' ', text.lower())).strip()
+
+
+def normalize_phone(phone):
+    """Digits only, without a leading US country code"""
+    digits = _DIGITS_RE.sub('', phone or "")
+    if len(digits) == 11 and digits.startswith('1'):
+        digits = digits[1:]
+    return digits
+
+
+def parse_since(text):
+    """'2024-11-01' or '2024-11-01T08:00' (local time) -> Unix timestamp, for export_changes"""
+    return datetime.fromisoformat(text).timestamp()
+
+
+def content_hash(lead):
+    raw = "\x1f".join(str(lead.get(field, "")) for field in TRACKED_FIELDS)
+    return hashlib.blake2b(raw.encode('utf-8'), digest_size=8).hexdigest()
+
+
+class LeadStore:
+    """Indexed lead table shared across runs"""
+
+    def __init__(self, path='leads.sqlite3', batch_size=200):
+        self.path = path
+        self.batch_size = batch_size
+        self.counts = {NEW: 0, CHANGED: 0, UNCHANGED: 0}
+        self.run_started = time.time()
+        self._pending = 0
+
+        # Several crawl workers may upsert at once: wait for the write lock
+        self._db = sqlite3.connect(path, timeout=30.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS leads (
+                id INTEGER PRIMARY KEY,
+                source TEXT,
+                business_name TEXT,
+                phone TEXT,
+                address TEXT,
+                has_website TEXT,
+                website TEXT,
+                category TEXT,
+                state TEXT,
+                name_norm TEXT NOT NULL,
+                phone_norm TEXT NOT NULL,
+                address_norm TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                changed_at REAL NOT NULL
+            );
+            CREATE UNIQUE INDEX IF NOT EXISTS leads_key ON leads (name_norm, phone_norm);
+            CREATE INDEX IF NOT EXISTS leads_phone ON leads (phone_norm);
+            CREATE INDEX IF NOT EXISTS leads_address ON leads (address_norm);
+            CREATE INDEX IF NOT EXISTS leads_changed ON leads (changed_at);
+            CREATE TABLE IF NOT EXISTS source_hashes (
+                lead_id INTEGER NOT NULL,
+                source TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                PRIMARY KEY (lead_id, source)
+            );
+        """)
+        self._db.commit()
+
+    def add(self, lead, seen_at=None):
+        """Upsert one lead; returns 'new', 'changed' or 'unchanged'"""
+        if lead['business_name'] == "N/A":
+            return UNCHANGED
+        seen_at = seen_at or time.time()
+        name_norm = normalize_text(lead['business_name'])
+        phone_norm = normalize_phone(lead['phone'])
+        digest = content_hash(lead)
+
+        source = lead.get('source', "")
+
+        row = self._db.execute(
+            "SELECT id, content_hash, source FROM leads WHERE name_norm = ? AND phone_norm = ?",
+            (name_norm, phone_norm)).fetchone()
+        values = tuple(lead.get(field, "") for field in FIELDNAMES)
+        if row is None:
+            cursor = self._db.execute(
+                f"INSERT INTO leads ({', '.join(FIELDNAMES)}, name_norm, phone_norm, address_norm, "
+                f"content_hash, first_seen, last_seen, changed_at) "
+                f"VALUES ({', '.join('?' * len(FIELDNAMES))}, ?, ?, ?, ?, ?, ?, ?)",
+                values + (name_norm, phone_norm, normalize_text(lead['address']), digest,
+                          seen_at, seen_at, seen_at))
+            lead_id, known, status = cursor.lastrowid, None, NEW
+        else:
+            lead_id = row[0]
+            known = self._db.execute(
+                "SELECT content_hash FROM source_hashes WHERE lead_id = ? AND source = ?",
+                (lead_id, source)).fetchone()
+            if known is not None:
+                known = known[0]
+            elif row[2] == source:
+                # Stored before hashes were kept per source
+                known = row[1]
+            if known is not None and known != digest:
+                self._db.execute(
+                    f"UPDATE leads SET {', '.join(f'{field} = ?' for field in FIELDNAMES)}, "
+                    f"address_norm = ?, content_hash = ?, last_seen = ?, changed_at = ? WHERE id = ?",
+                    values + (normalize_text(lead['address']), digest, seen_at, seen_at, lead_id))
+                status = CHANGED
+            else:
+                # Same listing again, or a business already known listed by another source
+                self._db.execute("UPDATE leads SET last_seen = ? WHERE id = ?", (seen_at, lead_id))
+                status = UNCHANGED
+        if known != digest:
+            self._db.execute("INSERT OR REPLACE INTO source_hashes VALUES (?, ?, ?)",
+                             (lead_id, source, digest))
+
+        self.counts[status] += 1
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self.flush()
+        return status
+
+    def flush(self):
+        """Commit pending upserts"""
+        self._db.commit()
+        self._pending = 0
+
+    def find(self, name=None, phone=None, address=None):
+        """Look leads up by normalized name, phone or address (all indexed)"""
+        clauses, params = [], []
+        if name is not None:
+            clauses.append("name_norm = ?")
+            params.append(normalize_text(name))
+        if phone is not None:
+            clauses.append("phone_norm = ?")
+            params.append(normalize_phone(phone))
+        if address is not None:
+            clauses.append("address_norm = ?")
+            params.append(normalize_text(address))
+        where = " AND ".join(clauses) or "1"
+        cursor = self._db.execute(f"SELECT {', '.join(FIELDNAMES)} FROM leads WHERE {where}", params)
+        return [dict(zip(FIELDNAMES, row)) for row in cursor]
+
+    def export_changes(self, filename, since=None):
+        """Write leads first seen or changed since `since` (default: this run) to CSV"""
+        self.flush()
+        since = self.run_started if since is None else since
+        cursor = self._db.execute(
+            f"SELECT {', '.join(FIELDNAMES)} FROM leads WHERE changed_at >= ? ORDER BY id", (since,))
+        written = 0
+        with replace_file(filename) as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(FIELDNAMES)
+            for row in cursor:
+                writer.writerow(row)
+                written += 1
+        print(f"\n✅ Exported {written} new or changed leads to {filename}")
+        return written
+
+    def total(self):
+        return self._db.execute("SELECT COUNT(*) FROM leads").fetchone()[0]
+
+    def report(self):
+        c = self.counts
+        print(f"\n🗄  Lead store ({self.path}): {c[NEW]} new | {c[CHANGED]} changed | "
+              f"{c[UNCHANGED]} already known | {self.total()} total")
+
+    def close(self):
+        self.flush()
+        self._db.close()
@@ -4,195 +4,423 @@ Illinois Business Lead Scraper
 Searches multiple directories for businesses that may need IT services or pentesting
 """
 
+import argparse
+import os
 import requests
-from bs4 import BeautifulSoup
-import csv
 import time
-import random
-from datetime import datetime
 from urllib.parse import quote_plus
 import json
+from fetch_engine import AsyncFetchEngine, host_of
+from rate_limiter import HostRateLimiter, SharedRateLimiter, limit_from_delays
+from http_cache import HttpCache, install_cache
+from transport import install_transport
+from pagination import has_next_page, iter_leads, stream_leads
+from extraction import SourceSpec
+from lead_sink import CsvLeadSink, timestamped_filename
+from lead_record import LeadBatch
+from crawl_ledger import CrawlLedger
+from crawl_grid import GridProgress, city_of, plan_grid, top_cities, unit_priority
+from geo_shards import ShardPlanner
+from crawl_budget import BudgetScheduler, is_prospect
+from lead_store import UNCHANGED, LeadStore, parse_since
+from dedupe import resolve_csv, resolve_duplicates
+from exporters import FORMATS, PARTITION_FIELDS, check_format, export_csv, format_of
+from parse_pool import ParsePool, default_workers
+from metrics import Metrics
+from resilience import Breakers, CircuitOpenError, RetryPolicy
+from website_check import verify_csv
+from addresses import normalize_csv
+from workers import (default_worker_id, lease_refill, merge_parts, part_filename,
+                     spawn_workers, wait_for)
 
 class IllinoisLeadScraper:
-    def __init__(self):
+    # Directory hosts; override per instance to point at a mirror or stub server
+    BASE_URLS = {
+        'YellowPages': 'https://www.yellowpages.com',
+        'Manta': 'https://www.manta.com',
+        'Superpages': 'https://www.superpages.com',
+    }
+    
+    # How long a cached search page stays fresh, per directory (seconds)
+    CACHE_TTLS = {
+        'YellowPages': 12 * 3600,
+        'Manta': 24 * 3600,
+        'Superpages': 12 * 3600,
+    }
+    
+    # Where each field sits inside a listing: chains of fallback selectors,
+    # compiled once per scraper and reordered by hit rate (see extraction.py)
+    SOURCE_TABLES = {
+        'YellowPages': {
+            'containers': ['div.result'],
+            'fields': {
+                'name': ['a.business-name'],
+                'phone': ['div.phones'],
+                'street': ['div.street-address'],
+                'locality': ['div.locality'],
+                'website': ['a.track-visit-website->href'],
+            },
+        },
+        'Manta': {
+            'containers': ['div.card-body'],
+            'fields': {
+                'name': ['h3', 'h2'],
+                'phone': ['a[href*=tel:]'],
+                'address': ['address', 'p.address'],
+                'website': ['a[href*=http]->href', 'a[href*=www]->href'],
+            },
+        },
+        'Superpages': {
+            'containers': ['div.listing'],
+            'fields': {
+                'name': ['a.business-name'],
+                'phone': ['span.phone'],
+                'street': ['span.street-address'],
+                'locality': ['span.locality'],
+                'website': ['a:contains(website)->href'],
+            },
+        },
+    }
+    
+    def __init__(self, min_delay=2, max_delay=5, cache_dir='.http_cache', max_pages=3, max_leads=None,
+                 quiet=False, stream_pages=False):
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         })
-        self.leads = []
+        self.base_urls = dict(self.BASE_URLS)
+        # One token bucket per host; tune a single directory with
+        # self.limiter.set_limit('www.manta.com', rate=0.5, burst=2, jitter=1)
+        self.limiter = HostRateLimiter(default=limit_from_delays(min_delay, max_delay))
+        # Transient failures (429/5xx/timeouts) are retried with backoff and
+        # Retry-After; a host that keeps failing or blocking us trips its
+        # breaker and gets no requests until a probe succeeds
+        self.retry = RetryPolicy()
+        self.breakers = Breakers()
+        # Disk cache under the session: re-runs are served locally until the TTL
+        # expires, then revalidated with ETag/Last-Modified. cache_dir=None disables it.
+        self.cache = None
+        if cache_dir:
+            ttls = {host_of(self.base_urls[name]): ttl for name, ttl in self.CACHE_TTLS.items()}
+            self.cache = HttpCache(cache_dir, ttls=ttls)
+        # Keep-alive connection pools per host (sized in run_search) that only
+        # advertise encodings we can decode
+        if self.cache is not None:
+            self.transport = install_cache(self.session, self.cache)
+        else:
+            self.transport = install_transport(self.session)
+        # Pagination: follow "next page" links up to max_pages per search,
+        # stopping early once a search has produced max_leads leads
+        self.max_pages = max_pages
+        self.max_leads = max_leads
+        # scrape_*: parse each result page while it downloads, stopping the
+        # download once max_leads is reached (run_search always fetches whole pages)
+        self.stream_pages = stream_pages
+        self.specs = {name: SourceSpec(name, **table) for name, table in self.SOURCE_TABLES.items()}
+        # Columnar: a few bytes per repeated value instead of a dict per lead
+        self.leads = LeadBatch()
+        # When set, scraped leads stream straight to this CsvLeadSink instead of self.leads
+        self.sink = None
+        self.ledger = None
+        # Set by run_search(shard=True): splits saturated searches into cities, then ZIPs
+        self.shards = None
+        # Set by run_search(budget=...): decides which searches the budget is spent on
+        self.budget = None
+        # When set, every lead is also upserted into this cross-run LeadStore;
+        # with new_only, the sink only receives leads that are new or changed
+        self.store = None
+        self.new_only = False
+        # Counters and histograms per source; quiet drops per-lead/per-page output
+        self.metrics = Metrics()
+        self.quiet = quiet
         
-    def rate_limit(self, min_seconds=2, max_seconds=5):
-        """Respectful rate limiting between requests"""
-        time.sleep(random.uniform(min_seconds, max_seconds))
+    def add_lead(self, lead):
+        """Keep a scraped lead: upsert it into the store, write it to the sink"""
+        if lead['business_name'] == "N/A":
+            self.metrics.inc('listings_dropped', lead['source'], reason='no_name')
+        else:
+            self.metrics.inc('listings_found', lead['source'])
+        if self.store is not None:
+            status = self.store.add(lead)
+            if self.new_only and status == UNCHANGED:
+                self.metrics.inc('leads_skipped', lead['source'], reason='unchanged')
+                return
+        if self.sink is not None:
+            if not self.sink.add(lead) and lead['business_name'] != "N/A":
+                self.metrics.inc('leads_skipped', lead['source'], reason='duplicate')
+        else:
+            self.leads.append(lead)
+    
+    def log(self, message):
+        """Per-lead / per-page progress line; silenced in quiet mode"""
+        if not self.quiet:
+            print(message)
+    
+    def record_response(self, source, response, size=None):
+        """Count status, bytes and latency of one response (size: bytes, if not the body's)
+
+        Bytes on the wire come from the transport; a cached response has none.
+        """
+        self.metrics.inc('requests', source, status=str(response.status_code))
+        self.metrics.inc('response_bytes', source,
+                         len(response.content) if size is None else size)
+        self.metrics.observe('request_seconds', source, response.elapsed.total_seconds())
+        wire = getattr(response, 'wire_bytes', size)
+        if wire:
+            self.metrics.inc('wire_bytes', source, wire)
+    
+    def rate_limit(self, url):
+        """Respectful rate limiting: wait for this host's token bucket"""
+        self.limiter.wait(host_of(url))
+    
+    def source_of(self, url):
+        """Directory name for a URL on one of our hosts, else the host itself"""
+        sources = {host_of(base): name for name, base in self.base_urls.items()}
+        return sources.get(host_of(url), host_of(url))
+    
+    def fetch(self, url, stream=False):
+        """Rate-limited GET with retries that records per-host fetch time
+
+        Raises CircuitOpenError right away, without a request, while the
+        host's breaker is open. With stream, the body is left unread (for
+        stream_leads) and the caller must close the response.
+        """
+        host = host_of(url)
+        breaker = self.breakers.get(host)
+        attempt = 1
+        while True:
+            if not breaker.allow():
+                raise CircuitOpenError(host, breaker.retry_in())
+            if self.cache is None or not self.cache.is_fresh(url, self.session.headers):
+                self.rate_limit(url)
+            response = error = None
+            started = time.perf_counter()
+            try:
+                response = self.session.get(url, timeout=15, stream=stream)
+            except requests.RequestException as e:
+                error = e
+            finally:
+                self.limiter.record_fetch(host, time.perf_counter() - started)
+            breaker.record(response, error)
+            if response is not None:
+                # A streamed body is still unread: count its declared length
+                size = int(response.headers.get('Content-Length', 0)) if stream else None
+                self.record_response(self.source_of(url), response, size)
+            delay = self.retry.backoff(attempt, response, error)
+            if delay is None:
+                break
+            if response is not None:
+                response.close()
+            self.metrics.inc('retries', self.source_of(url))
+            time.sleep(delay)
+            attempt += 1
+        if error is not None:
+            raise error
+        return response
+    
+    def search_leads(self, page_url, parse, max_pages=None, max_leads=None):
+        """Leads of one paginated search, streamed page by page (see stream_pages)"""
+        max_pages = max_pages or self.max_pages
+        max_leads = max_leads or self.max_leads
+        if self.stream_pages:
+            return stream_leads(lambda url: self.fetch(url, stream=True), page_url, parse,
+                                max_pages, max_leads)
+        return iter_leads(self.fetch, page_url, parse, max_pages, max_leads)
+    
+    def sources(self):
+        """Directories searched by run_search as (name, url builder, parser)"""
+        return [
+            ('YellowPages', self.yellowpages_url, self.parse_yellowpages),
+            ('Manta', self.manta_url, self.parse_manta),
+            ('Superpages', self.superpages_url, self.parse_superpages),
+        ]
+    
+    def yellowpages_url(self, category, location="Illinois", page=1):
+        """Build the Yellow Pages search URL"""
+        search_term = quote_plus(category)
+        location_term = quote_plus(location)
+        url = f"{self.base_urls['YellowPages']}/search?search_terms={search_term}&geo_location_terms={location_term}"
+        return f"{url}&page={page}" if page > 1 else url
+    
+    def parse_yellowpages(self, html, category):
+        """Parse a Yellow Pages result page into leads as they are found"""
+        spec = self.specs['YellowPages']
+        
+        for result in spec.listings(html):
+            try:
+                fields = spec.extract(result)
+                name = fields['name'] or "N/A"
+                phone = fields['phone'] or "N/A"
+                
+                address = fields['street'] or ""
+                if fields['locality'] is not None:
+                    address += ", " + fields['locality']
+                
+                # Check for website
+                has_website = "Yes" if fields['website'] is not None else "No"
+                website = fields['website'] or "N/A"
+                
+                lead = {
+                    'source': 'YellowPages',
+                    'business_name': name,
+                    'phone': phone,
+                    'address': address,
+                    'has_website': has_website,
+                    'website': website,
+                    'category': category,
+                    'state': 'Illinois'
+                }
+                
+                self.log(f"  ✓ Found: {name} | Website: {has_website}")
+                yield lead
+                
+            except Exception as e:
+                self.metrics.swallowed(spec.name, 'parse_listing', e)
+                self.metrics.inc('listings_dropped', spec.name, reason='error')
+                self.log(f"  ⚠ Error parsing result: {e}")
+                continue
+    
+    def iter_yellowpages(self, category, location="Illinois", max_pages=None, max_leads=None):
+        """Stream Yellow Pages leads, following "next page" links"""
+        return self.search_leads(lambda page: self.yellowpages_url(category, location, page),
+                                 lambda html: self.parse_yellowpages(html, category),
+                                 max_pages, max_leads)
     
     def scrape_yellowpages(self, category, location="Illinois"):
         """Scrape Yellow Pages for Illinois businesses"""
         print(f"\n🔍 Searching Yellow Pages for {category} in {location}...")
         
         try:
-            # Yellow Pages URL structure
-            search_term = quote_plus(category)
-            location_term = quote_plus(location)
-            url = f"https://www.yellowpages.com/search?search_terms={search_term}&geo_location_terms={location_term}"
-            
-            self.rate_limit()
-            response = self.session.get(url, timeout=15)
-            
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                results = soup.find_all('div', class_='result')
-                
-                for result in results[:20]:  # Limit to first 20 results per category
-                    try:
-                        name_elem = result.find('a', class_='business-name')
-                        name = name_elem.text.strip() if name_elem else "N/A"
-                        
-                        phone_elem = result.find('div', class_='phones')
-                        phone = phone_elem.text.strip() if phone_elem else "N/A"
-                        
-                        address_elem = result.find('div', class_='street-address')
-                        city_elem = result.find('div', class_='locality')
-                        address = ""
-                        if address_elem:
-                            address = address_elem.text.strip()
-                        if city_elem:
-                            address += ", " + city_elem.text.strip()
-                        
-                        # Check for website
-                        website_elem = result.find('a', class_='track-visit-website')
-                        has_website = "Yes" if website_elem else "No"
-                        website = website_elem.get('href', 'N/A') if website_elem else "N/A"
-                        
-                        lead = {
-                            'source': 'YellowPages',
-                            'business_name': name,
-                            'phone': phone,
-                            'address': address,
-                            'has_website': has_website,
-                            'website': website,
-                            'category': category,
-                            'state': 'Illinois'
-                        }
-                        
-                        self.leads.append(lead)
-                        print(f"  ✓ Found: {name} | Website: {has_website}")
-                        
-                    except Exception as e:
-                        print(f"  ⚠ Error parsing result: {e}")
-                        continue
+            for lead in self.iter_yellowpages(category, location):
+                self.add_lead(lead)
                         
         except Exception as e:
+            self.metrics.swallowed('YellowPages', 'scrape', e)
             print(f"  ❌ Error scraping Yellow Pages: {e}")
     
+    def manta_url(self, category, state="Illinois", page=1):
+        """Build the Manta search URL (state may also be a "City, IL" location)"""
+        search_term = quote_plus(category)
+        state_code = "IL"  # Illinois
+        url = f"{self.base_urls['Manta']}/search?search={search_term}&state={state_code}"
+        city = city_of(state)
+        if city:
+            url += f"&city={quote_plus(city)}"
+        return f"{url}&pg={page}" if page > 1 else url
+    
+    def parse_manta(self, html, category, state="Illinois"):
+        """Parse a Manta result page into leads as they are found"""
+        spec = self.specs['Manta']
+        
+        for result in spec.listings(html):
+            try:
+                fields = spec.extract(result)
+                name = fields['name'] or "N/A"
+                phone = fields['phone'] or "N/A"
+                address = fields['address'] or "N/A"
+                
+                # Check for website link
+                has_website = "Yes" if fields['website'] is not None else "No"
+                website = fields['website'] or "N/A"
+                
+                lead = {
+                    'source': 'Manta',
+                    'business_name': name,
+                    'phone': phone,
+                    'address': address,
+                    'has_website': has_website,
+                    'website': website,
+                    'category': category,
+                    'state': state
+                }
+                
+                self.log(f"  ✓ Found: {name} | Website: {has_website}")
+                yield lead
+                
+            except Exception as e:
+                self.metrics.swallowed(spec.name, 'parse_listing', e)
+                self.metrics.inc('listings_dropped', spec.name, reason='error')
+                self.log(f"  ⚠ Error parsing result: {e}")
+                continue
+    
+    def iter_manta(self, category, state="Illinois", max_pages=None, max_leads=None):
+        """Stream Manta leads, following "next page" links"""
+        return self.search_leads(lambda page: self.manta_url(category, state, page),
+                                 lambda html: self.parse_manta(html, category, state),
+                                 max_pages, max_leads)
+    
     def scrape_manta(self, category, state="Illinois"):
         """Scrape Manta business directory"""
         print(f"\n🔍 Searching Manta for {category} in {state}...")
         
         try:
-            # Manta URL structure
-            search_term = quote_plus(category)
-            state_code = "IL"  # Illinois
-            url = f"https://www.manta.com/search?search={search_term}&state={state_code}"
-            
-            self.rate_limit()
-            response = self.session.get(url, timeout=15)
-            
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                results = soup.find_all('div', class_='card-body')
-                
-                for result in results[:20]:
-                    try:
-                        name_elem = result.find('h3') or result.find('h2')
-                        name = name_elem.text.strip() if name_elem else "N/A"
-                        
-                        phone_elem = result.find('a', href=lambda x: x and 'tel:' in x)
-                        phone = phone_elem.text.strip() if phone_elem else "N/A"
-                        
-                        address_elem = result.find('address') or result.find('p', class_='address')
-                        address = address_elem.text.strip() if address_elem else "N/A"
-                        
-                        # Check for website link
-                        website_elem = result.find('a', href=lambda x: x and ('http' in x or 'www' in x))
-                        has_website = "Yes" if website_elem else "No"
-                        website = website_elem.get('href', 'N/A') if website_elem else "N/A"
-                        
-                        lead = {
-                            'source': 'Manta',
-                            'business_name': name,
-                            'phone': phone,
-                            'address': address,
-                            'has_website': has_website,
-                            'website': website,
-                            'category': category,
-                            'state': state
-                        }
-                        
-                        self.leads.append(lead)
-                        print(f"  ✓ Found: {name} | Website: {has_website}")
-                        
-                    except Exception as e:
-                        print(f"  ⚠ Error parsing result: {e}")
-                        continue
+            for lead in self.iter_manta(category, state):
+                self.add_lead(lead)
                         
         except Exception as e:
+            self.metrics.swallowed('Manta', 'scrape', e)
             print(f"  ❌ Error scraping Manta: {e}")
     
+    def superpages_url(self, category, location="Illinois", page=1):
+        """Build the Superpages search URL"""
+        search_term = quote_plus(category)
+        location_term = quote_plus(location)
+        url = f"{self.base_urls['Superpages']}/search?search_terms={search_term}&geo_location_terms={location_term}"
+        return f"{url}&page={page}" if page > 1 else url
+    
+    def parse_superpages(self, html, category):
+        """Parse a Superpages result page into leads as they are found"""
+        spec = self.specs['Superpages']
+        
+        for result in spec.listings(html):
+            try:
+                fields = spec.extract(result)
+                name = fields['name'] or "N/A"
+                phone = fields['phone'] or "N/A"
+                
+                address = fields['street'] or ""
+                if fields['locality'] is not None:
+                    address += ", " + fields['locality']
+                
+                has_website = "Yes" if fields['website'] is not None else "No"
+                website = fields['website'] or "N/A"
+                
+                lead = {
+                    'source': 'Superpages',
+                    'business_name': name,
+                    'phone': phone,
+                    'address': address,
+                    'has_website': has_website,
+                    'website': website,
+                    'category': category,
+                    'state': 'Illinois'
+                }
+                
+                self.log(f"  ✓ Found: {name} | Website: {has_website}")
+                yield lead
+                
+            except Exception as e:
+                self.metrics.swallowed(spec.name, 'parse_listing', e)
+                self.metrics.inc('listings_dropped', spec.name, reason='error')
+                self.log(f"  ⚠ Error parsing result: {e}")
+                continue
+    
+    def iter_superpages(self, category, location="Illinois", max_pages=None, max_leads=None):
+        """Stream Superpages leads, following "next page" links"""
+        return self.search_leads(lambda page: self.superpages_url(category, location, page),
+                                 lambda html: self.parse_superpages(html, category),
+                                 max_pages, max_leads)
+    
     def scrape_superpages(self, category, location="Illinois"):
         """Scrape Superpages directory"""
         print(f"\n🔍 Searching Superpages for {category} in {location}...")
         
         try:
-            search_term = quote_plus(category)
-            location_term = quote_plus(location)
-            url = f"https://www.superpages.com/search?search_terms={search_term}&geo_location_terms={location_term}"
-            
-            self.rate_limit()
-            response = self.session.get(url, timeout=15)
-            
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                results = soup.find_all('div', class_='listing')
-                
-                for result in results[:20]:
-                    try:
-                        name_elem = result.find('a', class_='business-name')
-                        name = name_elem.text.strip() if name_elem else "N/A"
-                        
-                        phone_elem = result.find('span', class_='phone')
-                        phone = phone_elem.text.strip() if phone_elem else "N/A"
-                        
-                        address_elem = result.find('span', class_='street-address')
-                        city_elem = result.find('span', class_='locality')
-                        address = ""
-                        if address_elem:
-                            address = address_elem.text.strip()
-                        if city_elem:
-                            address += ", " + city_elem.text.strip()
-                        
-                        website_elem = result.find('a', string=lambda x: x and 'website' in x.lower())
-                        has_website = "Yes" if website_elem else "No"
-                        website = website_elem.get('href', 'N/A') if website_elem else "N/A"
-                        
-                        lead = {
-                            'source': 'Superpages',
-                            'business_name': name,
-                            'phone': phone,
-                            'address': address,
-                            'has_website': has_website,
-                            'website': website,
-                            'category': category,
-                            'state': 'Illinois'
-                        }
-                        
-                        self.leads.append(lead)
-                        print(f"  ✓ Found: {name} | Website: {has_website}")
-                        
-                    except Exception as e:
-                        print(f"  ⚠ Error parsing result: {e}")
-                        continue
+            for lead in self.iter_superpages(category, location):
+                self.add_lead(lead)
                         
         except Exception as e:
+            self.metrics.swallowed('Superpages', 'scrape', e)
             print(f"  ❌ Error scraping Superpages: {e}")
     
     def export_to_csv(self, filename=None):
@@ -202,62 +430,407 @@ class IllinoisLeadScraper:
             return
         
         if filename is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"illinois_leads_{timestamp}.csv"
+            filename = timestamped_filename()
         
         try:
-            with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                fieldnames = ['source', 'business_name', 'phone', 'address', 
-                            'has_website', 'website', 'category', 'state']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                
-                writer.writeheader()
-                writer.writerows(self.leads)
+            self.leads.write_csv(filename)
             
             print(f"\n✅ Exported {len(self.leads)} leads to {filename}")
             
             # Print statistics
-            no_website = sum(1 for lead in self.leads if lead['has_website'] == 'No')
+            no_website = self.leads.statistics()['no_website']
             print(f"\n📊 Statistics:")
             print(f"   Total leads: {len(self.leads)}")
             print(f"   Without website: {no_website} ({no_website/len(self.leads)*100:.1f}%)")
             print(f"   With website: {len(self.leads) - no_website}")
             
         except Exception as e:
+            self.metrics.swallowed('export', 'export_to_csv', e)
             print(f"\n❌ Error exporting to CSV: {e}")
     
-    def run_search(self, categories, cities=None):
-        """Run the scraper across multiple sources"""
+    def _job(self, unit):
+        """Engine job (unit, url) for one crawl unit"""
+        build_url, parse = self._source_funcs[unit.source]
+        return (unit, build_url(unit.category, unit.location, page=unit.page))
+    
+    def _unit_failed(self, unit, error):
+        self._progress.record(unit, 0)
+        if self.budget is not None:
+            # A host behind an open breaker was never asked
+            self.budget.record(unit, 0, requests=0 if isinstance(error, CircuitOpenError) else 1)
+        if self.ledger is not None:
+            self.ledger.mark_failed(unit, error)
+        return []
+    
+    def _handle_response(self, job, response, error):
+        """Parse one finished fetch from the async engine; returns the next page to fetch"""
+        unit, url = job
+        build_url, parse = self._source_funcs[unit.source]
+        self.log(f"\n🔍 {unit.source} results for {unit.category} in {unit.location} "
+                 f"(page {unit.page}) {self._progress.status()}...")
+        if error is not None:
+            self.metrics.swallowed(unit.source, 'fetch', error)
+            print(f"  ❌ Error scraping {unit.source}: {error}")
+            return self._unit_failed(unit, error)
+        self.record_response(unit.source, response)
+        if response.status_code != 200:
+            print(f"  ❌ Failed with status code: {response.status_code}")
+            return self._unit_failed(unit, f"HTTP {response.status_code}")
+        
+        html = response.content
+        has_next = has_next_page(html)
+        follow_ups = []
+        # Follow the "next page" link up to max_pages
+        if unit.page < self.max_pages and has_next:
+            follow_ups.append(unit._replace(page=unit.page + 1))
+        
+        key = unit[:3]
+        found = 0
+        parsed = getattr(response, 'parsed', None)
+        if parsed is not None:
+            # Parsed in a worker process: replay its output, selector hits and metrics here
+            print(parsed.log, end='')
+            self.specs[unit.source].add_counters(parsed.counters)
+            self.metrics.merge(parsed.metrics)
+            parse_seconds = parsed.seconds
+            leads = parsed.leads
+        else:
+            started = time.perf_counter()
+            leads = list(parse(html, unit.category))
+            parse_seconds = time.perf_counter() - started
+        self.metrics.observe('parse_seconds', unit.source, parse_seconds)
+        if self.shards is not None:
+            # Sharded: a saturated search splits into smaller areas, a redundant one stops
+            follow_ups = self.shards.follow_ups(unit, has_next, leads)
+        prospects = 0
+        for lead in leads:
+            self.add_lead(lead)
+            prospects += is_prospect(lead)
+            found += 1
+            self._search_counts[key] = self._search_counts.get(key, 0) + 1
+            if self.max_leads is not None and self._search_counts[key] >= self.max_leads:
+                follow_ups = []
+                break
+        
+        if self.ledger is not None:
+            # Leads reach the file before their unit is marked done
+            if self.sink is not None:
+                self.sink.flush()
+            if self.store is not None:
+                self.store.flush()
+            follow_ups = self.ledger.plan(follow_ups)
+            self.ledger.mark_done(unit, found)
+        self._progress.plan(follow_ups)
+        cell = self._progress.record(unit, found)
+        self.log(f"  ✓ {found} leads | {cell} so far for {unit.category} in {unit.location}")
+        next_jobs = [self._job(next_unit) for next_unit in follow_ups]
+        if self.budget is not None:
+            # The budget decides when, and whether, later pages are fetched
+            self.budget.record(unit, prospects)
+            self.budget.add(next_jobs)
+            next_jobs = []
+        return next_jobs
+    
+    def run_search(self, categories, cities=None, max_concurrency=4, sink=None, ledger=None,
+                   store=None, new_only=False, parse_workers=0, worker=None, shard=False,
+                   budget=None):
+        """Run the scraper across multiple sources
+
+        Every category is searched in every city (cities=None searches the
+        whole state at once); the grid is drained by a bounded pool of
+        workers per directory, biggest metros first, with progress and
+        per-cell lead counts printed as pages finish.
+        With a CsvLeadSink, leads are deduplicated and written as they arrive
+        instead of being collected in self.leads. With a CrawlLedger, every
+        (source, category, location, page) unit is recorded, and units the
+        ledger already has as done are skipped. With a LeadStore, leads are
+        upserted across runs, and new_only keeps already-known, unchanged
+        leads out of the sink. With parse_workers > 0, result pages are
+        parsed in that many worker processes while fetching continues.
+        With worker set (an id), the plan already in the ledger is shared
+        with other processes: units are claimed under leases as the queues
+        run low, pages found are leased to this worker, and each host's rate
+        limit is shared through the ledger file.
+        With shard, a search that still has a next page at its last
+        reachable page is split into the state's cities, and a city into
+        its ZIP codes (geo_shards.py); a search whose page brings only
+        leads already found is pruned.
+        With a BudgetScheduler (crawl_budget.py), searches are sent a few at
+        a time, those yielding the most leads with a phone and no website
+        first, until its request or time budget is spent; pages left over
+        stay pending in the ledger. Not combined with worker.
+        """
+        self.sink = sink
+        self.ledger = ledger
+        self.store = store
+        self.new_only = new_only and store is not None
         print("="*60)
         print("Illinois Business Lead Scraper")
         print("="*60)
         
-        for category in categories:
-            print(f"\n{'='*60}")
-            print(f"Searching for: {category}")
-            print(f"{'='*60}")
-            
-            # Search all directories
-            self.scrape_yellowpages(category)
-            self.scrape_manta(category)
-            self.scrape_superpages(category)
+        # Plan page 1 of every (source, category, city) cell, biggest metros
+        # first; different directories are fetched at the same time, each host
+        # waits only on its own token bucket, and later pages are queued as
+        # "next page" links are found
+        self._source_funcs = {source: (build_url, parse) for source, build_url, parse in self.sources()}
+        units = plan_grid(categories, cities, list(self._source_funcs))
+        refill = None
+        if worker is not None:
+            if ledger.owner is None:
+                ledger.join(worker)
+            self.limiter = SharedRateLimiter.like(self.limiter, ledger.path)
+            units = []
+            refill = lease_refill(ledger, list(self._source_funcs), self._job,
+                                  on_claim=lambda claimed: self._progress.plan(claimed))
+            print(f"\n👷 Worker {worker}: claiming units from {ledger.path}")
+        elif ledger is not None:
+            ledger.plan(units)
+            units = [unit for unit in ledger.unfinished() if unit.source in self._source_funcs]
+            print(f"\n📒 {len(units)} units left to crawl in {ledger.path}")
+        self.shards = ShardPlanner(self.max_pages) if shard else None
+        if self.shards is not None:
+            self.shards.plan(units)
+        jobs = [self._job(unit) for unit in units]
+        self.budget = budget
+        if budget is not None:
+            # One unit in flight per engine worker and host, the rest wait their turn
+            budget.depth = max_concurrency
+            budget.add(jobs)
+            jobs, refill = [], budget.refill
+            print(f"\n🎯 Spending the budget on {budget.left()} searches "
+                  f"({max_concurrency} at a time)...")
+        self._search_counts = {}
+        self._progress = GridProgress(units)
         
-        # Remove duplicates based on business name and phone
-        print(f"\n🔄 Removing duplicates...")
-        seen = set()
-        unique_leads = []
-        for lead in self.leads:
-            identifier = (lead['business_name'].lower(), lead['phone'])
-            if identifier not in seen and lead['business_name'] != "N/A":
-                seen.add(identifier)
-                unique_leads.append(lead)
+        if refill is None:
+            print(f"\n🚀 Fetching {len(jobs)} searches ({max_concurrency} at a time)...")
+        parser = (ParsePool(type(self), parse_workers, scraper_kwargs={'quiet': self.quiet})
+                  if parse_workers else None)
+        # A pool per directory as big as the requests in flight to it, so none
+        # waits for (or opens and drops) a connection of its own
+        self.transport.size_pools({host_of(url): max_concurrency for url in self.base_urls.values()})
+        engine = AsyncFetchEngine(self.session, self.limiter, max_concurrency=max_concurrency,
+                                  cache=self.cache, parser=parser, retry=self.retry,
+                                  breakers=self.breakers)
+        try:
+            elapsed = engine.fetch_all(jobs, self._handle_response,
+                                       priority=lambda job: unit_priority(job[0]), refill=refill)
+        finally:
+            if parser is not None:
+                parser.close()
+        print(f"\n⏱  Fetched {engine.completed} pages in {elapsed:.1f}s")
+        for host, retries in engine.retried.items():
+            self.metrics.inc('retries', self.source_of(f"http://{host}/"), retries)
+        if self.shards is not None:
+            # Too many locations for the category x city table
+            self.shards.report()
+        else:
+            self._progress.report()
+        if self.budget is not None:
+            self.budget.report()
+        self.metrics.report()
+        self.limiter.report()
+        self.breakers.report()
+        if self.cache is not None:
+            self.cache.report()
+        self.transport.report()
+        for spec in self.specs.values():
+            spec.report()
+        if self.ledger is not None:
+            self.ledger.report()
+        if self.store is not None:
+            self.store.flush()
+            self.store.report()
+        
+        if self.sink is not None:
+            print(f"\n✓ Streamed {self.sink.total} unique leads to {self.sink.filename}")
+            return
         
-        self.leads = unique_leads
+        # Merge duplicates: same phone, or near-identical name in the same ZIP
+        print(f"\n🔄 Removing duplicates...")
+        self.leads = resolve_duplicates(self.leads)
         print(f"✓ Kept {len(self.leads)} unique leads")
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Illinois Business Lead Scraper")
+    parser.add_argument('--resume', action='store_true',
+                        help="continue the last run from its crawl ledger: skip finished "
+                             "pages and retry only pending or failed ones")
+    parser.add_argument('--ledger', default='crawl_ledger.sqlite3',
+                        help="SQLite work ledger file (default: %(default)s)")
+    parser.add_argument('--store', default='leads.sqlite3',
+                        help="SQLite lead store shared across runs (default: %(default)s)")
+    parser.add_argument('--new-only', action='store_true',
+                        help="only write leads that are new or changed since earlier runs")
+    parser.add_argument('--export-changes', metavar='PATH',
+                        help="after the run, write the store's leads that are new or changed "
+                             "since --since (default: since this run started) to a CSV")
+    parser.add_argument('--since', type=parse_since, metavar='DATE',
+                        help="start of --export-changes, e.g. 2024-11-01 or 2024-11-01T08:00")
+    parser.add_argument('--cities', type=lambda text: [c.strip() for c in text.split(',') if c.strip()],
+                        help="comma-separated cities to search, e.g. \"Chicago,Peoria\"")
+    parser.add_argument('--top-cities', type=int, metavar='N',
+                        help="search the N most populous Illinois cities")
+    parser.add_argument('--shard', action='store_true',
+                        help="start from statewide searches (or --cities) and split any that "
+                             "hit a directory's result cap into cities, then ZIP codes")
+    parser.add_argument('--parse-workers', type=int, default=default_workers(), metavar='N',
+                        help="processes that parse result pages while fetching continues; "
+                             "0 parses in the main process (default: %(default)s)")
+    parser.add_argument('--quiet', action='store_true',
+                        help="no per-lead or per-page output, only summaries")
+    parser.add_argument('--metrics-json', metavar='FILE',
+                        help="JSON run report (default: next to the CSV, .metrics.json)")
+    parser.add_argument('--metrics-prom', metavar='FILE',
+                        help="Prometheus text file (default: next to the CSV, .prom)")
+    parser.add_argument('--verify-websites', action='store_true',
+                        help="after the crawl, check every lead's website and label it "
+                             "live, dead, redirected or parked")
+    parser.add_argument('--normalize-addresses', action='store_true',
+                        help="after the crawl, split addresses into street, city, ZIP and "
+                             "county and flag out-of-state listings (offline)")
+    parser.add_argument('--workers', type=int, metavar='N',
+                        help="crawl with N local worker processes that share the ledger's "
+                             "queue and each host's rate limit; their leads are merged at the end")
+    parser.add_argument('--join', action='store_true',
+                        help="work on the crawl already planned in --ledger as one more "
+                             "worker, writing leads to its own part file")
+    parser.add_argument('--worker-id', metavar='ID',
+                        help="this worker's name in the ledger (default: hostname-pid)")
+    parser.add_argument('--export', action='append', default=[], metavar='PATH',
+                        help="also write the final leads to PATH; the format follows the "
+                             f"extension ({', '.join(FORMATS.values())}); repeatable")
+    parser.add_argument('--partition-by', choices=PARTITION_FIELDS,
+                        help="write each --export as a directory with one file per source "
+                             "or category")
+    parser.add_argument('--budget-requests', type=int, metavar='N',
+                        help="stop after N search requests, spent on the sources, categories "
+                             "and cities yielding the most leads with a phone and no website")
+    parser.add_argument('--budget-minutes', type=float, metavar='M',
+                        help="stop sending requests after M minutes, spent the same way")
+    args = parser.parse_args()
+    if args.since is not None and not args.export_changes:
+        parser.error("--since needs --export-changes")
+    if args.export_changes and args.join:
+        parser.error("--export-changes runs in the process that starts the workers, not --join")
+    if (args.budget_requests or args.budget_minutes) and (args.workers or args.join):
+        parser.error("--budget-requests/--budget-minutes need a single process "
+                     "(not --workers or --join)")
+    for path in args.export:
+        try:
+            check_format(format_of(path.rstrip('/\\')))
+        except (ValueError, RuntimeError) as e:
+            parser.error(f"--export {path}: {e}")
+    return args
+
+
+def budget_from(args):
+    """BudgetScheduler for --budget-requests/--budget-minutes, or None"""
+    if not args.budget_requests and not args.budget_minutes:
+        return None
+    return BudgetScheduler(max_requests=args.budget_requests,
+                           max_seconds=args.budget_minutes * 60 if args.budget_minutes else None)
+
+
+def export_store_changes(store, args):
+    """--export-changes: the store's leads new or changed since --since (default: this run)"""
+    if args.export_changes:
+        store.export_changes(args.export_changes, since=args.since)
+
+
+def resume_plan(ledger):
+    """Categories, cities and output file of the run recorded in ledger, or None"""
+    categories = ledger.meta('categories')
+    filename = ledger.meta('output')
+    if not categories or not filename:
+        print(f"\n❌ Nothing to resume in {ledger.path}")
+        return None
+    print(f"\n♻️  Resuming {len(categories)} categories into {filename}")
+    return categories, ledger.meta('cities'), filename
+
+
+def report_merged(before, after):
+    if before > after:
+        print(f"\n🔗 Merged {before - after} fuzzy duplicates across sources: {after} leads remain")
+
+
+def write_run_report(metrics, filename, args):
+    """Write the JSON run report and Prometheus text file for a run into filename"""
+    stem = os.path.splitext(filename)[0]
+    json_path = args.metrics_json or f"{stem}.metrics.json"
+    prom_path = args.metrics_prom or f"{stem}.prom"
+    metrics.write_json(json_path)
+    metrics.write_prometheus(prom_path)
+    print(f"\n📈 Run report: {json_path} | Prometheus metrics: {prom_path}")
+
+
+def write_exports(filename, args):
+    """Convert the finished CSV into each --export path"""
+    for path in args.export:
+        written = export_csv(filename, path, partition_by=args.partition_by)
+        print(f"📦 Exported {written} leads to {path}")
+
+
+def run_worker(args):
+    """--join: crawl units of the plan in --ledger alongside the other workers"""
+    ledger = CrawlLedger(args.ledger)
+    filename = ledger.meta('output')
+    if not filename:
+        print(f"\n❌ No crawl planned in {ledger.path}")
+        ledger.close()
+        return
+    store = LeadStore(args.store)
+    worker = args.worker_id or default_worker_id()
+    part = part_filename(filename, worker)
+    scraper = IllinoisLeadScraper(quiet=args.quiet)
+    sink = CsvLeadSink(part)
+    try:
+        scraper.run_search(ledger.meta('categories'), ledger.meta('cities'), sink=sink,
+                           ledger=ledger, store=store, new_only=args.new_only,
+                           parse_workers=args.parse_workers, worker=worker,
+                           shard=ledger.meta('shard', False))
+    except KeyboardInterrupt:
+        print(f"\n\n⚠️  Worker {worker} interrupted - its unfinished units go back to the queue")
+    finally:
+        sink.close()
+        ledger.close()
+        store.close()
+        write_run_report(scraper.metrics, part, args)
+
+
+def run_workers(scraper, categories, cities, filename, ledger, store, args):
+    """--workers N: plan the whole crawl, run N local workers on it, merge their leads"""
+    ledger.plan(plan_grid(categories, cities, [name for name, _, _ in scraper.sources()]))
+    # Split the parse processes between the workers rather than giving each a full set
+    argv = ['--ledger', args.ledger, '--store', args.store,
+            '--parse-workers', str(args.parse_workers // args.workers)]
+    if args.quiet:
+        argv.append('--quiet')
+    if args.new_only:
+        argv.append('--new-only')
+    print(f"\n👷 Starting {args.workers} workers on {args.ledger}")
+    try:
+        failed = wait_for(spawn_workers(args.workers, argv))
+        if failed:
+            print(f"\n⚠️  {failed} workers exited with an error")
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Interrupted - keeping the leads found so far")
+        print("   Run again with --resume to finish the remaining work")
+    ledger.report()
+    return merge_parts(filename)
+
+
 def main():
     """Main function to run the scraper"""
+    args = parse_args()
+    if args.join:
+        run_worker(args)
+        return
+    cities = args.cities or (top_cities(args.top_cities) if args.top_cities else None)
+    shard = args.shard
+    ledger = CrawlLedger(args.ledger)
+    store = LeadStore(args.store)
     
     # Categories of businesses that typically need IT services/pentesting
     categories = [
@@ -273,19 +846,61 @@ def main():
         "restaurants"
     ]
     
-    print("\n🎯 Target Categories for IT/Pentesting Services:")
-    for i, cat in enumerate(categories, 1):
-        print(f"   {i}. {cat}")
-    
-    print("\n" + "="*60)
-    response = input("Press Enter to start scraping, or type custom categories (comma-separated): ")
-    
-    if response.strip():
-        categories = [cat.strip() for cat in response.split(',')]
+    if args.resume:
+        plan = resume_plan(ledger)
+        if plan is None:
+            return
+        categories, cities, filename = plan
+        shard = ledger.meta('shard', False)
+    else:
+        print("\n🎯 Target Categories for IT/Pentesting Services:")
+        for i, cat in enumerate(categories, 1):
+            print(f"   {i}. {cat}")
+        
+        print("\n" + "="*60)
+        response = input("Press Enter to start scraping, or type custom categories (comma-separated): ")
+        
+        if response.strip():
+            categories = [cat.strip() for cat in response.split(',')]
+        
+        filename = timestamped_filename()
+        ledger.reset(categories=categories, cities=cities, output=filename, shard=shard)
     
-    scraper = IllinoisLeadScraper()
-    scraper.run_search(categories)
-    scraper.export_to_csv()
+    scraper = IllinoisLeadScraper(quiet=args.quiet)
+    if args.workers:
+        try:
+            sink = run_workers(scraper, categories, cities, filename, ledger, store, args)
+            export_store_changes(store, args)
+        finally:
+            ledger.close()
+            store.close()
+    else:
+        # Leads are written as they are found, so a crash or Ctrl-C keeps them;
+        # the ledger records finished pages so --resume picks up where we stopped
+        sink = CsvLeadSink(filename)
+        try:
+            scraper.run_search(categories, cities, sink=sink, ledger=ledger,
+                               store=store, new_only=args.new_only,
+                               parse_workers=args.parse_workers, shard=shard,
+                               budget=budget_from(args))
+        except KeyboardInterrupt:
+            print("\n\n⚠️  Interrupted - keeping the leads found so far")
+            print("   Run again with --resume to finish the remaining work")
+        else:
+            export_store_changes(store, args)
+        finally:
+            sink.close()
+            ledger.close()
+            store.close()
+            write_run_report(scraper.metrics, filename, args)
+    sink.print_statistics()
+    if sink.total:
+        report_merged(*resolve_csv(filename))
+        if args.verify_websites:
+            verify_csv(filename)
+        if args.normalize_addresses:
+            normalize_csv(filename)
+        write_exports(filename, args)
     
     print("\n" + "="*60)
     print("✅ Scraping complete!")
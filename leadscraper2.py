@@ -4,194 +4,450 @@ Illinois Business Lead Scraper v2.0
 Uses more reliable methods to find businesses that need IT services
 """
 
+import argparse
+import os
 import requests
-from bs4 import BeautifulSoup
-import csv
 import time
-import random
-from datetime import datetime
-from urllib.parse import quote_plus, urlencode
+from urllib.parse import quote_plus, urlencode, urljoin
 import json
-import re
+from fetch_engine import AsyncFetchEngine, host_of
+from rate_limiter import HostRateLimiter, SharedRateLimiter, limit_from_delays
+from http_cache import HttpCache, install_cache
+from transport import accept_encoding, install_transport
+from pagination import has_next_page, iter_leads, stream_leads
+from extraction import SourceSpec
+from lead_sink import CsvLeadSink, timestamped_filename
+from lead_record import LeadBatch
+from crawl_ledger import CrawlLedger
+from crawl_grid import GridProgress, plan_grid, top_cities, unit_priority
+from geo_shards import ShardPlanner
+from crawl_budget import BudgetScheduler, is_prospect
+from lead_store import UNCHANGED, LeadStore, parse_since
+from dedupe import resolve_csv, resolve_duplicates
+from exporters import FORMATS, PARTITION_FIELDS, check_format, export_csv, format_of
+from parse_pool import ParsePool, default_workers
+from metrics import Metrics
+from resilience import Breakers, CircuitOpenError, RetryPolicy
+from website_check import verify_csv
+from addresses import normalize_csv
+from workers import (default_worker_id, lease_refill, merge_parts, part_filename,
+                     spawn_workers, wait_for)
+from detail_pages import DetailQueue, detail_job, is_detail_job, unwrap_redirect
+
+# Cities run_search covers unless told otherwise
+DEFAULT_CITIES = ["Chicago", "Springfield", "Rockford"]
 
 class IllinoisLeadScraper:
-    def __init__(self):
+    # Directory hosts; override per instance to point at a mirror or stub server
+    BASE_URLS = {
+        'YellowPages': 'https://www.yellowpages.com',
+        'Yelp': 'https://www.yelp.com',
+    }
+    
+    # How long a cached search page stays fresh, per directory (seconds)
+    CACHE_TTLS = {
+        'YellowPages': 12 * 3600,
+        'Yelp': 6 * 3600,
+    }
+    
+    # Where each field sits inside a listing: chains of fallback selectors,
+    # compiled once per scraper and reordered by hit rate (see extraction.py)
+    SOURCE_TABLES = {
+        'YellowPages': {
+            'containers': ['div.result', 'div.search-results', 'div.organic',
+                           'div[data-business-name]'],
+            'fields': {
+                'name': ['a.business-name', 'h2.n', 'a.listing-title', '@data-business-name'],
+                'phone': ['div.phones', 'div.phone', 'a[href^=tel:]'],
+                'address': ['div.street-address', 'span.street-address', 'div.adr'],
+                'locality': ['div.locality'],
+                'website': ['a.track-visit-website->href', 'a:contains(website)->href'],
+            },
+        },
+        'Yelp': {
+            'containers': ['div[data-testid=serp-ia-card]', 'li[class*=lemon]'],
+            'fields': {
+                'name': ['a[class*=businessname]', 'h3', 'h2'],
+                'address': ['p[class*=address]', 'address'],
+                'detail': ['a[class*=businessname]->href', 'a[href^=/biz/]->href'],
+            },
+        },
+        # A Yelp business page, read for what the result cards leave out
+        'YelpDetail': {
+            'containers': ['div[data-testid=biz-details]', 'main'],
+            'fields': {
+                'phone': ['p[data-testid=biz-phone]', 'a[href^=tel:]', 'p[class*=phone]'],
+                'website': ['a[href*=biz_redir]->href', 'a[data-testid=biz-website]->href'],
+                'address': ['address', 'p[class*=address]'],
+            },
+            'required': ('phone',),
+        },
+    }
+    
+    def __init__(self, min_delay=3, max_delay=6, cache_dir='.http_cache', max_pages=3, max_leads=None,
+                 quiet=False, enrich_details=False, stream_pages=False):
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate, br',
+            'Accept-Encoding': accept_encoding(),
             'DNT': '1',
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1'
         })
-        self.leads = []
+        self.base_urls = dict(self.BASE_URLS)
+        # One token bucket per host; tune a single directory with
+        # self.limiter.set_limit('www.manta.com', rate=0.5, burst=2, jitter=1)
+        self.limiter = HostRateLimiter(default=limit_from_delays(min_delay, max_delay))
+        # Transient failures (429/5xx/timeouts) are retried with backoff and
+        # Retry-After; a host that keeps failing or blocking us trips its
+        # breaker and gets no requests until a probe succeeds
+        self.retry = RetryPolicy()
+        self.breakers = Breakers()
+        # Disk cache under the session: re-runs are served locally until the TTL
+        # expires, then revalidated with ETag/Last-Modified. cache_dir=None disables it.
+        self.cache = None
+        if cache_dir:
+            ttls = {host_of(self.base_urls[name]): ttl for name, ttl in self.CACHE_TTLS.items()}
+            self.cache = HttpCache(cache_dir, ttls=ttls)
+        # Keep-alive connection pools per host (sized in run_search) that only
+        # advertise encodings we can decode
+        if self.cache is not None:
+            self.transport = install_cache(self.session, self.cache)
+        else:
+            self.transport = install_transport(self.session)
+        # Pagination: follow "next page" links up to max_pages per search,
+        # stopping early once a search has produced max_leads leads
+        self.max_pages = max_pages
+        self.max_leads = max_leads
+        # scrape_*: parse each result page while it downloads, stopping the
+        # download once max_leads is reached (run_search always fetches whole pages)
+        self.stream_pages = stream_pages
+        self.specs = {name: SourceSpec(name, **table) for name, table in self.SOURCE_TABLES.items()}
+        # Columnar: a few bytes per repeated value instead of a dict per lead
+        self.leads = LeadBatch()
+        # When set, scraped leads stream straight to this CsvLeadSink instead of self.leads
+        self.sink = None
+        self.ledger = None
+        # Set by run_search(shard=True): splits saturated searches into cities, then ZIPs
+        self.shards = None
+        # Set by run_search(budget=...): decides which searches the budget is spent on
+        self.budget = None
+        # When set, every lead is also upserted into this cross-run LeadStore;
+        # with new_only, the sink only receives leads that are new or changed
+        self.store = None
+        self.new_only = False
+        # Counters and histograms per source; quiet drops per-lead/per-page output
+        self.metrics = Metrics()
+        self.quiet = quiet
+        # Fetch each Yelp business page for the phone, website and full address
+        # the result cards leave out (one extra request per distinct business)
+        self.enrich_details = enrich_details
+        self._details = DetailQueue()
+        
+    def add_lead(self, lead):
+        """Keep a scraped lead: upsert it into the store, write it to the sink"""
+        if lead['business_name'] == "N/A":
+            self.metrics.inc('listings_dropped', lead['source'], reason='no_name')
+        else:
+            self.metrics.inc('listings_found', lead['source'])
+        if self.store is not None:
+            status = self.store.add(lead)
+            if self.new_only and status == UNCHANGED:
+                self.metrics.inc('leads_skipped', lead['source'], reason='unchanged')
+                return
+        if self.sink is not None:
+            if not self.sink.add(lead) and lead['business_name'] != "N/A":
+                self.metrics.inc('leads_skipped', lead['source'], reason='duplicate')
+        else:
+            self.leads.append(lead)
+    
+    def log(self, message):
+        """Per-lead / per-page progress line; silenced in quiet mode"""
+        if not self.quiet:
+            print(message)
+    
+    def record_response(self, source, response, size=None):
+        """Count status, bytes and latency of one response (size: bytes, if not the body's)
+
+        Bytes on the wire come from the transport; a cached response has none.
+        """
+        self.metrics.inc('requests', source, status=str(response.status_code))
+        self.metrics.inc('response_bytes', source,
+                         len(response.content) if size is None else size)
+        self.metrics.observe('request_seconds', source, response.elapsed.total_seconds())
+        wire = getattr(response, 'wire_bytes', size)
+        if wire:
+            self.metrics.inc('wire_bytes', source, wire)
+    
+    def rate_limit(self, url):
+        """Respectful rate limiting: wait for this host's token bucket"""
+        self.limiter.wait(host_of(url))
+    
+    def source_of(self, url):
+        """Directory name for a URL on one of our hosts, else the host itself"""
+        sources = {host_of(base): name for name, base in self.base_urls.items()}
+        return sources.get(host_of(url), host_of(url))
+    
+    def fetch(self, url, stream=False):
+        """Rate-limited GET with retries that records per-host fetch time
+
+        Raises CircuitOpenError right away, without a request, while the
+        host's breaker is open. With stream, the body is left unread (for
+        stream_leads) and the caller must close the response.
+        """
+        host = host_of(url)
+        breaker = self.breakers.get(host)
+        attempt = 1
+        while True:
+            if not breaker.allow():
+                raise CircuitOpenError(host, breaker.retry_in())
+            if self.cache is None or not self.cache.is_fresh(url, self.session.headers):
+                self.rate_limit(url)
+            response = error = None
+            started = time.perf_counter()
+            try:
+                response = self.session.get(url, timeout=15, stream=stream)
+            except requests.RequestException as e:
+                error = e
+            finally:
+                self.limiter.record_fetch(host, time.perf_counter() - started)
+            breaker.record(response, error)
+            if response is not None:
+                # A streamed body is still unread: count its declared length
+                size = int(response.headers.get('Content-Length', 0)) if stream else None
+                self.record_response(self.source_of(url), response, size)
+            delay = self.retry.backoff(attempt, response, error)
+            if delay is None:
+                break
+            if response is not None:
+                response.close()
+            self.metrics.inc('retries', self.source_of(url))
+            time.sleep(delay)
+            attempt += 1
+        if error is not None:
+            raise error
+        return response
+    
+    def search_leads(self, page_url, parse, max_pages=None, max_leads=None):
+        """Leads of one paginated search, streamed page by page (see stream_pages)"""
+        max_pages = max_pages or self.max_pages
+        max_leads = max_leads or self.max_leads
+        if self.stream_pages:
+            return stream_leads(lambda url: self.fetch(url, stream=True), page_url, parse,
+                                max_pages, max_leads)
+        return iter_leads(self.fetch, page_url, parse, max_pages, max_leads)
+    
+    def sources(self):
+        """Directories searched by run_search as (name, url builder, parser)"""
+        return [
+            ('YellowPages', self.yellowpages_url, self.parse_yellowpages_new),
+            ('Yelp', self.yelp_url, self.parse_yelp),
+        ]
+    
+    def yellowpages_url(self, category, location="Illinois", page=1):
+        """Build the Yellow Pages search URL"""
+        search_term = quote_plus(category)
+        location_term = quote_plus(location)
+        url = f"{self.base_urls['YellowPages']}/search?search_terms={search_term}&geo_location_terms={location_term}"
+        return f"{url}&page={page}" if page > 1 else url
+    
+    def parse_yellowpages_new(self, html, category):
+        """Parse a Yellow Pages result page into leads as they are found"""
+        spec = self.specs['YellowPages']
+        results = spec.listings(html)
         
-    def rate_limit(self, min_seconds=3, max_seconds=6):
-        """Respectful rate limiting between requests"""
-        time.sleep(random.uniform(min_seconds, max_seconds))
+        if isinstance(results, list):
+            # A streamed page's listings are only known as they arrive
+            self.log(f"   Found {len(results)} potential results")
+        
+        for idx, result in enumerate(results):
+            try:
+                fields = spec.extract(result)
+                name = fields['name']
+                
+                if not name or name == "N/A":
+                    self.metrics.inc('listings_dropped', spec.name, reason='no_name')
+                    continue
+                
+                phone = fields['phone'] or "N/A"
+                
+                # Extract address
+                address = "N/A"
+                if fields['address']:
+                    address = fields['address']
+                    if fields['locality'] is not None:
+                        address += ", " + fields['locality']
+                
+                # Check for website
+                has_website = "Yes" if fields['website'] is not None else "No"
+                website = fields['website'] or "N/A"
+                
+                lead = {
+                    'source': 'YellowPages',
+                    'business_name': name,
+                    'phone': phone,
+                    'address': address,
+                    'has_website': has_website,
+                    'website': website,
+                    'category': category,
+                    'state': 'Illinois'
+                }
+                
+                self.log(f"  ✓ Found: {name} | Phone: {phone} | Website: {has_website}")
+                yield lead
+                
+            except Exception as e:
+                self.metrics.swallowed(spec.name, 'parse_listing', e)
+                self.metrics.inc('listings_dropped', spec.name, reason='error')
+                self.log(f"  ⚠ Error parsing result {idx}: {e}")
+                continue
+    
+    def iter_yellowpages_new(self, category, location="Illinois", max_pages=None, max_leads=None):
+        """Stream Yellow Pages leads, following "next page" links"""
+        return self.search_leads(lambda page: self.yellowpages_url(category, location, page),
+                                 lambda html: self.parse_yellowpages_new(html, category),
+                                 max_pages, max_leads)
     
     def scrape_yellowpages_new(self, category, location="Illinois"):
         """Scrape Yellow Pages with updated selectors"""
         print(f"\n🔍 Searching Yellow Pages for {category} in {location}...")
         
         try:
-            search_term = quote_plus(category)
-            location_term = quote_plus(location)
-            url = f"https://www.yellowpages.com/search?search_terms={search_term}&geo_location_terms={location_term}"
-            
-            print(f"   URL: {url}")
-            self.rate_limit()
-            response = self.session.get(url, timeout=15)
-            
-            print(f"   Status Code: {response.status_code}")
-            
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
+            print(f"   URL: {self.yellowpages_url(category, location)}")
+            for lead in self.iter_yellowpages_new(category, location):
+                self.add_lead(lead)
+                        
+        except Exception as e:
+            self.metrics.swallowed('YellowPages', 'scrape', e)
+            print(f"  ❌ Error scraping Yellow Pages: {e}")
+    
+    def yelp_url(self, category, location="Illinois", page=1):
+        """Build the Yelp search URL (Yelp pages by result offset, 10 per page)"""
+        search_term = quote_plus(category)
+        url = f"{self.base_urls['Yelp']}/search?find_desc={search_term}&find_loc={quote_plus(location)}"
+        return f"{url}&start={(page - 1) * 10}" if page > 1 else url
+    
+    def parse_yelp(self, html, category):
+        """Parse a Yelp result page into leads as they are found"""
+        spec = self.specs['Yelp']
+        
+        # Look for business listings
+        results = spec.listings(html)
+        
+        if isinstance(results, list):
+            # A streamed page's listings are only known as they arrive
+            self.log(f"   Found {len(results)} potential results")
+        
+        for idx, result in enumerate(results):
+            try:
+                fields = spec.extract(result)
+                name = fields['name']
                 
-                # Try multiple possible selectors
-                results = (soup.find_all('div', class_='result') or 
-                          soup.find_all('div', class_='search-results') or
-                          soup.find_all('div', class_='organic'))
+                if not name:
+                    self.metrics.inc('listings_dropped', spec.name, reason='no_name')
+                    continue
                 
-                print(f"   Found {len(results)} potential results")
+                # Extract phone (Yelp often hides this)
+                phone = "Check Yelp"
                 
-                if len(results) == 0:
-                    # Try finding any div with business info
-                    results = soup.find_all('div', attrs={'data-business-name': True})
+                # Extract address
+                address = fields['address'] or "N/A"
                 
-                for idx, result in enumerate(results[:20]):
-                    try:
-                        # Try multiple ways to extract business name
-                        name = None
-                        name_elem = (result.find('a', class_='business-name') or
-                                   result.find('h2', class_='n') or
-                                   result.find('a', class_='listing-title') or
-                                   result.get('data-business-name'))
-                        
-                        if name_elem:
-                            if isinstance(name_elem, str):
-                                name = name_elem
-                            else:
-                                name = name_elem.text.strip()
-                        
-                        if not name or name == "N/A":
-                            continue
-                        
-                        # Try multiple ways to extract phone
-                        phone = "N/A"
-                        phone_elem = (result.find('div', class_='phones') or
-                                    result.find('div', class_='phone') or
-                                    result.find('a', href=re.compile(r'tel:')))
-                        
-                        if phone_elem:
-                            phone = phone_elem.text.strip() if hasattr(phone_elem, 'text') else phone_elem.get('href', '').replace('tel:', '')
-                        
-                        # Extract address
-                        address = "N/A"
-                        address_elem = (result.find('div', class_='street-address') or
-                                      result.find('span', class_='street-address') or
-                                      result.find('div', class_='adr'))
-                        
-                        if address_elem:
-                            address = address_elem.text.strip()
-                            city_elem = result.find('div', class_='locality')
-                            if city_elem:
-                                address += ", " + city_elem.text.strip()
-                        
-                        # Check for website
-                        website_elem = result.find('a', class_='track-visit-website') or result.find('a', string=re.compile(r'website', re.I))
-                        has_website = "Yes" if website_elem else "No"
-                        website = website_elem.get('href', 'N/A') if website_elem else "N/A"
-                        
-                        lead = {
-                            'source': 'YellowPages',
-                            'business_name': name,
-                            'phone': phone,
-                            'address': address,
-                            'has_website': has_website,
-                            'website': website,
-                            'category': category,
-                            'state': 'Illinois'
-                        }
-                        
-                        self.leads.append(lead)
-                        print(f"  ✓ Found: {name} | Phone: {phone} | Website: {has_website}")
-                        
-                    except Exception as e:
-                        print(f"  ⚠ Error parsing result {idx}: {e}")
-                        continue
-            else:
-                print(f"  ❌ Failed with status code: {response.status_code}")
-                        
-        except Exception as e:
-            print(f"  ❌ Error scraping Yellow Pages: {e}")
+                # Website check (usually need to visit business page,
+                # see parse_yelp_detail)
+                has_website = "Unknown"
+                website = "N/A"
+                
+                lead = {
+                    'source': 'Yelp',
+                    'business_name': name,
+                    'phone': phone,
+                    'address': address,
+                    'has_website': has_website,
+                    'website': website,
+                    'category': category,
+                    'state': 'Illinois'
+                }
+                if fields['detail']:
+                    # Link to the business page (often relative), popped again
+                    # before the lead is written (see _take_lead)
+                    lead['detail_url'] = fields['detail']
+                
+                self.log(f"  ✓ Found: {name}")
+                yield lead
+                
+            except Exception as e:
+                self.metrics.swallowed(spec.name, 'parse_listing', e)
+                self.metrics.inc('listings_dropped', spec.name, reason='error')
+                self.log(f"  ⚠ Error parsing result {idx}: {e}")
+                continue
+    
+    def detail_parsers(self):
+        """Detail pages read by enrich_details, as {source: (spec name, parser)}"""
+        return {'Yelp': ('YelpDetail', self.parse_yelp_detail)}
+    
+    def parse_yelp_detail(self, html):
+        """Phone, website and full address from a Yelp business page ({} if unrecognized)"""
+        spec = self.specs['YelpDetail']
+        pages = spec.listings(html)
+        if not pages:
+            return {}
+        fields = spec.extract(pages[0])
+        if fields['website']:
+            # Yelp links out through /biz_redir?url=<site>
+            fields['website'] = unwrap_redirect(fields['website'])
+        return {field: value for field, value in fields.items() if value}
+    
+    @staticmethod
+    def apply_yelp_detail(lead, details):
+        """Fill a Yelp lead from parse_yelp_detail's fields"""
+        if details.get('phone'):
+            lead['phone'] = details['phone']
+        if details.get('address'):
+            lead['address'] = details['address']
+        if details.get('website'):
+            lead['website'] = details['website']
+            lead['has_website'] = "Yes"
+        elif details:
+            # The business page was read and links to no website
+            lead['has_website'] = "No"
+    
+    def iter_yelp(self, category, location="Illinois", max_pages=None, max_leads=None):
+        """Stream Yelp leads, following "next page" links"""
+        return self.search_leads(lambda page: self.yelp_url(category, location, page),
+                                 lambda html: self.parse_yelp(html, category),
+                                 max_pages, max_leads)
     
     def scrape_yelp(self, category, location="Illinois"):
         """Scrape Yelp for businesses"""
         print(f"\n🔍 Searching Yelp for {category} in {location}...")
         
         try:
-            # Yelp search URL
-            search_term = quote_plus(category)
-            url = f"https://www.yelp.com/search?find_desc={search_term}&find_loc={location}"
-            
-            print(f"   URL: {url}")
-            self.rate_limit()
-            response = self.session.get(url, timeout=15)
-            
-            print(f"   Status Code: {response.status_code}")
-            
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Look for business listings
-                results = soup.find_all('div', attrs={'data-testid': 'serp-ia-card'}) or soup.find_all('li', class_=re.compile(r'.*lemon.*'))
-                
-                print(f"   Found {len(results)} potential results")
-                
-                for idx, result in enumerate(results[:15]):
-                    try:
-                        # Extract business name
-                        name_elem = result.find('a', class_=re.compile(r'.*businessname.*')) or result.find('h3') or result.find('h2')
-                        name = name_elem.text.strip() if name_elem else None
-                        
-                        if not name:
-                            continue
-                        
-                        # Extract phone (Yelp often hides this)
-                        phone = "Check Yelp"
-                        
-                        # Extract address
-                        address = "N/A"
-                        address_elem = result.find('p', class_=re.compile(r'.*address.*')) or result.find('address')
-                        if address_elem:
-                            address = address_elem.text.strip()
-                        
-                        # Website check (usually need to visit business page)
-                        has_website = "Unknown"
-                        website = "N/A"
-                        
-                        lead = {
-                            'source': 'Yelp',
-                            'business_name': name,
-                            'phone': phone,
-                            'address': address,
-                            'has_website': has_website,
-                            'website': website,
-                            'category': category,
-                            'state': 'Illinois'
-                        }
-                        
-                        self.leads.append(lead)
-                        print(f"  ✓ Found: {name}")
-                        
-                    except Exception as e:
-                        print(f"  ⚠ Error parsing result {idx}: {e}")
-                        continue
+            print(f"   URL: {self.yelp_url(category, location)}")
+            for lead in self.iter_yelp(category, location):
+                detail_url = lead.pop('detail_url', None)
+                if detail_url and self.enrich_details:
+                    detail_url = urljoin(self.base_urls['Yelp'], detail_url)
+                    if self._details.known(detail_url):
+                        details = self._details.reuse(detail_url)
+                    else:
+                        details = None
+                        try:
+                            response = self.fetch(detail_url)
+                            if response.status_code == 200:
+                                details = self.parse_yelp_detail(response.content)
+                        except Exception as e:
+                            # One bad detail page must not end the search: keep the lead
+                            self.metrics.swallowed('YelpDetail', 'fetch', e)
+                            self.log(f"  ⚠ Could not fetch {detail_url}: {e}")
+                        self._details.finish(detail_url, details)
+                    self.apply_yelp_detail(lead, details or {})
+                self.add_lead(lead)
                         
         except Exception as e:
+            self.metrics.swallowed('Yelp', 'scrape', e)
             print(f"  ❌ Error scraping Yelp: {e}")
     
     def scrape_google_maps_alternative(self, category, city="Chicago"):
@@ -247,22 +503,15 @@ class IllinoisLeadScraper:
             return
         
         if filename is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"illinois_leads_{timestamp}.csv"
+            filename = timestamped_filename()
         
         try:
-            with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                fieldnames = ['source', 'business_name', 'phone', 'address', 
-                            'has_website', 'website', 'category', 'state']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                
-                writer.writeheader()
-                writer.writerows(self.leads)
+            self.leads.write_csv(filename)
             
             print(f"\n✅ Exported {len(self.leads)} leads to {filename}")
             
             # Print statistics
-            no_website = sum(1 for lead in self.leads if lead['has_website'] == 'No')
+            no_website = self.leads.statistics()['no_website']
             print(f"\n📊 Statistics:")
             print(f"   Total leads: {len(self.leads)}")
             if no_website > 0:
@@ -270,41 +519,469 @@ class IllinoisLeadScraper:
                 print(f"   With website: {len(self.leads) - no_website}")
             
         except Exception as e:
+            self.metrics.swallowed('export', 'export_to_csv', e)
             print(f"\n❌ Error exporting to CSV: {e}")
     
-    def run_search(self, categories, cities=["Chicago", "Springfield", "Rockford"]):
-        """Run the scraper across multiple sources"""
+    def _job(self, unit):
+        """Engine job (unit, url) for one crawl unit"""
+        build_url, parse = self._source_funcs[unit.source]
+        return (unit, build_url(unit.category, unit.location, page=unit.page))
+    
+    def _unit_failed(self, unit, error):
+        self._progress.record(unit, 0)
+        if self.budget is not None:
+            # A host behind an open breaker was never asked
+            self.budget.record(unit, 0, requests=0 if isinstance(error, CircuitOpenError) else 1)
+        if self.ledger is not None:
+            self.ledger.mark_failed(unit, error)
+        return []
+    
+    def _mark_done(self, unit, found):
+        if self.ledger is not None:
+            # Leads reach the file before their unit is marked done
+            if self.sink is not None:
+                self.sink.flush()
+            if self.store is not None:
+                self.store.flush()
+            self.ledger.mark_done(unit, found)
+    
+    def _take_lead(self, unit, lead, page_url):
+        """Write a lead, or park it behind its detail page; returns detail jobs to fetch"""
+        detail_url = lead.pop('detail_url', None)
+        if detail_url is None or not self.enrich_details:
+            self.add_lead(lead)
+            return []
+        detail_url = urljoin(page_url, detail_url)
+        if self._details.known(detail_url):
+            self.apply_yelp_detail(lead, self._details.reuse(detail_url))
+            self.add_lead(lead)
+            return []
+        if self._details.wait(unit, lead, detail_url):
+            return [detail_job(unit, detail_url)]
+        return []
+    
+    def _handle_detail(self, job, response, error):
+        """Fill and write the leads parked behind one fetched detail page"""
+        unit, url, _ = job
+        details = None
+        if self.budget is not None:
+            self.budget.record(unit, 0, job=job)
+        if error is not None:
+            self.metrics.swallowed('YelpDetail', 'fetch', error)
+            self.log(f"  ⚠ Could not fetch {url}: {error}")
+        else:
+            self.record_response('YelpDetail', response)
+            parsed = getattr(response, 'parsed', None)
+            if parsed is not None:
+                print(parsed.log, end='')
+                self.specs['YelpDetail'].add_counters(parsed.counters)
+                self.metrics.merge(parsed.metrics)
+                self.metrics.observe('parse_seconds', 'YelpDetail', parsed.seconds)
+                details = parsed.leads[0]
+            elif response.status_code == 200:
+                started = time.perf_counter()
+                details = self.parse_yelp_detail(response.content)
+                self.metrics.observe('parse_seconds', 'YelpDetail', time.perf_counter() - started)
+            else:
+                self.log(f"  ⚠ {url} answered {response.status_code}")
+        for lead_unit, lead in self._details.finish(url, details):
+            self.apply_yelp_detail(lead, details or {})
+            self.add_lead(lead)
+            if self.budget is not None:
+                self.budget.record(lead_unit, is_prospect(lead), requests=0, finished=False)
+            self.log(f"  ✓ Details: {lead['business_name']} | Phone: {lead['phone']} | "
+                     f"Website: {lead['has_website']}")
+            found = self._details.release(lead_unit)
+            if found is not None:
+                self._mark_done(lead_unit, found)
+        return []
+    
+    def _handle_response(self, job, response, error):
+        """Parse one finished fetch from the async engine; returns the next pages to fetch"""
+        if is_detail_job(job):
+            return self._handle_detail(job, response, error)
+        unit, url = job
+        build_url, parse = self._source_funcs[unit.source]
+        self.log(f"\n🔍 {unit.source} results for {unit.category} in {unit.location} "
+                 f"(page {unit.page}) {self._progress.status()}...")
+        self.log(f"   URL: {url}")
+        if error is not None:
+            self.metrics.swallowed(unit.source, 'fetch', error)
+            print(f"  ❌ Error scraping {unit.source}: {error}")
+            return self._unit_failed(unit, error)
+        self.record_response(unit.source, response)
+        self.log(f"   Status Code: {response.status_code}")
+        if response.status_code != 200:
+            print(f"  ❌ Failed with status code: {response.status_code}")
+            return self._unit_failed(unit, f"HTTP {response.status_code}")
+        
+        html = response.content
+        has_next = has_next_page(html)
+        follow_ups = []
+        # Follow the "next page" link up to max_pages
+        if unit.page < self.max_pages and has_next:
+            follow_ups.append(unit._replace(page=unit.page + 1))
+        
+        key = unit[:3]
+        found = 0
+        parsed = getattr(response, 'parsed', None)
+        if parsed is not None:
+            # Parsed in a worker process: replay its output, selector hits and metrics here
+            print(parsed.log, end='')
+            self.specs[unit.source].add_counters(parsed.counters)
+            self.metrics.merge(parsed.metrics)
+            parse_seconds = parsed.seconds
+            leads = parsed.leads
+        else:
+            started = time.perf_counter()
+            leads = list(parse(html, unit.category))
+            parse_seconds = time.perf_counter() - started
+        self.metrics.observe('parse_seconds', unit.source, parse_seconds)
+        if self.shards is not None:
+            # Sharded: a saturated search splits into smaller areas, a redundant one stops
+            follow_ups = self.shards.follow_ups(unit, has_next, leads)
+        detail_jobs = []
+        prospects = 0
+        for lead in leads:
+            detail_jobs.extend(self._take_lead(unit, lead, url))
+            # A lead parked behind its detail page is credited once that page is in
+            prospects += is_prospect(lead)
+            found += 1
+            self._search_counts[key] = self._search_counts.get(key, 0) + 1
+            if self.max_leads is not None and self._search_counts[key] >= self.max_leads:
+                follow_ups = []
+                break
+        
+        if self.ledger is not None:
+            follow_ups = self.ledger.plan(follow_ups)
+        # A unit whose leads wait on detail pages is done once the last one is written
+        if not self._details.defer(unit, found):
+            self._mark_done(unit, found)
+        self._progress.plan(follow_ups)
+        cell = self._progress.record(unit, found)
+        self.log(f"  ✓ {found} leads | {cell} so far for {unit.category} in {unit.location}")
+        next_jobs = [self._job(next_unit) for next_unit in follow_ups]
+        if self.budget is not None:
+            # The budget decides when, and whether, later pages and detail pages are fetched
+            self.budget.record(unit, prospects)
+            self.budget.add(detail_jobs + next_jobs)
+            return []
+        return detail_jobs + next_jobs
+    
+    def run_search(self, categories, cities=DEFAULT_CITIES, max_concurrency=4, sink=None, ledger=None,
+                   store=None, new_only=False, parse_workers=0, worker=None, shard=False,
+                   budget=None):
+        """Run the scraper across multiple sources
+
+        Every category is searched in every city (cities=None searches the
+        whole state at once); the grid is drained by a bounded pool of
+        workers per directory, biggest metros first, with progress and
+        per-cell lead counts printed as pages finish.
+        With a CsvLeadSink, leads are deduplicated and written as they arrive
+        instead of being collected in self.leads. With a CrawlLedger, every
+        (source, category, location, page) unit is recorded, and units the
+        ledger already has as done are skipped. With a LeadStore, leads are
+        upserted across runs, and new_only keeps already-known, unchanged
+        leads out of the sink. With parse_workers > 0, result pages are
+        parsed in that many worker processes while fetching continues.
+        With worker set (an id), the plan already in the ledger is shared
+        with other processes: units are claimed under leases as the queues
+        run low, pages found are leased to this worker, and each host's rate
+        limit is shared through the ledger file.
+        With shard, a search that still has a next page at its last
+        reachable page is split into the state's cities, and a city into
+        its ZIP codes (geo_shards.py); a search whose page brings only
+        leads already found is pruned.
+        With a BudgetScheduler (crawl_budget.py), searches are sent a few at
+        a time, those yielding the most leads with a phone and no website
+        first, until its request or time budget is spent; pages left over
+        stay pending in the ledger. Not combined with worker.
+        With enrich_details, each Yelp lead's business page is queued on
+        the same per-host workers and rate limit, and the lead is written
+        once that page arrives.
+        """
+        self.sink = sink
+        self.ledger = ledger
+        self.store = store
+        self.new_only = new_only and store is not None
         print("="*60)
         print("Illinois Business Lead Scraper v2.0")
         print("="*60)
         
-        for category in categories:
-            print(f"\n{'='*60}")
-            print(f"Searching for: {category}")
-            print(f"{'='*60}")
-            
-            # Try Yellow Pages with improved parsing
-            self.scrape_yellowpages_new(category)
-            
-            # Try Yelp
-            self.scrape_yelp(category)
+        # Plan page 1 of every (source, category, city) cell, biggest metros
+        # first; different directories are fetched at the same time, each host
+        # waits only on its own token bucket, and later pages are queued as
+        # "next page" links are found
+        self._source_funcs = {source: (build_url, parse) for source, build_url, parse in self.sources()}
+        units = plan_grid(categories, cities, list(self._source_funcs))
+        refill = None
+        if worker is not None:
+            if ledger.owner is None:
+                ledger.join(worker)
+            self.limiter = SharedRateLimiter.like(self.limiter, ledger.path)
+            units = []
+            refill = lease_refill(ledger, list(self._source_funcs), self._job,
+                                  on_claim=lambda claimed: self._progress.plan(claimed))
+            print(f"\n👷 Worker {worker}: claiming units from {ledger.path}")
+        elif ledger is not None:
+            ledger.plan(units)
+            units = [unit for unit in ledger.unfinished() if unit.source in self._source_funcs]
+            print(f"\n📒 {len(units)} units left to crawl in {ledger.path}")
+        self.shards = ShardPlanner(self.max_pages) if shard else None
+        if self.shards is not None:
+            self.shards.plan(units)
+        jobs = [self._job(unit) for unit in units]
+        self.budget = budget
+        if budget is not None:
+            # One unit in flight per engine worker and host, the rest wait their turn
+            budget.depth = max_concurrency
+            budget.add(jobs)
+            jobs, refill = [], budget.refill
+            print(f"\n🎯 Spending the budget on {budget.left()} searches "
+                  f"({max_concurrency} at a time)...")
+        self._search_counts = {}
+        self._details = DetailQueue()
+        self._progress = GridProgress(units)
         
-        # Remove duplicates
-        print(f"\n🔄 Removing duplicates...")
-        seen = set()
-        unique_leads = []
-        for lead in self.leads:
-            identifier = (lead['business_name'].lower(), lead['phone'])
-            if identifier not in seen and lead['business_name'] != "N/A":
-                seen.add(identifier)
-                unique_leads.append(lead)
+        if refill is None:
+            print(f"\n🚀 Fetching {len(jobs)} searches ({max_concurrency} at a time)...")
+        parser = (ParsePool(type(self), parse_workers, scraper_kwargs={'quiet': self.quiet})
+                  if parse_workers else None)
+        # A pool per directory as big as the requests in flight to it, so none
+        # waits for (or opens and drops) a connection of its own
+        self.transport.size_pools({host_of(url): max_concurrency for url in self.base_urls.values()})
+        engine = AsyncFetchEngine(self.session, self.limiter, max_concurrency=max_concurrency,
+                                  cache=self.cache, parser=parser, retry=self.retry,
+                                  breakers=self.breakers)
+        try:
+            elapsed = engine.fetch_all(jobs, self._handle_response,
+                                       priority=lambda job: unit_priority(job[0]), refill=refill)
+        finally:
+            if parser is not None:
+                parser.close()
+        print(f"\n⏱  Fetched {engine.completed} pages in {elapsed:.1f}s")
+        for host, retries in engine.retried.items():
+            self.metrics.inc('retries', self.source_of(f"http://{host}/"), retries)
+        if self.shards is not None:
+            # Too many locations for the category x city table
+            self.shards.report()
+        else:
+            self._progress.report()
+        if self.budget is not None:
+            self.budget.report()
+        if self.enrich_details:
+            self._details.report('Yelp')
+        self.metrics.report()
+        self.limiter.report()
+        self.breakers.report()
+        if self.cache is not None:
+            self.cache.report()
+        self.transport.report()
+        for spec in self.specs.values():
+            if spec.name in self._source_funcs or spec.pages:
+                spec.report()
+        if self.ledger is not None:
+            self.ledger.report()
+        if self.store is not None:
+            self.store.flush()
+            self.store.report()
+        
+        if self.sink is not None:
+            print(f"\n✓ Streamed {self.sink.total} unique leads to {self.sink.filename}")
+            return
         
-        self.leads = unique_leads
+        # Merge duplicates: same phone, or near-identical name in the same ZIP
+        print(f"\n🔄 Removing duplicates...")
+        self.leads = resolve_duplicates(self.leads)
         print(f"✓ Kept {len(self.leads)} unique leads")
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Illinois Business Lead Scraper v2.0")
+    parser.add_argument('--resume', action='store_true',
+                        help="continue the last run from its crawl ledger: skip finished "
+                             "pages and retry only pending or failed ones")
+    parser.add_argument('--ledger', default='crawl_ledger.sqlite3',
+                        help="SQLite work ledger file (default: %(default)s)")
+    parser.add_argument('--store', default='leads.sqlite3',
+                        help="SQLite lead store shared across runs (default: %(default)s)")
+    parser.add_argument('--new-only', action='store_true',
+                        help="only write leads that are new or changed since earlier runs")
+    parser.add_argument('--export-changes', metavar='PATH',
+                        help="after the run, write the store's leads that are new or changed "
+                             "since --since (default: since this run started) to a CSV")
+    parser.add_argument('--since', type=parse_since, metavar='DATE',
+                        help="start of --export-changes, e.g. 2024-11-01 or 2024-11-01T08:00")
+    parser.add_argument('--cities', type=lambda text: [c.strip() for c in text.split(',') if c.strip()],
+                        help="comma-separated cities to search, e.g. \"Chicago,Peoria\"")
+    parser.add_argument('--top-cities', type=int, metavar='N',
+                        help="search the N most populous Illinois cities")
+    parser.add_argument('--shard', action='store_true',
+                        help="start from statewide searches (or --cities) and split any that "
+                             "hit a directory's result cap into cities, then ZIP codes")
+    parser.add_argument('--parse-workers', type=int, default=default_workers(), metavar='N',
+                        help="processes that parse result pages while fetching continues; "
+                             "0 parses in the main process (default: %(default)s)")
+    parser.add_argument('--quiet', action='store_true',
+                        help="no per-lead or per-page output, only summaries")
+    parser.add_argument('--metrics-json', metavar='FILE',
+                        help="JSON run report (default: next to the CSV, .metrics.json)")
+    parser.add_argument('--metrics-prom', metavar='FILE',
+                        help="Prometheus text file (default: next to the CSV, .prom)")
+    parser.add_argument('--verify-websites', action='store_true',
+                        help="after the crawl, check every lead's website and label it "
+                             "live, dead, redirected or parked")
+    parser.add_argument('--normalize-addresses', action='store_true',
+                        help="after the crawl, split addresses into street, city, ZIP and "
+                             "county and flag out-of-state listings (offline)")
+    parser.add_argument('--workers', type=int, metavar='N',
+                        help="crawl with N local worker processes that share the ledger's "
+                             "queue and each host's rate limit; their leads are merged at the end")
+    parser.add_argument('--join', action='store_true',
+                        help="work on the crawl already planned in --ledger as one more "
+                             "worker, writing leads to its own part file")
+    parser.add_argument('--worker-id', metavar='ID',
+                        help="this worker's name in the ledger (default: hostname-pid)")
+    parser.add_argument('--export', action='append', default=[], metavar='PATH',
+                        help="also write the final leads to PATH; the format follows the "
+                             f"extension ({', '.join(FORMATS.values())}); repeatable")
+    parser.add_argument('--partition-by', choices=PARTITION_FIELDS,
+                        help="write each --export as a directory with one file per source "
+                             "or category")
+    parser.add_argument('--yelp-details', action='store_true',
+                        help="fetch each Yelp business page for its phone, website and full "
+                             "address (one extra request per business)")
+    parser.add_argument('--budget-requests', type=int, metavar='N',
+                        help="stop after N search requests, spent on the sources, categories "
+                             "and cities yielding the most leads with a phone and no website")
+    parser.add_argument('--budget-minutes', type=float, metavar='M',
+                        help="stop sending requests after M minutes, spent the same way")
+    args = parser.parse_args()
+    if args.since is not None and not args.export_changes:
+        parser.error("--since needs --export-changes")
+    if args.export_changes and args.join:
+        parser.error("--export-changes runs in the process that starts the workers, not --join")
+    if (args.budget_requests or args.budget_minutes) and (args.workers or args.join):
+        parser.error("--budget-requests/--budget-minutes need a single process "
+                     "(not --workers or --join)")
+    for path in args.export:
+        try:
+            check_format(format_of(path.rstrip('/\\')))
+        except (ValueError, RuntimeError) as e:
+            parser.error(f"--export {path}: {e}")
+    return args
+
+
+def budget_from(args):
+    """BudgetScheduler for --budget-requests/--budget-minutes, or None"""
+    if not args.budget_requests and not args.budget_minutes:
+        return None
+    return BudgetScheduler(max_requests=args.budget_requests,
+                           max_seconds=args.budget_minutes * 60 if args.budget_minutes else None)
+
+
+def export_store_changes(store, args):
+    """--export-changes: the store's leads new or changed since --since (default: this run)"""
+    if args.export_changes:
+        store.export_changes(args.export_changes, since=args.since)
+
+
+def resume_plan(ledger):
+    """Categories, cities and output file of the run recorded in ledger, or None"""
+    categories = ledger.meta('categories')
+    filename = ledger.meta('output')
+    if not categories or not filename:
+        print(f"\n❌ Nothing to resume in {ledger.path}")
+        return None
+    print(f"\n♻️  Resuming {len(categories)} categories into {filename}")
+    return categories, ledger.meta('cities'), filename
+
+
+def report_merged(before, after):
+    if before > after:
+        print(f"\n🔗 Merged {before - after} fuzzy duplicates across sources: {after} leads remain")
+
+
+def write_run_report(metrics, filename, args):
+    """Write the JSON run report and Prometheus text file for a run into filename"""
+    stem = os.path.splitext(filename)[0]
+    json_path = args.metrics_json or f"{stem}.metrics.json"
+    prom_path = args.metrics_prom or f"{stem}.prom"
+    metrics.write_json(json_path)
+    metrics.write_prometheus(prom_path)
+    print(f"\n📈 Run report: {json_path} | Prometheus metrics: {prom_path}")
+
+
+def write_exports(filename, args):
+    """Convert the finished CSV into each --export path"""
+    for path in args.export:
+        written = export_csv(filename, path, partition_by=args.partition_by)
+        print(f"📦 Exported {written} leads to {path}")
+
+
+def run_worker(args):
+    """--join: crawl units of the plan in --ledger alongside the other workers"""
+    ledger = CrawlLedger(args.ledger)
+    filename = ledger.meta('output')
+    if not filename:
+        print(f"\n❌ No crawl planned in {ledger.path}")
+        ledger.close()
+        return
+    store = LeadStore(args.store)
+    worker = args.worker_id or default_worker_id()
+    part = part_filename(filename, worker)
+    scraper = IllinoisLeadScraper(quiet=args.quiet, enrich_details=args.yelp_details)
+    sink = CsvLeadSink(part)
+    try:
+        scraper.run_search(ledger.meta('categories'), ledger.meta('cities'), sink=sink,
+                           ledger=ledger, store=store, new_only=args.new_only,
+                           parse_workers=args.parse_workers, worker=worker,
+                           shard=ledger.meta('shard', False))
+    except KeyboardInterrupt:
+        print(f"\n\n⚠️  Worker {worker} interrupted - its unfinished units go back to the queue")
+    finally:
+        sink.close()
+        ledger.close()
+        store.close()
+        write_run_report(scraper.metrics, part, args)
+
+
+def run_workers(scraper, categories, cities, filename, ledger, store, args):
+    """--workers N: plan the whole crawl, run N local workers on it, merge their leads"""
+    ledger.plan(plan_grid(categories, cities, [name for name, _, _ in scraper.sources()]))
+    # Split the parse processes between the workers rather than giving each a full set
+    argv = ['--ledger', args.ledger, '--store', args.store,
+            '--parse-workers', str(args.parse_workers // args.workers)]
+    if args.quiet:
+        argv.append('--quiet')
+    if args.new_only:
+        argv.append('--new-only')
+    if args.yelp_details:
+        argv.append('--yelp-details')
+    print(f"\n👷 Starting {args.workers} workers on {args.ledger}")
+    try:
+        failed = wait_for(spawn_workers(args.workers, argv))
+        if failed:
+            print(f"\n⚠️  {failed} workers exited with an error")
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Interrupted - keeping the leads found so far")
+        print("   Run again with --resume to finish the remaining work")
+    ledger.report()
+    return merge_parts(filename)
+
+
 def main():
     """Main function to run the scraper"""
+    args = parse_args()
+    if args.join:
+        run_worker(args)
+        return
+    # Sharded crawls start statewide unless cities are given
+    default_cities = None if args.shard else DEFAULT_CITIES
+    cities = args.cities or (top_cities(args.top_cities) if args.top_cities else default_cities)
+    shard = args.shard
+    ledger = CrawlLedger(args.ledger)
+    store = LeadStore(args.store)
     
     categories = [
         "medical offices",
@@ -314,29 +991,79 @@ def main():
         "insurance agencies"
     ]
     
-    print("\n🎯 Target Categories:")
-    for i, cat in enumerate(categories, 1):
-        print(f"   {i}. {cat}")
-    
-    print("\n" + "="*60)
-    print("Options:")
-    print("1. Press Enter to scrape with default categories")
-    print("2. Type custom categories (comma-separated)")
-    print("3. Type 'manual' to add leads manually")
-    response = input("\nYour choice: ").strip()
+    if args.resume:
+        plan = resume_plan(ledger)
+        if plan is None:
+            return
+        categories, cities, filename = plan
+        shard = ledger.meta('shard', False)
+        response = ""
+    else:
+        print("\n🎯 Target Categories:")
+        for i, cat in enumerate(categories, 1):
+            print(f"   {i}. {cat}")
+        
+        print("\n" + "="*60)
+        print("Options:")
+        print("1. Press Enter to scrape with default categories")
+        print("2. Type custom categories (comma-separated)")
+        print("3. Type 'manual' to add leads manually")
+        response = input("\nYour choice: ").strip()
+        filename = timestamped_filename()
     
-    scraper = IllinoisLeadScraper()
+    scraper = IllinoisLeadScraper(quiet=args.quiet, enrich_details=args.yelp_details)
+    sink = None
     
     if response.lower() == 'manual':
+        ledger.close()
+        store.close()
         scraper.add_manual_leads()
+        if scraper.leads:
+            scraper.export_to_csv(filename)
+            if os.path.exists(filename):
+                write_exports(filename, args)
     else:
         if response and response.lower() != 'manual':
             categories = [cat.strip() for cat in response.split(',')]
+        if not args.resume:
+            ledger.reset(categories=categories, cities=cities, output=filename, shard=shard)
         
-        scraper.run_search(categories)
+        if args.workers:
+            try:
+                sink = run_workers(scraper, categories, cities, filename, ledger, store, args)
+                export_store_changes(store, args)
+            finally:
+                ledger.close()
+                store.close()
+        else:
+            # Leads are written as they are found, so a crash or Ctrl-C keeps them;
+            # the ledger records finished pages so --resume picks up where we stopped
+            sink = CsvLeadSink(filename)
+            try:
+                scraper.run_search(categories, cities, sink=sink, ledger=ledger,
+                                   store=store, new_only=args.new_only,
+                                   parse_workers=args.parse_workers, shard=shard,
+                                   budget=budget_from(args))
+            except KeyboardInterrupt:
+                print("\n\n⚠️  Interrupted - keeping the leads found so far")
+                print("   Run again with --resume to finish the remaining work")
+            else:
+                export_store_changes(store, args)
+            finally:
+                sink.close()
+                ledger.close()
+                store.close()
+                write_run_report(scraper.metrics, filename, args)
+        if sink.total:
+            sink.print_statistics()
+            report_merged(*resolve_csv(filename))
+            if args.verify_websites:
+                verify_csv(filename)
+            if args.normalize_addresses:
+                normalize_csv(filename)
+            write_exports(filename, args)
     
-    if scraper.leads:
-        scraper.export_to_csv()
+    if scraper.leads or (sink is not None and sink.total):
         print("\n" + "="*60)
         print("✅ Scraping complete!")
         print("="*60)
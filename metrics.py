@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Run metrics
+Counters and latency histograms labelled by source (request latency, status
+codes, bytes, parse time, listings found and dropped, swallowed exceptions),
+written at the end of a run as a JSON report and a Prometheus text file.
+"""
+
+import json
+import math
+import time
+
+# Upper bounds (seconds) of the histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+PARSE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+
+BUCKETS = {
+    'request_seconds': LATENCY_BUCKETS,
+    'parse_seconds': PARSE_BUCKETS,
+}
+
+HELP = {
+    'requests': "Responses received, by status code",
+    'response_bytes': "Response body bytes received",
+    'wire_bytes': "Response body bytes on the wire, before decoding",
+    'request_seconds': "Request latency",
+    'parse_seconds': "Time to parse one result page",
+    'listings_found': "Listings parsed into leads",
+    'listings_dropped': "Listings dropped while parsing, by reason",
+    'leads_skipped': "Leads not written, by reason",
+    'exceptions': "Exceptions caught and swallowed, by place and type",
+    'retries': "Requests sent again after a transient failure",
+}
+
+
+def _key(name, source, labels):
+    return (name, (('source', source),) + tuple(sorted(labels.items())))
+
+
+class Histogram:
+    """Fixed-bucket histogram (per-bucket counts, not cumulative)"""
+
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for index, bound in enumerate(self.bounds):
+            if value <= bound:
+                break
+        else:
+            index = len(self.bounds)
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def merge(self, other):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.sum += other.sum
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile"""
+        if not self.count:
+            return None
+        target = q * self.count
+        running = 0
+        for bound, count in zip(self.bounds + (math.inf,), self.counts):
+            running += count
+            if running >= target:
+                return bound
+        return math.inf
+
+    def cumulative(self):
+        """[(le, cumulative count)] including +Inf, as Prometheus expects"""
+        running = 0
+        result = []
+        for bound, count in zip(self.bounds + (math.inf,), self.counts):
+            running += count
+            result.append((bound, running))
+        return result
+
+
+class Metrics:
+    """Counters and histograms for one run, labelled by source"""
+
+    def __init__(self):
+        self.started = time.time()
+        self.counters = {}
+        self.histograms = {}
+
+    def inc(self, name, source, amount=1, **labels):
+        key = _key(name, source, labels)
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, source, value, **labels):
+        key = _key(name, source, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram(BUCKETS.get(name, LATENCY_BUCKETS))
+        histogram.observe(value)
+
+    def swallowed(self, source, where, error):
+        """Count an exception that a bare `except Exception` block is about to swallow"""
+        self.inc('exceptions', source, where=where, type=type(error).__name__)
+
+    def merge(self, other):
+        """Add another Metrics (e.g. from a parse worker process) into this one"""
+        for key, value in other.counters.items():
+            self.counters[key] = self.counters.get(key, 0) + value
+        for key, histogram in other.histograms.items():
+            if key in self.histograms:
+                self.histograms[key].merge(histogram)
+            else:
+                self.histograms[key] = histogram
+
+    def total(self, name, source=None, **labels):
+        """Sum of a counter over all label sets matching source/labels"""
+        wanted = dict(labels, **({'source': source} if source is not None else {}))
+        return sum(value for (counter, key_labels), value in self.counters.items()
+                   if counter == name and wanted.items() <= dict(key_labels).items())
+
+    def sources(self):
+        found = {dict(labels)['source'] for _, labels in list(self.counters) + list(self.histograms)}
+        return sorted(found)
+
+    def to_dict(self):
+        finished = time.time()
+        return {
+            'started': self.started,
+            'finished': finished,
+            'duration': finished - self.started,
+            'counters': [{'name': name, 'labels': dict(labels), 'value': value}
+                         for (name, labels), value in sorted(self.counters.items())],
+            'histograms': [{'name': name, 'labels': dict(labels), 'count': h.count, 'sum': h.sum,
+                            'buckets': {str(bound): count for bound, count in h.cumulative()}}
+                           for (name, labels), h in sorted(self.histograms.items())],
+        }
+
+    def write_json(self, path):
+        """JSON run report"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def write_prometheus(self, path, prefix='leadscraper'):
+        """Prometheus text exposition format (for node_exporter's textfile collector)"""
+        def labels_text(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+        lines = []
+        for name in sorted({name for name, _ in self.counters}):
+            metric = f"{prefix}_{name}_total"
+            lines.append(f"# HELP {metric} {HELP.get(name, name)}")
+            lines.append(f"# TYPE {metric} counter")
+            for (counter, labels), value in sorted(self.counters.items()):
+                if counter == name:
+                    lines.append(f"{metric}{labels_text(labels)} {value}")
+        for name in sorted({name for name, _ in self.histograms}):
+            metric = f"{prefix}_{name}"
+            lines.append(f"# HELP {metric} {HELP.get(name, name)}")
+            lines.append(f"# TYPE {metric} histogram")
+            for (histogram_name, labels), h in sorted(self.histograms.items()):
+                if histogram_name != name:
+                    continue
+                for bound, count in h.cumulative():
+                    le = "+Inf" if math.isinf(bound) else repr(float(bound))
+                    lines.append(f"{metric}_bucket{labels_text(labels, [('le', le)])} {count}")
+                lines.append(f"{metric}_sum{labels_text(labels)} {h.sum}")
+                lines.append(f"{metric}_count{labels_text(labels)} {h.count}")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+
+    def report(self):
+        """Print one summary line per source"""
+        print(f"\n📈 Metrics per source:")
+        for source in self.sources():
+            latency = self.histograms.get(_key('request_seconds', source, {}))
+            parse = self.histograms.get(_key('parse_seconds', source, {}))
+            parts = [f"{self.total('requests', source)} responses"]
+            errors = sum(value for (name, labels), value in self.counters.items()
+                         if name == 'requests' and dict(labels)['source'] == source
+                         and not str(dict(labels).get('status')).startswith('2'))
+            if errors:
+                parts.append(f"{errors} non-2xx")
+            parts.append(f"{self.total('response_bytes', source) / 1024:.0f} KB")
+            wire = self.total('wire_bytes', source)
+            if wire:
+                parts.append(f"{wire / 1024:.0f} KB on the wire")
+            if latency and latency.count:
+                parts.append(f"p50 {latency.quantile(0.5)}s / p95 {latency.quantile(0.95)}s")
+            if parse and parse.count:
+                parts.append(f"parse {parse.sum / parse.count * 1000:.1f} ms/page")
+            parts.append(f"{self.total('listings_found', source)} listings")
+            dropped = self.total('listings_dropped', source)
+            if dropped:
+                parts.append(f"{dropped} dropped")
+            retries = self.total('retries', source)
+            if retries:
+                parts.append(f"{retries} retries")
+            swallowed = self.total('exceptions', source)
+            if swallowed:
+                parts.append(f"{swallowed} exceptions")
+            print(f"   {source}: " + " | ".join(parts))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Pagination helpers
+Follow "next page" links and stream leads out of a source as a generator,
+prefetching the next page while the current one is being parsed, or (with
+stream_leads) parsing each page while it is still downloading.
+"""
+
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+# Matches the "next page" link used by the directories we scrape:
+# <a class="next ajax-page">, <a rel="next">, <a aria-label="Next page">
+NEXT_PAGE_RE = re.compile(
+    rb'<a\b[^>]*(?:rel=["\']next["\']|class=["\'][^"\']*\bnext\b[^"\']*["\']|aria-label=["\']next)',
+    re.IGNORECASE)
+# Bytes of the previous chunk kept when scanning for the link, in case it straddles chunks
+NEXT_PAGE_OVERLAP = 512
+STREAM_CHUNK_SIZE = 16 * 1024
+
+
+def has_next_page(html):
+    """Cheap check for a "next page" link, done on raw bytes before parsing"""
+    if isinstance(html, str):
+        html = html.encode('utf-8', 'replace')
+    return NEXT_PAGE_RE.search(html) is not None
+
+
+def iter_pages(fetch, page_url, max_pages=3):
+    """Yield (page, response) for up to max_pages pages
+
+    As soon as page N arrives and has a "next page" link, page N+1 is
+    requested in the background, so the caller's parsing of page N overlaps
+    with the fetch of page N+1. Stops on a non-200 response or when there is
+    no next link. Closing the generator (max_leads reached, Ctrl-C) returns
+    at once: a prefetch not started yet is cancelled, and one already in
+    flight finishes on its own thread without being waited for.
+    """
+    executor = ThreadPoolExecutor(max_workers=1)
+    future = executor.submit(fetch, page_url(1))
+    page = 1
+    try:
+        while future is not None:
+            response = future.result()
+            future = None
+            if response.status_code != 200:
+                print(f"  ❌ Failed with status code: {response.status_code}")
+                return
+            if page < max_pages and has_next_page(response.content):
+                future = executor.submit(fetch, page_url(page + 1))
+            yield page, response
+            page += 1
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_leads(fetch, page_url, parse, max_pages=3, max_leads=None):
+    """Stream leads from a paginated search, stopping at max_leads"""
+    found = 0
+    pages = iter_pages(fetch, page_url, max_pages)
+    try:
+        for page, response in pages:
+            for lead in parse(response.content):
+                yield lead
+                found += 1
+                if max_leads is not None and found >= max_leads:
+                    return
+    finally:
+        pages.close()
+
+
+class PageStream:
+    """Body chunks of a response opened with stream=True, watched for a "next page" link
+
+    Iterating reads the body from the network chunk by chunk. A body read
+    to the end is handed to response.cache_store when the HTTP cache left
+    one (a page abandoned halfway is not cached).
+    """
+
+    def __init__(self, response, chunk_size=STREAM_CHUNK_SIZE):
+        self.response = response
+        self.chunk_size = chunk_size
+        self.has_next = False
+        self.bytes = 0
+        self.complete = False
+
+    def __iter__(self):
+        store = getattr(self.response, 'cache_store', None)
+        body = [] if store is not None else None
+        tail = b""
+        for chunk in self.response.iter_content(self.chunk_size):
+            self.bytes += len(chunk)
+            if not self.has_next:
+                window = tail + chunk
+                self.has_next = has_next_page(window)
+                # Chunks may be shorter than the link: keep the window's end, not just this chunk's
+                tail = window[-NEXT_PAGE_OVERLAP:]
+            if body is not None:
+                body.append(chunk)
+            yield chunk
+        self.complete = True
+        if store is not None:
+            store(b"".join(body))
+
+
+def stream_leads(fetch, page_url, parse, max_pages=3, max_leads=None):
+    """Stream leads from a paginated search, parsing each page while it downloads
+
+    fetch(url) must return a response opened with stream=True; parse gets a
+    PageStream (an iterable of body chunks) instead of the page's bytes.
+    Each lead comes out as soon as its listing closes, and once max_leads
+    is reached the connection is closed without reading the rest. The next
+    page is requested after the current one has been read, since the link
+    is only seen on the way through.
+    """
+    found = 0
+    for page in range(1, max_pages + 1):
+        response = fetch(page_url(page))
+        try:
+            if response.status_code != 200:
+                print(f"  ❌ Failed with status code: {response.status_code}")
+                return
+            body = PageStream(response)
+            for lead in parse(body):
+                yield lead
+                found += 1
+                if max_leads is not None and found >= max_leads:
+                    return
+            if not body.has_next:
+                return
+        finally:
+            response.close()
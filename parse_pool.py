@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Process-pool parse stage
+Fetch workers put raw page bytes on a bounded queue and a ProcessPoolExecutor
+turns them into lead dicts, so BeautifulSoup work runs on other cores instead
+of holding the GIL the fetch threads need. Each worker process builds its own
+scraper once and sends leads, printed output and selector hit counts back.
+"""
+
+import asyncio
+import contextlib
+import io
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from detail_pages import is_detail_job
+from extraction import subtract_counters
+from metrics import Metrics
+
+# leads: lead dicts, log: what the parser printed, counters: selector hit deltas,
+# metrics: what the parser counted (drops, swallowed exceptions), seconds: parse time
+ParsedPage = namedtuple('ParsedPage', ['leads', 'log', 'counters', 'metrics', 'seconds'])
+
+# Per-process scraper, set up by _init_worker
+_scraper = None
+_parsers = {}
+# source -> (spec name, parse(body) -> {field: value}) for detail pages
+_detail_parsers = {}
+
+
+def default_workers():
+    """One parse process per spare core; 0 means parse in the main process"""
+    return max(0, (os.cpu_count() or 1) - 1)
+
+
+def _init_worker(scraper_class, scraper_kwargs):
+    global _scraper, _parsers, _detail_parsers
+    _scraper = scraper_class(cache_dir=None, **scraper_kwargs)
+    _parsers = {name: parse for name, _, parse in _scraper.sources()}
+    _detail_parsers = getattr(_scraper, 'detail_parsers', dict)()
+
+
+def parse_page(job, body):
+    """Parse one fetched result page inside a worker process
+
+    A detail page job comes back with its {field: value} dict as the only lead.
+    """
+    unit = job[0]
+    if is_detail_job(job):
+        spec_name, parse_detail = _detail_parsers[unit.source]
+        parse = lambda: [parse_detail(body)]
+    else:
+        spec_name = unit.source
+        parse = lambda: list(_parsers[unit.source](body, unit.category))
+    spec = _scraper.specs[spec_name]
+    before = spec.counters()
+    _scraper.metrics = Metrics()
+    log = io.StringIO()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(log):
+        leads = parse()
+    seconds = time.perf_counter() - started
+    return ParsedPage(leads, log.getvalue(), subtract_counters(spec.counters(), before),
+                      _scraper.metrics, seconds)
+
+
+class ParsePool:
+    """Parse stage for AsyncFetchEngine, backed by a ProcessPoolExecutor"""
+
+    def __init__(self, scraper_class, workers=None, queue_size=None, scraper_kwargs=None):
+        self.workers = max(1, workers or default_workers())
+        # Fetched pages allowed to wait for a parser before fetching pauses
+        self.queue_size = queue_size or 2 * self.workers
+        self._executor = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                             initargs=(scraper_class, scraper_kwargs or {}))
+
+    async def parse(self, job, body):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._executor, parse_page, job, body)
+
+    def close(self):
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
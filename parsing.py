@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+HTML parsing layer
+Builds BeautifulSoup trees with lxml when it is installed, and only for the
+listing containers we actually read (via SoupStrainer), instead of a full
+pure-Python tree of the whole directory page.
+
+With lxml, a page can also be parsed while it downloads: pull_elements()
+is fed the body chunk by chunk and hands back each element as its end tag
+arrives.
+"""
+
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    from lxml import etree
+    PARSER = 'lxml'
+except ImportError:
+    etree = None
+    PARSER = 'html.parser'
+
+# Incremental parsing needs lxml's pull parser
+STREAMING = etree is not None
+
+FALLBACK_PARSER = 'html.parser'
+
+
+def class_strainer(tag, *classes):
+    """SoupStrainer for <tag> elements carrying any of the given CSS classes
+
+    While parsing, the strainer sees the raw class attribute ("result big"),
+    so match whole words instead of comparing the full string.
+    """
+    pattern = re.compile(r'(?:^|\s)(?:%s)(?:\s|$)' % '|'.join(re.escape(c) for c in classes))
+    return SoupStrainer(tag, class_=pattern)
+
+
+def attr_strainer(tag, **attrs):
+    """SoupStrainer for <tag> elements matching the given attributes"""
+    return SoupStrainer(tag, attrs=attrs)
+
+
+def listing_soup(html, strainer=None, parser=None):
+    """Parse html, keeping only the elements matched by strainer
+
+    Uses lxml when available and falls back to html.parser if lxml is
+    missing or chokes on the document.
+    """
+    parser = parser or PARSER
+    try:
+        return BeautifulSoup(html, parser, parse_only=strainer)
+    except Exception:
+        if parser == FALLBACK_PARSER:
+            raise
+        return BeautifulSoup(html, FALLBACK_PARSER, parse_only=strainer)
+
+
+def pull_elements(chunks, encoding=None):
+    """Yield each lxml element of an HTML document fed as chunks, once its end tag is parsed
+
+    Only as many chunks are read as it takes to reach the next element, so
+    a caller that stops early leaves the rest of the body unread.
+    """
+    parser = etree.HTMLPullParser(events=('end',), encoding=encoding)
+    for chunk in chunks:
+        parser.feed(chunk)
+        for _, element in parser.read_events():
+            yield element
+    parser.close()
+    for _, element in parser.read_events():
+        yield element
+
+
+def element_soup(element):
+    """BeautifulSoup copy of one lxml element, for the usual selector code"""
+    markup = etree.tostring(element, encoding='unicode', method='html', with_tail=False)
+    return listing_soup(markup).find(element.tag)
+
+
+def release(element):
+    """Free a handled element and the siblings before it, so the streamed tree stays small"""
+    element.clear(keep_tail=True)
+    parent = element.getparent()
+    if parent is not None:
+        while element.getprevious() is not None:
+            del parent[0]
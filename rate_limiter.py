@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Per-host token-bucket rate limiting
+Each directory host gets its own rate, burst and jitter, so a request to one
+site never sleeps behind another site's delay.
+"""
+
+import asyncio
+import math
+import random
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+# rate = requests per second, burst = requests allowed back to back,
+# jitter = extra random spacing (seconds) added to each request
+HostLimit = namedtuple('HostLimit', ['rate', 'burst', 'jitter'])
+
+
+def limit_from_delays(min_seconds, max_seconds):
+    """HostLimit equivalent to a random.uniform(min, max) sleep between requests"""
+    rate = 1.0 / min_seconds if min_seconds > 0 else math.inf
+    return HostLimit(rate=rate, burst=1, jitter=max(0.0, max_seconds - min_seconds))
+
+
+class TokenBucket:
+    """Reservation-based token bucket
+
+    reserve() takes a token immediately and returns how long the caller must
+    wait before using it, so queued requests get evenly spaced time slots
+    instead of all sleeping and retrying.
+    """
+
+    def __init__(self, limit, clock=time.monotonic):
+        self.limit = limit
+        self.clock = clock
+        self.tokens = float(limit.burst)
+        self.updated = clock()
+        # Nothing goes out before this (set from a server's Retry-After)
+        self.paused_until = 0.0
+
+    def reserve(self):
+        rate, burst, jitter = self.limit
+        extra = random.uniform(0, jitter) if jitter else 0.0
+        now = self.clock()
+        paused = max(0.0, self.paused_until - now)
+        if math.isinf(rate):
+            return paused + extra
+
+        self.tokens = min(burst, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        # Jitter is charged to the bucket so it also pushes back later requests
+        self.tokens -= 1 + extra * rate
+        if self.tokens >= 0:
+            return paused
+        return paused + -self.tokens / rate
+
+    def pause(self, seconds):
+        """Hold every reservation back until `seconds` from now"""
+        self.paused_until = max(self.paused_until, self.clock() + seconds)
+
+
+class HostRateLimiter:
+    """One token bucket per host, plus wait/fetch time accounting"""
+
+    def __init__(self, default=HostLimit(rate=1 / 3.5, burst=1, jitter=0.0), limits=None):
+        self.default = default
+        self.limits = dict(limits or {})
+        self._buckets = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def set_limit(self, host, rate, burst=1, jitter=0.0):
+        """Override the limit for one host"""
+        with self._lock:
+            self.limits[host] = HostLimit(rate, burst, jitter)
+            self._buckets.pop(host, None)
+
+    def _bucket(self, host):
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = TokenBucket(self.limits.get(host, self.default))
+        return bucket
+
+    def reserve(self, host):
+        """Reserve the next slot for host; returns seconds to wait"""
+        with self._lock:
+            return self._bucket(host).reserve()
+
+    def pause(self, host, seconds):
+        """Send nothing to host for `seconds` (e.g. a 429's Retry-After)"""
+        with self._lock:
+            self._bucket(host).pause(seconds)
+
+    def _record(self, host, field, seconds):
+        with self._lock:
+            stats = self._stats.setdefault(host, {'requests': 0, 'wait': 0.0, 'fetch': 0.0})
+            stats[field] += seconds
+            if field == 'fetch':
+                stats['requests'] += 1
+
+    def wait(self, host):
+        """Block until host's bucket allows another request"""
+        delay = self.reserve(host)
+        if delay > 0:
+            time.sleep(delay)
+        self._record(host, 'wait', delay)
+
+    async def acquire(self, host):
+        """Async version of wait(); other hosts keep running meanwhile"""
+        delay = self.reserve(host)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self._record(host, 'wait', delay)
+
+    def record_fetch(self, host, seconds):
+        """Record time spent actually fetching from host"""
+        self._record(host, 'fetch', seconds)
+
+    def stats(self):
+        """Return {host: {'requests', 'wait', 'fetch'}} totals"""
+        with self._lock:
+            return {host: dict(stats) for host, stats in self._stats.items()}
+
+    def report(self):
+        """Print time each host spent waiting on its limiter vs fetching"""
+        print(f"\n⏳ Rate limiter (per host):")
+        for host, stats in sorted(self.stats().items()):
+            print(f"   {host}: {stats['requests']} requests | "
+                  f"waiting {stats['wait']:.1f}s | fetching {stats['fetch']:.1f}s")
+
+
+class SharedRateLimiter(HostRateLimiter):
+    """HostRateLimiter whose buckets live in a SQLite file, shared by every process using it
+
+    Each reservation is one short write transaction, so several workers
+    crawling the same hosts stay within one combined rate per host rather
+    than one rate each. Buckets run on wall-clock time, which every process
+    on the machine agrees on.
+    """
+
+    def __init__(self, path, default=HostLimit(rate=1 / 3.5, burst=1, jitter=0.0), limits=None,
+                 timeout=30.0):
+        super().__init__(default, limits)
+        self.path = path
+        self._db = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS rate_buckets (
+                host TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated REAL NOT NULL,
+                paused_until REAL NOT NULL
+            )""")
+        self._db.commit()
+
+    @classmethod
+    def like(cls, limiter, path):
+        """Shared limiter with the same default and per-host limits as limiter"""
+        return cls(path, limiter.default, limiter.limits)
+
+    def _update(self, host, change):
+        """Apply change(bucket) to host's stored bucket in one transaction; returns its result"""
+        with self._lock, self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            bucket = TokenBucket(self.limits.get(host, self.default), clock=time.time)
+            row = self._db.execute("SELECT tokens, updated, paused_until FROM rate_buckets "
+                                   "WHERE host = ?", (host,)).fetchone()
+            if row is not None:
+                bucket.tokens, bucket.updated, bucket.paused_until = row
+            result = change(bucket)
+            self._db.execute("INSERT OR REPLACE INTO rate_buckets VALUES (?, ?, ?, ?)",
+                             (host, bucket.tokens, bucket.updated, bucket.paused_until))
+        return result
+
+    def set_limit(self, host, rate, burst=1, jitter=0.0):
+        with self._lock:
+            self.limits[host] = HostLimit(rate, burst, jitter)
+
+    def reserve(self, host):
+        return self._update(host, TokenBucket.reserve)
+
+    def pause(self, host, seconds):
+        self._update(host, lambda bucket: bucket.pause(seconds))
+
+    def close(self):
+        self._db.close()
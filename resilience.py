@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Retries and circuit breakers
+Transient failures (429, 5xx, timeouts, dropped connections) are retried with
+capped exponential backoff, honouring Retry-After. Each host has a circuit
+breaker that opens after repeated failures (403/429/5xx/timeouts), stops
+sending requests for a cooldown, then lets a single probe through; a
+successful probe closes it again, a failed one doubles the cooldown.
+"""
+
+import random
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+# Worth another try after a pause
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Count against a host's breaker: it is blocking us or failing
+FAILURE_STATUSES = (403, 429)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to a host whose breaker is open"""
+
+    def __init__(self, host, retry_in):
+        super().__init__(f"circuit open for {host} (next probe in {retry_in:.0f}s)")
+        self.host = host
+        self.retry_in = retry_in
+
+
+def retry_after(response):
+    """Seconds asked for by a Retry-After header (delta or HTTP date), or None"""
+    if response is None:
+        return None
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_failure(response, error):
+    """True if this outcome should count against the host's breaker"""
+    if error is not None:
+        return isinstance(error, requests.RequestException)
+    return response.status_code in FAILURE_STATUSES or response.status_code >= 500
+
+
+class RetryPolicy:
+    """Capped exponential backoff with full jitter; Retry-After wins when given"""
+
+    def __init__(self, max_attempts=3, base=1.0, cap=60.0, statuses=RETRY_STATUSES):
+        self.max_attempts = max_attempts
+        self.base = base
+        self.cap = cap
+        self.statuses = statuses
+
+    def retryable(self, response, error):
+        if error is not None:
+            return isinstance(error, (requests.Timeout, requests.ConnectionError))
+        return response.status_code in self.statuses
+
+    def backoff(self, attempt, response=None, error=None):
+        """Seconds to wait before attempt + 1, or None to give up"""
+        if attempt >= self.max_attempts or not self.retryable(response, error):
+            return None
+        asked = retry_after(response)
+        if asked is not None:
+            return min(asked, self.cap)
+        return random.uniform(0, min(self.cap, self.base * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """Closed -> open after `threshold` failures in a row -> half-open probe"""
+
+    def __init__(self, host, threshold=5, cooldown=30.0, max_cooldown=600.0):
+        self.host = host
+        self.threshold = threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self.rejected = 0
+
+    def retry_in(self):
+        """Seconds until a probe may be sent (0 when closed)"""
+        if self.state == CLOSED:
+            return 0.0
+        if self.state == HALF_OPEN:
+            # A probe is out; wait for its answer
+            return self.cooldown
+        return max(0.0, self.opened_at + self.cooldown - time.monotonic())
+
+    def allow(self):
+        """May a request go out now? Open breakers let one probe through after the cooldown"""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and time.monotonic() >= self.opened_at + self.cooldown:
+            self.state = HALF_OPEN
+            return True
+        self.rejected += 1
+        return False
+
+    def record(self, response, error=None):
+        """Feed one outcome in; returns True if this closed an open breaker"""
+        if not is_failure(response, error):
+            was_open = self.state != CLOSED
+            self.state = CLOSED
+            self.failures = 0
+            self.cooldown = self.base_cooldown
+            return was_open
+        self.failures += 1
+        if self.state == HALF_OPEN:
+            # Probe failed: stay away twice as long
+            self.cooldown = min(self.max_cooldown, self.cooldown * 2)
+            self._open()
+        elif self.state == CLOSED and self.failures >= self.threshold:
+            self._open()
+        return False
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.trips += 1
+
+
+class Breakers:
+    """One CircuitBreaker per host, created on first use"""
+
+    def __init__(self, threshold=5, cooldown=30.0, max_cooldown=600.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._breakers = {}
+
+    def get(self, host):
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = self._breakers[host] = CircuitBreaker(host, self.threshold, self.cooldown,
+                                                            self.max_cooldown)
+        return breaker
+
+    def report(self):
+        """Print hosts whose breaker tripped during the run"""
+        tripped = [b for b in self._breakers.values() if b.trips]
+        if not tripped:
+            return
+        print(f"\n🔌 Circuit breakers:")
+        for breaker in sorted(tripped, key=lambda b: b.host):
+            print(f"   {breaker.host}: {breaker.state} | opened {breaker.trips}x | "
+                  f"{breaker.rejected} sends refused while open")
@@ -0,0 +1,32 @@
+"""
+Shared fixtures for the unit tests
+Tests run offline: anything that speaks HTTP talks to the benchmarks'
+local stub server on 127.0.0.1.
+"""
+
+import os
+import sys
+
+import pytest
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks')
+if BENCH_DIR not in sys.path:
+    sys.path.insert(0, BENCH_DIR)
+
+from stub_server import StubServer  # noqa: E402
+
+
+@pytest.fixture
+def stub_server():
+    """Start a StubServer for {path: bytes} pages; stopped when the test ends"""
+    servers = []
+    
+    def start(pages, **options):
+        server = StubServer(pages, **options).start()
+        servers.append(server)
+        return server
+    
+    yield start
+    for server in servers:
+        server.stop()
+
@@ -0,0 +1,141 @@
+import csv
+import os
+
+import pytest
+
+from addresses import (EMPTY, Address, AddressIndex, city_key, load_index, normalize_csv,
+                       parse_address, split_street, split_tail)
+
+# Lacks Effingham, so it stands in for a town the gazetteer does not list
+SMALL_INDEX = AddressIndex([('Chicago', 'Cook', ['60601']),
+                            ('Peoria Heights', 'Peoria', ['61616']),
+                            ('Effingham Junction', 'Effingham', ['62402']),
+                            ('Mount Prospect', 'Cook', ['60056']),
+                            ('Tiny', 'Effingham', ['62401'])])
+
+
+def test_city_key():
+    assert city_key('Mt.  Prospect') == 'mount prospect'
+    assert city_key('FT SHERIDAN') == 'fort sheridan'
+
+
+def test_split_tail():
+    assert split_tail('123 Main St, Chicago, IL 60601-1234') == ('123 Main St, Chicago', 'IL', '60601')
+    assert split_tail('1 Maine Rd, Elgin, Illinois') == ('1 Maine Rd, Elgin', 'IL', None)
+    assert split_tail('1 Main St, Albany, New York 12207') == ('1 Main St, Albany', 'NY', '12207')
+    # Lowercase endings are not state codes
+    assert split_tail('9 Elm St, Berlin') == ('9 Elm St, Berlin', None, None)
+
+
+def test_split_street():
+    assert split_street('12 Oak Ave Ste 4 Effingham'.split()) == ('12 Oak Ave Ste 4', 'Effingham')
+    assert split_street('12 Oak Ave N 300 Watson'.split()) == ('12 Oak Ave N 300', 'Watson')
+    assert split_street('12 Main'.split()) is None
+    assert split_street('12 Oak Ave'.split()) is None
+
+
+@pytest.mark.parametrize('address, expected', [
+    ('123 Main St, Chicago, IL 60601-1234',
+     Address('123 Main St', 'Chicago', 'IL', '60601', 'Cook', False)),
+    ('55 Mt Prospect Rd, Mt. Prospect, IL',
+     Address('55 Mt Prospect Rd', 'Mount Prospect', 'IL', None, 'Cook', False)),
+    ('Peoria, IL', Address(None, 'Peoria', 'IL', None, 'Peoria', False)),
+    ('4 Pine Rd, Springfield', Address('4 Pine Rd', 'Springfield', None, None, 'Sangamon', None)),
+    ('1 Main St, Bloomington, IN 47401',
+     Address('1 Main St', 'Bloomington', 'IN', '47401', None, True)),
+    ('1 Main St, Gary, Indiana', Address('1 Main St', 'Gary', 'IN', None, None, True)),
+    ('77 First Ave 63101', Address('77 First Ave', None, None, '63101', None, True)),
+])
+def test_parse_address(address, expected):
+    assert parse_address(address) == expected
+
+
+def test_parse_address_empty():
+    assert parse_address('N/A') == EMPTY
+    assert parse_address('') == EMPTY
+    assert parse_address(None) == EMPTY
+
+
+def test_parse_address_without_comma_before_city():
+    # Manta writes "street city, IL zip"; the longest known city wins
+    assert parse_address('500 Main St Peoria Heights, IL 61616') == Address(
+        '500 Main St', 'Peoria Heights', 'IL', '61616', 'Peoria', False)
+    assert parse_address('12 Oak Ave Ste 4 Effingham, IL 62401') == Address(
+        '12 Oak Ave Ste 4', 'Effingham', 'IL', '62401', 'Effingham', False)
+
+
+def test_unknown_town_is_not_left_in_the_street():
+    # Regression: "12 Oak Ave Effingham IL 62401" gave street "12 Oak Ave Effingham", no city
+    parsed = parse_address('12 Oak Ave Effingham IL 62401', SMALL_INDEX)
+    assert parsed.street == '12 Oak Ave'
+    assert parsed.city == 'Effingham'
+    parsed = parse_address('12 Oak Ave Ste 4 Effingham, IL 62401', SMALL_INDEX)
+    assert (parsed.street, parsed.city) == ('12 Oak Ave Ste 4', 'Effingham')
+
+
+def test_unknown_town_takes_its_zip_county():
+    # Regression: a town the gazetteer lacked had an empty county
+    parsed = parse_address('9 Elm St, Effingham, IL 62401', SMALL_INDEX)
+    assert (parsed.city, parsed.county) == ('Effingham', 'Effingham')
+    parsed = parse_address('9 Elm St 62401', SMALL_INDEX)
+    assert (parsed.city, parsed.county, parsed.state) == ('Tiny', 'Effingham', 'IL')
+
+
+def test_index_loads_po_box_zips():
+    # Regression: the gazetteer's other_zips were not indexed
+    index = load_index()
+    assert index.zips['60664'] == ('Chicago', 'Cook')
+    assert index.match_city('12 Oak Ave Peoria Heights'.split()) == ('Peoria Heights', 'Peoria', 2)
+    assert index.match_city('12 Oak Ave Nowhere'.split()) is None
+
+
+def write_leads(path, rows, fieldnames=('business_name', 'address')):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def read_leads(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def test_normalize_csv_in_place(tmp_path):
+    path = tmp_path / 'leads.csv'
+    write_leads(path, [{'business_name': 'A', 'address': '123 Main St, Chicago, IL 60601'},
+                       {'business_name': 'B', 'address': '1 Main St, Gary, Indiana'},
+                       {'business_name': 'C', 'address': 'N/A'}])
+    counts = normalize_csv(str(path))
+    assert counts == {'illinois': 1, 'out_of_state': 1, 'unknown': 1}
+    rows = read_leads(path)
+    assert [row['business_name'] for row in rows] == ['A', 'B', 'C']
+    assert rows[0]['city'] == 'Chicago' and rows[0]['county'] == 'Cook'
+    assert [row['out_of_state'] for row in rows] == ['No', 'Yes', '']
+    assert os.listdir(tmp_path) == ['leads.csv']
+
+
+def test_normalize_csv_rerun_replaces_columns(tmp_path):
+    path = tmp_path / 'leads.csv'
+    write_leads(path, [{'business_name': 'A', 'address': '123 Main St, Chicago, IL 60601'}])
+    normalize_csv(str(path))
+    normalize_csv(str(path))
+    with open(path, newline='', encoding='utf-8') as f:
+        header = next(csv.reader(f))
+    assert header == ['business_name', 'address', 'street', 'city', 'zip', 'county',
+                      'out_of_state']
+
+
+def test_normalize_csv_keeps_original_on_interrupt(tmp_path, monkeypatch):
+    # Regression: the in-place rewrite truncated the CSV before writing it
+    path = tmp_path / 'leads.csv'
+    rows = [{'business_name': 'A', 'address': '123 Main St, Chicago, IL 60601'}]
+    write_leads(path, rows)
+
+    def interrupt(writer, rows):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(csv.DictWriter, 'writerows', interrupt)
+    with pytest.raises(KeyboardInterrupt):
+        normalize_csv(str(path))
+    assert read_leads(path) == rows
@@ -0,0 +1,177 @@
+import os
+import time
+
+import pytest
+
+from crawl_budget import BudgetScheduler, Yield, is_prospect
+from crawl_ledger import CrawlUnit
+from detail_pages import detail_job, is_detail_job
+from leadscraper2 import IllinoisLeadScraper
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'fixtures')
+HOSTS = {'YellowPages': 'http://yp.test', 'Manta': 'http://manta.test', 'Yelp': 'http://yelp.test'}
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name + '.html'), 'rb') as f:
+        return f.read()
+
+
+def job(source, category='dentists', city='Chicago', page=1):
+    unit = CrawlUnit(source, category, f'{city}, IL', page)
+    return unit, f"{HOSTS[source]}/search?q={category}&loc={city}&page={page}"
+
+
+def test_is_prospect():
+    assert is_prospect({'phone': '(217) 555-0100', 'has_website': 'No'})
+    assert not is_prospect({'phone': '(217) 555-0100', 'has_website': 'Yes'})
+    assert not is_prospect({'phone': 'N/A', 'has_website': 'No'})
+    assert not is_prospect({'has_website': 'No'})
+
+
+def test_yield_mean_is_shrunk_toward_the_prior():
+    stats = Yield()
+    assert stats.rate() == 0.0
+    assert stats.mean(2.0) == 2.0
+    stats.requests, stats.prospects = 1, 10
+    assert stats.rate() == 10.0
+    assert stats.mean(0.0) == 2.0
+
+
+def test_request_budget_stops_refill():
+    budget = BudgetScheduler(max_requests=3, depth=10)
+    budget.add([job('Manta', city=city) for city in ('Chicago', 'Peoria', 'Aurora', 'Joliet', 'Elgin')])
+    sent = budget.refill(0)
+    assert len(sent) == 3
+    assert budget.refill(3) == []
+    for unit, _ in sent:
+        budget.record(unit, 1)
+    assert budget.refill(0) is None
+    assert budget.stopped == "request budget of 3 spent"
+    assert budget.left() == 2
+
+
+def test_time_budget_stops_refill():
+    budget = BudgetScheduler(max_seconds=10)
+    budget.add([job('Manta')])
+    budget.started = time.monotonic() - 11
+    assert budget.refill(0) is None
+    assert budget.stopped == "time budget of 10s spent"
+
+
+def test_depth_caps_units_in_flight_per_host():
+    budget = BudgetScheduler(depth=2)
+    budget.add([job(source, city=city) for source in ('Manta', 'YellowPages')
+                for city in ('Chicago', 'Peoria', 'Aurora')])
+    sent = budget.refill(0)
+    assert sorted(unit.source for unit, _ in sent) == ['Manta', 'Manta', 'YellowPages', 'YellowPages']
+    assert budget.refill(4) == []
+    budget.record(sent[0][0], 0)
+    assert [unit.source for unit, _ in budget.refill(3)] == [sent[0][0].source]
+
+
+def test_without_adaptive_the_grid_order_is_kept():
+    budget = BudgetScheduler(depth=1, adaptive=False)
+    budget.add([job('Manta', city='Peoria'), job('Manta', city='Chicago', page=2),
+                job('Manta', city='Chicago')])
+    order = []
+    while True:
+        sent = budget.refill(0)
+        if not sent:
+            break
+        order += [(unit.location, unit.page) for unit, _ in sent]
+        budget.record(sent[0][0], 0)
+    assert order == [('Chicago, IL', 1), ('Chicago, IL', 2), ('Peoria, IL', 1)]
+
+
+def test_adaptive_budget_moves_to_the_arm_with_prospects():
+    budget = BudgetScheduler(max_requests=40, depth=1, exploration=0.1)
+    cities = [f'City {i}' for i in range(40)]
+    budget.add([job('Manta', city=city) for city in cities])
+    budget.add([job('Yelp', city=city) for city in cities])
+    while True:
+        sent = budget.refill(0)
+        if not sent:
+            break
+        for unit, _ in sent:
+            budget.record(unit, 10 if unit.source == 'Manta' else 0)
+    assert budget.arms[('Manta', 'dentists')].requests > 3 * budget.arms[('Yelp', 'dentists')].requests
+    assert budget.total.requests == 40
+
+
+def test_detail_pages_go_before_further_searches():
+    budget = BudgetScheduler(depth=1)
+    search, later = job('Yelp'), job('Yelp', page=2)
+    budget.add([search])
+    [sent] = budget.refill(0)
+    budget.record(search[0], 0)
+    details = [detail_job(search[0], f"{HOSTS['Yelp']}/biz/{i}") for i in range(2)]
+    budget.add([later] + details)
+    assert (budget.left(), budget.details_left()) == (1, 2)
+    [first] = budget.refill(0)
+    assert is_detail_job(first)
+    budget.record(search[0], 0, job=first)
+    [second] = budget.refill(0)
+    assert is_detail_job(second)
+
+
+def test_detail_pages_count_against_the_request_budget():
+    # Regression: detail pages skipped the scheduler and could overshoot the budget
+    budget = BudgetScheduler(max_requests=3, depth=10)
+    search = job('Yelp')
+    budget.add([search])
+    budget.refill(0)
+    budget.record(search[0], 0)
+    budget.add([detail_job(search[0], f"{HOSTS['Yelp']}/biz/{i}") for i in range(5)])
+    sent = budget.refill(0)
+    assert len(sent) == 2 and all(map(is_detail_job, sent))
+    for detail in sent:
+        budget.record(detail[0], 0, job=detail)
+    assert budget.refill(0) is None
+    assert budget.details_left() == 3
+
+
+def test_report(capsys):
+    budget = BudgetScheduler(max_requests=1)
+    search = job('Yelp')
+    budget.add([search, job('Yelp', city='Peoria')])
+    budget.refill(0)
+    budget.record(search[0], 2)
+    budget.add([detail_job(search[0], f"{HOSTS['Yelp']}/biz/1")])
+    budget.refill(0)
+    budget.report()
+    out = capsys.readouterr().out
+    assert "1/1 requests" in out and "2 prospects" in out
+    assert "Stopped: request budget of 1 spent, 1 units left for --resume" in out
+    assert "1 detail pages not fetched" in out
+    assert "Best: Yelp / dentists: 2 prospects in 1 requests" in out
+
+
+@pytest.fixture
+def yelp(stub_server):
+    """Scraper with Yelp detail pages, pointed at stub Yelp and Yellow Pages servers"""
+    pages = {'/search': fixture('yelp')}
+    pages.update({f'/biz/{i}': fixture('yelp_detail') for i in range(1, 31)})
+    servers = [stub_server(pages), stub_server({'/search': fixture('yellowpages')})]
+    scraper = IllinoisLeadScraper(min_delay=0, max_delay=0, cache_dir=None, max_pages=1, quiet=True,
+                                  enrich_details=True)
+    scraper.base_urls.update({'Yelp': servers[0].url, 'YellowPages': servers[1].url})
+    scraper.servers = servers
+    return scraper
+
+
+def test_run_search_spends_exactly_the_request_budget(yelp):
+    # Regression: detail jobs went straight back to the engine, past the budget
+    budget = BudgetScheduler(max_requests=10)
+    yelp.run_search(['dentists'], cities=None, budget=budget)
+    assert sum(server.requests for server in yelp.servers) == 10
+    assert budget.total.requests == 10
+    assert budget.details_left() == 30 - yelp._details.fetched > 0
+
+
+def test_run_search_progress_line(yelp, capsys):
+    # Regression: max_concurrency caps requests across all directories, not per directory
+    yelp.run_search(['dentists'], cities=None, max_concurrency=4, budget=BudgetScheduler(max_requests=2))
+    out = capsys.readouterr().out
+    assert "Spending the budget on 2 searches (4 at a time)..." in out
+    assert "per directory" not in out
@@ -0,0 +1,42 @@
+from crawl_grid import GridProgress, city_of, location_for, plan_grid, top_cities, unit_priority
+from crawl_ledger import CrawlUnit
+
+
+def test_top_cities():
+    assert top_cities(3) == ['Chicago', 'Aurora', 'Joliet']
+
+
+def test_location_round_trip():
+    assert location_for('Peoria') == 'Peoria, IL'
+    assert location_for(None) == location_for('Illinois') == 'Illinois'
+    assert city_of('Peoria, IL') == 'Peoria'
+    assert city_of('Illinois') is None
+
+
+def test_plan_grid_puts_big_metros_first():
+    units = plan_grid(['dentists', 'law firms'], ['Peoria', 'Chicago', 'Tiny Town'], ['YellowPages', 'Manta'])
+    assert len(units) == 12
+    assert [unit.location for unit in units[::4]] == ['Chicago, IL', 'Peoria, IL', 'Tiny Town, IL']
+    assert all(unit.page == 1 for unit in units)
+    assert plan_grid(['dentists'], None, ['Manta']) == [CrawlUnit('Manta', 'dentists', 'Illinois', 1)]
+
+
+def test_unit_priority_orders_statewide_then_population_then_page():
+    statewide = CrawlUnit('Manta', 'dentists', 'Illinois', 1)
+    chicago2 = CrawlUnit('Manta', 'dentists', 'Chicago, IL', 2)
+    chicago1 = chicago2._replace(page=1)
+    peoria = CrawlUnit('Manta', 'dentists', 'Peoria, IL', 1)
+    assert sorted([peoria, chicago2, statewide, chicago1], key=unit_priority) == [
+        statewide, chicago1, chicago2, peoria]
+
+
+def test_grid_progress_counts_leads_per_cell(capsys):
+    units = plan_grid(['dentists'], ['Chicago', 'Peoria'], ['YellowPages', 'Manta'])
+    progress = GridProgress(units)
+    assert progress.status() == '[0/4 pages]'
+    assert progress.record(units[0], 10) == 10
+    assert progress.record(units[1], 5) == 15
+    progress.plan([units[0]._replace(page=2)])
+    assert progress.status() == '[2/5 pages]'
+    progress.report()
+    assert 'dentists' in capsys.readouterr().out
@@ -0,0 +1,105 @@
+import sys
+
+import pytest
+
+import leadscraper2
+from crawl_ledger import DONE, FAILED, PENDING, CrawlLedger, CrawlUnit
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    ledger = CrawlLedger(str(tmp_path / 'ledger.sqlite3'))
+    yield ledger
+    ledger.close()
+
+
+def units(count, source='YellowPages'):
+    return [CrawlUnit(source, 'dentists', 'Springfield, IL', page) for page in range(1, count + 1)]
+
+
+def test_plan_records_only_new_units(ledger):
+    assert ledger.plan(units(2)) == units(2)
+    assert ledger.plan(units(3)) == units(3)[2:]
+    assert ledger.counts() == {PENDING: 3, 'leased': 0, DONE: 0, FAILED: 0}
+
+
+def test_replanning_keeps_finished_work(ledger):
+    first, second = units(2)
+    ledger.plan([first, second])
+    ledger.mark_done(first, leads=12)
+    ledger.plan([first, second])
+    assert ledger.unfinished() == [second]
+
+
+def test_unfinished_lists_pending_before_failed(ledger):
+    first, second, third = units(3)
+    ledger.plan([first, second, third])
+    ledger.mark_failed(first, TimeoutError('read timed out'))
+    ledger.mark_done(second)
+    assert ledger.unfinished() == [third, first]
+    assert ledger.counts()[FAILED] == 1
+
+
+def test_reset_and_meta(ledger):
+    ledger.plan(units(2))
+    ledger.reset(categories=['dentists'], output='leads.csv', shard=True)
+    assert ledger.unfinished() == []
+    assert ledger.meta('categories') == ['dentists']
+    assert ledger.meta('shard') is True
+    assert ledger.meta('missing', 'default') == 'default'
+
+
+def test_ledger_survives_reopening(tmp_path):
+    path = str(tmp_path / 'ledger.sqlite3')
+    ledger = CrawlLedger(path)
+    ledger.plan(units(2))
+    ledger.mark_done(units(1)[0])
+    ledger.close()
+    ledger = CrawlLedger(path)
+    assert ledger.unfinished() == units(2)[1:]
+    ledger.close()
+
+
+@pytest.fixture
+def closed(monkeypatch, tmp_path):
+    """Run leadscraper2.main() offline; returns the names of what it closed"""
+    closed = []
+    
+    class Ledger(CrawlLedger):
+        def close(self):
+            closed.append('ledger')
+            super().close()
+    
+    class Store(leadscraper2.LeadStore):
+        def close(self):
+            closed.append('store')
+            super().close()
+    
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(leadscraper2, 'CrawlLedger', Ledger)
+    monkeypatch.setattr(leadscraper2, 'LeadStore', Store)
+    monkeypatch.setattr('builtins.input', lambda prompt='': 'dentists')
+    return closed
+
+
+def test_main_closes_ledger_and_store_when_workers_fail(monkeypatch, closed):
+    # Regression: main() only closed them after a clean finish
+    def run_workers(*args):
+        raise RuntimeError('worker crashed')
+    
+    monkeypatch.setattr(sys, 'argv', ['leadscraper2.py', '--workers', '2', '--quiet'])
+    monkeypatch.setattr(leadscraper2, 'run_workers', run_workers)
+    with pytest.raises(RuntimeError):
+        leadscraper2.main()
+    assert sorted(closed) == ['ledger', 'store']
+
+
+def test_main_closes_ledger_and_store_when_the_search_fails(monkeypatch, closed):
+    def run_search(self, *args, **kwargs):
+        raise RuntimeError('search crashed')
+    
+    monkeypatch.setattr(sys, 'argv', ['leadscraper2.py', '--quiet'])
+    monkeypatch.setattr(leadscraper2.IllinoisLeadScraper, 'run_search', run_search)
+    with pytest.raises(RuntimeError):
+        leadscraper2.main()
+    assert sorted(closed) == ['ledger', 'store']
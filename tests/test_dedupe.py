@@ -0,0 +1,106 @@
+import csv
+
+import pytest
+
+from dedupe import (MAX_BLOCK, extract_zip, find_duplicate_groups, is_match, merge_leads, normalize_name,
+                    resolve_csv, resolve_duplicates, soundex)
+from lead_record import LeadBatch
+from lead_sink import FIELDNAMES
+
+
+def make_lead(name, phone='N/A', address='', source='YellowPages', website='N/A'):
+    return {'source': source, 'business_name': name, 'phone': phone, 'address': address,
+            'has_website': 'No' if website == 'N/A' else 'Yes', 'website': website,
+            'category': 'Law Firms', 'state': 'Illinois'}
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('The Smith Law, L.L.C.', 'smith law'),
+    ('Smith & Jones, P.C.', 'smith and jones'),
+    ("O'Brien Dental Co.", 'obrien dental'),
+    ('Acme Inc. and Co', 'acme'),
+    ('LLC', 'llc'),
+    ('', ''),
+])
+def test_normalize_name(name, expected):
+    assert normalize_name(name) == expected
+
+
+def test_soundex():
+    assert soundex('Robert') == soundex('Rupert') == 'R163'
+    assert soundex('Ashcraft') == 'A261'
+    assert soundex('123') == ''
+
+
+def test_extract_zip():
+    assert extract_zip('1 Main St, Chicago, IL 60601-1234') == '60601'
+    assert extract_zip('1 Main St, Chicago, IL') == ''
+    assert extract_zip(None) == ''
+
+
+def test_is_match_compares_lead_dicts():
+    # Regression: is_match took internal records, not leads
+    a = make_lead('Smith Law, LLC', '(312) 555-0001', '1 Main St, Chicago, IL 60601')
+    assert is_match(a, make_lead('The Smith Law', '312.555.0001', '1 Main Street, Chicago'))
+    assert not is_match(a, make_lead('Smith Law, LLC', '(312) 555-0002', '1 Main St, Chicago, IL 60601'))
+    assert not is_match(make_lead('Smith Law', address='Chicago, IL 60601'),
+                        make_lead('Smith Law', address='Peoria, IL 61602'))
+
+
+def test_name_block_meets_listings_without_a_zip():
+    # Regression: a lead with a ZIP was only blocked on soundex+ZIP, so it
+    # never met a Yelp listing with no ZIP
+    leads = [make_lead('Smith Law, LLC', address='1 Main St, Chicago, IL 60601'),
+             make_lead('Smith Law LLC', address='Check Yelp', source='Yelp')]
+    assert find_duplicate_groups(leads) == [[0, 1]]
+
+
+def test_listing_without_phone_never_chains_two_numbers():
+    # Regression: pairwise checks let a phoneless listing join two different numbers
+    leads = [make_lead('Smith Law', '(312) 555-0001', 'Chicago, IL 60601'),
+             make_lead('Smith Law LLC', 'N/A', 'Chicago, IL 60601'),
+             make_lead('The Smith Law', '(312) 555-0002', 'Chicago, IL 60601')]
+    assert find_duplicate_groups(leads) == [[0, 1], [2]]
+
+
+def test_large_blocks_still_find_duplicates():
+    leads = [make_lead(f'Firm {i:03d}', '(312) 555-0001') for i in range(MAX_BLOCK + 10)]
+    leads.append(make_lead('Firm 000 LLC', '(312) 555-0001'))
+    groups = find_duplicate_groups(leads)
+    assert [0, len(leads) - 1] in groups
+    assert len(groups) == MAX_BLOCK + 10
+
+
+def test_merge_combines_sources_and_best_fields():
+    merged = merge_leads([make_lead('Smith Law', 'N/A', 'Chicago', source='Yelp'),
+                          make_lead('Smith Law LLC', '(312) 555-0001', '1 Main St, Chicago, IL 60601',
+                                    source='YellowPages;Manta', website='https://smith.example')])
+    assert merged['source'] == 'Yelp;YellowPages;Manta'
+    assert merged['phone'] == '(312) 555-0001'
+    assert merged['address'] == '1 Main St, Chicago, IL 60601'
+    assert (merged['website'], merged['has_website']) == ('https://smith.example', 'Yes')
+    assert merged['business_name'] == 'Smith Law'
+
+
+def test_resolve_duplicates_keeps_first_seen_order_for_lists_and_batches():
+    leads = [make_lead('N/A'), make_lead('Oak Clinic', '(217) 555-0101'), make_lead('Elm Dental'),
+             make_lead('Oak Clinic, Inc.', '217-555-0101', source='Manta')]
+    resolved = resolve_duplicates(leads)
+    assert [(lead['business_name'], lead['source']) for lead in resolved] == [
+        ('Oak Clinic', 'YellowPages;Manta'), ('Elm Dental', 'YellowPages')]
+    batch = LeadBatch()
+    batch.extend(leads)
+    assert [dict(row) for row in resolve_duplicates(batch)] == resolved
+
+
+def test_resolve_csv_in_place(tmp_path):
+    path = tmp_path / 'leads.csv'
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        writer.writerows([make_lead('Oak Clinic', '(217) 555-0101'),
+                          make_lead('Oak Clinic LLC', '(217) 555-0101', source='Manta')])
+    assert resolve_csv(str(path)) == (2, 1)
+    with open(path, newline='', encoding='utf-8') as f:
+        assert [row['source'] for row in csv.DictReader(f)] == ['YellowPages;Manta']
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['leads.csv']
@@ -0,0 +1,114 @@
+import os
+
+import pytest
+import requests
+
+from detail_pages import DETAIL, DetailQueue, detail_job, is_detail_job, unwrap_redirect
+from leadscraper2 import IllinoisLeadScraper
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'fixtures')
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name + '.html'), 'rb') as f:
+        return f.read()
+
+
+@pytest.fixture
+def yelp(stub_server):
+    """Scraper pointed at stub Yelp and Yellow Pages servers; Yelp cards link to /biz/1 ... /biz/30"""
+    detail = fixture('yelp_detail')
+    pages = {'/search': fixture('yelp')}
+    pages.update({f'/biz/{i}': detail for i in range(1, 31)})
+    yelp_server = stub_server(pages)
+    yellowpages_server = stub_server({'/search': fixture('yellowpages')})
+    scraper = IllinoisLeadScraper(min_delay=0, max_delay=0, cache_dir=None, max_pages=1, quiet=True,
+                                  enrich_details=True)
+    scraper.base_urls.update({'Yelp': yelp_server.url, 'YellowPages': yellowpages_server.url})
+    scraper.yelp_server = yelp_server
+    return scraper
+
+
+def test_detail_jobs():
+    job = detail_job('unit', 'https://www.yelp.com/biz/1')
+    assert job == ('unit', 'https://www.yelp.com/biz/1', DETAIL)
+    assert is_detail_job(job)
+    assert not is_detail_job(('unit', 'https://www.yelp.com/search'))
+
+
+def test_unwrap_redirect():
+    assert unwrap_redirect('/biz_redir?url=https%3A%2F%2Foak.example%2F&cachebuster=1') == 'https://oak.example/'
+    assert unwrap_redirect('https://oak.example/') == 'https://oak.example/'
+
+
+def test_queue_fetches_each_url_once_and_releases_its_leads():
+    queue = DetailQueue()
+    assert queue.wait('unit-a', 'lead-1', '/biz/1')
+    assert not queue.wait('unit-a', 'lead-2', '/biz/1')
+    assert queue.wait('unit-b', 'lead-3', '/biz/2')
+    assert queue.finish('/biz/1', {'phone': '1'}) == [('unit-a', 'lead-1'), ('unit-a', 'lead-2')]
+    assert queue.finish('/biz/2', None) == [('unit-b', 'lead-3')]
+    assert queue.known('/biz/1') and queue.reuse('/biz/2') == {}
+    assert (queue.fetched, queue.failed, queue.reused) == (1, 1, 2)
+
+
+def test_queue_defers_a_unit_until_its_last_lead_is_released():
+    queue = DetailQueue()
+    assert not queue.defer('unit', 5)
+    queue.wait('unit', 'lead-1', '/biz/1')
+    queue.wait('unit', 'lead-2', '/biz/2')
+    assert queue.defer('unit', 7)
+    assert queue.release('unit') is None
+    assert queue.release('unit') == 7
+    assert queue.outstanding == {} and queue.deferred == {}
+
+
+def test_parse_yelp_detail():
+    scraper = IllinoisLeadScraper(cache_dir=None, quiet=True)
+    details = scraper.parse_yelp_detail(fixture('yelp_detail'))
+    assert set(details) == {'phone', 'website', 'address'}
+    assert details['website'].startswith('https://')
+    assert scraper.parse_yelp_detail(b'<html><body>Not found</body></html>') == {}
+
+
+def test_apply_yelp_detail():
+    lead = {'phone': 'Check Yelp', 'address': 'Main St', 'website': 'N/A', 'has_website': 'Unknown'}
+    IllinoisLeadScraper.apply_yelp_detail(lead, {'phone': '(217) 555-0101'})
+    assert (lead['phone'], lead['has_website']) == ('(217) 555-0101', 'No')
+    IllinoisLeadScraper.apply_yelp_detail(lead, {'website': 'https://oak.example'})
+    assert (lead['website'], lead['has_website']) == ('https://oak.example', 'Yes')
+
+
+def test_scrape_yelp_fills_leads_from_detail_pages(yelp):
+    yelp.scrape_yelp('dentists')
+    leads = [yelp.leads.row(i) for i in range(len(yelp.leads))]
+    assert len(leads) == 30
+    assert not any(lead['phone'] == 'Check Yelp' for lead in leads)
+    assert yelp.yelp_server.requests == 31
+
+
+def test_scrape_yelp_keeps_a_lead_whose_detail_page_fails(yelp, monkeypatch):
+    # Regression: an exception fetching one detail page ended the whole search
+    fetch = yelp.fetch
+    
+    def flaky_fetch(url, stream=False):
+        if url.endswith('/biz/2'):
+            raise requests.ConnectionError('connection reset')
+        return fetch(url, stream)
+    
+    monkeypatch.setattr(yelp, 'fetch', flaky_fetch)
+    yelp.scrape_yelp('dentists')
+    leads = [yelp.leads.row(i) for i in range(len(yelp.leads))]
+    assert len(leads) == 30
+    assert leads[1]['phone'] == 'Check Yelp'
+    assert leads[2]['phone'] != 'Check Yelp'
+    assert yelp._details.failed == 1
+    assert yelp.metrics.total('exceptions', 'YelpDetail') == 1
+
+
+def test_run_search_fetches_detail_pages_through_the_engine(yelp):
+    yelp.run_search(['dentists'], cities=None)
+    yelp_leads = [lead for lead in map(yelp.leads.row, range(len(yelp.leads))) if lead['source'] == 'Yelp']
+    assert yelp_leads and not any(lead['phone'] == 'Check Yelp' for lead in yelp_leads)
+    assert yelp._details.fetched == 30
+    assert yelp.yelp_server.requests == 31
@@ -0,0 +1,133 @@
+import csv
+import gzip
+import json
+import os
+
+import pytest
+
+import exporters
+from exporters import (Exporter, PartitionedExporter, check_format, export_csv, export_leads, format_of,
+                       make_exporter, typed_row)
+from lead_record import LeadBatch
+from lead_sink import FIELDNAMES
+
+
+def make_lead(name='Oak Clinic', source='YellowPages', category='law firms', has_website='No', **fields):
+    lead = {'source': source, 'business_name': name, 'phone': '(217) 555-0101',
+            'address': '1 Main St, Springfield, IL 62701', 'has_website': has_website,
+            'website': 'N/A', 'category': category, 'state': 'Illinois'}
+    lead.update(fields)
+    return lead
+
+
+def test_exporter_is_abstract():
+    # Regression: a subclass without write() used to construct fine and fail later
+    class Incomplete(Exporter):
+        pass
+    
+    with pytest.raises(TypeError):
+        Exporter('out.csv')
+    with pytest.raises(TypeError):
+        Incomplete('out.csv')
+
+
+@pytest.mark.parametrize('path, fmt', [
+    ('leads.csv', 'csv'), ('leads.csv.gz', 'csv.gz'), ('out/leads.jsonl.gz', 'jsonl.gz'),
+    ('leads.jsonl.zst', 'jsonl.zst'), ('leads.parquet', 'parquet')])
+def test_format_of(path, fmt):
+    assert format_of(path) == fmt
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        format_of('leads.xlsx')
+    with pytest.raises(ValueError):
+        make_exporter('leads.x', 'xlsx')
+
+
+def test_missing_optional_package_is_reported(monkeypatch):
+    monkeypatch.setattr(exporters, 'pyarrow', None)
+    monkeypatch.setattr(exporters, 'zstandard', None)
+    with pytest.raises(RuntimeError, match='pyarrow'):
+        check_format('parquet')
+    with pytest.raises(RuntimeError, match='zstandard'):
+        check_format('jsonl.zst')
+    check_format('jsonl.gz')
+
+
+def test_typed_row():
+    row = typed_row(make_lead(website='N/A', phone='+1 217-555-0101'))
+    assert (row['has_website'], row['phone'], row['website']) == (False, '2175550101', None)
+    assert typed_row(make_lead(has_website='Unknown', phone='Check Yelp'))['has_website'] is None
+    assert typed_row(make_lead(phone='Check Yelp'))['phone'] is None
+
+
+def test_csv_export_keeps_optional_columns(tmp_path):
+    path = str(tmp_path / 'leads.csv.gz')
+    leads = [make_lead(website_status='live', county='Sangamon'), make_lead('Elm Dental')]
+    assert export_leads(leads, path) == 2
+    with gzip.open(path, 'rt', encoding='utf-8', newline='') as f:
+        reader = csv.DictReader(f)
+        rows = list(reader)
+    assert reader.fieldnames == FIELDNAMES + ['website_status', 'county']
+    assert rows[0]['county'] == 'Sangamon' and rows[1]['county'] == ''
+
+
+def test_empty_csv_export_still_has_a_header(tmp_path):
+    path = tmp_path / 'leads.csv'
+    assert export_leads([], str(path)) == 0
+    assert path.read_text().strip() == ','.join(FIELDNAMES)
+
+
+@pytest.mark.parametrize('name', ['leads.jsonl', 'leads.jsonl.gz', 'leads.jsonl.zst'])
+def test_jsonl_export_is_typed(tmp_path, name):
+    if name.endswith('.zst'):
+        zstandard = pytest.importorskip('zstandard')
+    path = str(tmp_path / name)
+    export_leads(LeadBatch([make_lead(), make_lead('Elm', has_website='Yes')]), path)
+    with open(path, 'rb') as f:
+        raw = f.read()
+    if name.endswith('.gz'):
+        raw = gzip.decompress(raw)
+    elif name.endswith('.zst'):
+        raw = zstandard.ZstdDecompressor().decompressobj().decompress(raw)
+    rows = [json.loads(line) for line in raw.decode('utf-8').splitlines()]
+    assert [(row['business_name'], row['has_website']) for row in rows] == [('Oak Clinic', False), ('Elm', True)]
+    assert rows[0]['phone'] == '2175550101'
+
+
+def test_parquet_export_round_trip(tmp_path):
+    pyarrow = pytest.importorskip('pyarrow')
+    import pyarrow.parquet
+    path = str(tmp_path / 'leads.parquet')
+    exporter = exporters.ParquetExporter(path, row_group_size=2)
+    with exporter:
+        exporter.write_all([make_lead(f'Business {i}', has_website=('Yes', 'No')[i % 2]) for i in range(5)])
+    table = pyarrow.parquet.read_table(path)
+    assert table.num_rows == 5
+    assert pyarrow.parquet.ParquetFile(path).num_row_groups == 3
+    assert table.column('has_website').to_pylist() == [True, False, True, False, True]
+    assert pyarrow.types.is_dictionary(table.schema.field('source').type)
+
+
+def test_partitioned_export(tmp_path):
+    directory = tmp_path / 'out'
+    leads = [make_lead('A', category='law firms'), make_lead('B', category='dentists'),
+             make_lead('C', category='law firms'), make_lead('D', category='')]
+    with PartitionedExporter(str(directory), 'jsonl', by='category') as exporter:
+        exporter.write_all(leads)
+    assert exporter.written == 4
+    assert sorted(os.listdir(directory)) == ['category=dentists', 'category=law%20firms', 'category=unknown']
+    with open(directory / 'category=law%20firms' / 'part-0.jsonl', encoding='utf-8') as f:
+        assert [json.loads(line)['business_name'] for line in f] == ['A', 'C']
+    with pytest.raises(ValueError):
+        PartitionedExporter(str(directory), 'jsonl', by='phone')
+
+
+def test_export_csv_converts_a_lead_file(tmp_path):
+    source = tmp_path / 'leads.csv'
+    with open(source, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        writer.writerows([make_lead(), make_lead('Elm')])
+    assert export_csv(str(source), str(tmp_path / 'leads.jsonl')) == 2
@@ -0,0 +1,89 @@
+import pytest
+from bs4 import BeautifulSoup
+
+from extraction import Selector, SelectorChain, SourceSpec
+from parsing import STREAMING
+
+LISTING = ('<div class="result" data-business-name="Oak Clinic">'
+           '<a class="business-name" href="/biz/oak">Oak Clinic</a>'
+           '<a href="tel:+12175550101">(217) 555-0101</a>'
+           '<a class="track" href="https://oak.example">Visit Website</a>'
+           '<p class="address">1 Main St</p></div>')
+
+
+def listing():
+    return BeautifulSoup(LISTING, 'html.parser').div
+
+
+@pytest.mark.parametrize('spec, expected', [
+    ('a.business-name', 'Oak Clinic'),
+    ('a.business-name->href', '/biz/oak'),
+    ('a[href^=tel:]', '(217) 555-0101'),
+    ('a[href*=oak.example]->href', 'https://oak.example'),
+    ('a:contains(website)->href', 'https://oak.example'),
+    ('@data-business-name', 'Oak Clinic'),
+    ('p[class=address]', '1 Main St'),
+])
+def test_selector_syntax(spec, expected):
+    assert Selector(spec).extract(listing()) == (True, expected)
+
+
+def test_selector_miss_and_bad_spec():
+    assert Selector('span.phone').extract(listing()) == (False, None)
+    with pytest.raises(ValueError):
+        Selector('div > a')
+
+
+def test_chain_falls_back_in_order():
+    chain = SelectorChain('phone', ['span.phone', 'a[href^=tel:]'])
+    assert chain.extract(listing()) == '(217) 555-0101'
+    assert chain.extract(BeautifulSoup('<div></div>', 'html.parser').div) is None
+    assert (chain.attempts, chain.misses, chain.hit_rate()) == (2, 1, 0.5)
+
+
+def test_chain_promotes_the_selector_that_keeps_matching():
+    chain = SelectorChain('name', ['h3', 'a.business-name'])
+    assert chain.extract(listing()) == 'Oak Clinic'
+    assert [s.spec for s in chain.selectors] == ['a.business-name', 'h3']
+    # A one-off hit for the demoted selector does not swap them back
+    chain.extract(BeautifulSoup('<div><h3>Elm</h3></div>', 'html.parser').div)
+    assert [s.spec for s in chain.selectors] == ['a.business-name', 'h3']
+
+
+def test_spec_listings_and_stats():
+    spec = SourceSpec('Test', containers=['div.card', 'div.result'],
+                      fields={'name': ['a.business-name'], 'website': ['span.web']})
+    page = '<html><body>' + LISTING * 3 + '</body></html>'
+    listings = spec.listings(page)
+    assert len(listings) == 3
+    assert [s.spec for s in spec.containers.selectors] == ['div.result', 'div.card']
+    assert spec.extract(listings[0]) == {'name': 'Oak Clinic', 'website': None}
+    assert spec.listings('<html><p>no results</p></html>') == []
+    assert (spec.pages, spec.empty_pages) == (2, 1)
+    assert spec.stats()['name']['selectors'] == [('a.business-name', 1)]
+
+
+
+def chunked(page, size=100):
+    data = page.encode('utf-8')
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+
+@pytest.mark.skipif(not STREAMING, reason="incremental parsing needs lxml")
+def test_streamed_listings_match_whole_page_listings():
+    page = '<html><body><div class="ad">x</div>' + LISTING * 4 + '</body></html>'
+    whole = SourceSpec('Test', ['div.result'], {'name': ['a.business-name'], 'phone': ['a[href^=tel:]']})
+    streamed = SourceSpec('Test', ['div.result'], {'name': ['a.business-name'], 'phone': ['a[href^=tel:]']})
+    expected = [whole.extract(listing) for listing in whole.listings(page)]
+    assert [streamed.extract(listing) for listing in streamed.listings(chunked(page))] == expected
+    assert streamed.counters() == whole.counters()
+
+
+@pytest.mark.skipif(not STREAMING, reason="incremental parsing needs lxml")
+def test_streamed_listings_fall_back_like_whole_pages():
+    spec = SourceSpec('Test', ['div.card', 'div.result'], {'name': ['a.business-name']})
+    listings = list(spec.listings(chunked('<html><body>' + LISTING * 2 + '</body></html>')))
+    assert [spec.extract(listing)['name'] for listing in listings] == ['Oak Clinic'] * 2
+    assert [s.spec for s in spec.containers.selectors] == ['div.result', 'div.card']
+    assert list(spec.listings(chunked('<html><p>none</p></html>'))) == []
+    assert spec.empty_pages == 1
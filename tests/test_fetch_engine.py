@@ -0,0 +1,91 @@
+import pytest
+import requests
+
+from fetch_engine import AsyncFetchEngine, host_of
+from rate_limiter import HostRateLimiter, limit_from_delays
+
+UNLIMITED = limit_from_delays(0, 0)
+
+
+def make_engine(max_concurrency=4, **options):
+    return AsyncFetchEngine(requests.Session(), HostRateLimiter(UNLIMITED),
+                            max_concurrency=max_concurrency, **options)
+
+
+def test_host_of():
+    assert host_of('https://WWW.Yelp.com/search?q=x') == 'www.yelp.com'
+
+
+def test_fetches_every_job(stub_server):
+    server = stub_server({f'/{i}': b'page %d' % i for i in range(10)})
+    results = {}
+    
+    def callback(job, response, error):
+        results[job[0]] = response.content
+    
+    make_engine().fetch_all([(i, f'{server.url}/{i}') for i in range(10)], callback)
+    assert results == {i: b'page %d' % i for i in range(10)}
+
+
+def test_callback_follow_ups_are_fetched(stub_server):
+    server = stub_server({f'/{i}': b'x' for i in range(5)})
+    seen = []
+    
+    def callback(job, response, error):
+        seen.append(job[0])
+        if job[0] < 4:
+            return [(job[0] + 1, f'{server.url}/{job[0] + 1}')]
+    
+    engine = make_engine()
+    engine.fetch_all([(0, server.url + '/0')], callback)
+    assert seen == [0, 1, 2, 3, 4]
+    assert engine.queued == engine.completed == 5
+
+
+def test_priority_orders_jobs_per_host(stub_server):
+    server = stub_server({f'/{i}': b'x' for i in range(6)})
+    seen = []
+    jobs = [(i, f'{server.url}/{i}') for i in range(6)]
+    make_engine(max_concurrency=1).fetch_all(jobs, lambda job, response, error: seen.append(job[0]),
+                                             priority=lambda job: -job[0])
+    assert seen == [5, 4, 3, 2, 1, 0]
+
+
+def test_errors_reach_the_callback(stub_server):
+    server = stub_server({})
+    dead = stub_server({})
+    dead_url = dead.url
+    dead.stop()
+    outcomes = {}
+    
+    def callback(job, response, error):
+        outcomes[job[0]] = (response.status_code if response is not None else None, type(error))
+    
+    make_engine(timeout=2).fetch_all([('missing', server.url + '/x'), ('dead', dead_url + '/x')], callback)
+    assert outcomes['missing'] == (404, type(None))
+    assert outcomes['dead'][0] is None
+    assert issubclass(outcomes['dead'][1], requests.ConnectionError)
+
+
+def test_refill_tops_up_until_it_returns_none(stub_server):
+    server = stub_server({f'/{i}': b'x' for i in range(6)})
+    pending = [(i, f'{server.url}/{i}') for i in range(6)]
+    seen = []
+    
+    def refill(outstanding):
+        if not pending:
+            return None
+        return [pending.pop(0)] if outstanding < 2 else []
+    
+    make_engine().fetch_all([], lambda job, response, error: seen.append(job[0]), refill=refill, poll=0.01)
+    assert sorted(seen) == list(range(6))
+
+
+def test_callback_exception_stops_the_run(stub_server):
+    server = stub_server({'/a': b'x'})
+    
+    def callback(job, response, error):
+        raise RuntimeError('boom')
+    
+    with pytest.raises(RuntimeError, match='boom'):
+        make_engine().fetch_all([(0, server.url + '/a')], callback)
@@ -0,0 +1,80 @@
+import csv
+
+from crawl_ledger import CrawlUnit
+from geo_shards import (GAZETTEER_FILE, ShardPlanner, load_gazetteer, shard_level, sub_locations,
+                        zip_location, zip_of)
+
+PLACES = {'Chicago': (2746388, ['60601', '60602']), 'Peoria': (113150, ['61602']), 'Tiny': (0, [])}
+LEAD = {'business_name': 'Oak', 'phone': '1'}
+
+
+def leads(*names):
+    return [dict(LEAD, business_name=name) for name in names]
+
+
+def test_gazetteer_covers_every_illinois_city():
+    # Regression: only the 50 biggest cities shipped, so towns could not be sharded
+    places = load_gazetteer()
+    with open(GAZETTEER_FILE, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert len(places) == len(rows) > 1000
+    assert list(places)[:3] == ['Chicago', 'Aurora', 'Joliet']
+    assert places['Effingham'] == (0, ['62401'])
+    assert '60601' in places['Chicago'][1] and '60664' not in places['Chicago'][1]
+    all_zips = [zip_code for _, zips in places.values() for zip_code in zips]
+    assert len(all_zips) == len(set(all_zips))
+
+
+def test_zip_locations():
+    location = zip_location('Chicago', '60601')
+    assert location == 'Chicago, IL 60601'
+    assert zip_of(location) == '60601'
+    assert zip_of('Chicago, IL') is None
+    assert [shard_level(loc) for loc in ('Illinois', 'Chicago, IL', location)] == [0, 1, 2]
+
+
+def test_sub_locations():
+    assert sub_locations('Illinois', PLACES) == ['Chicago, IL', 'Peoria, IL', 'Tiny, IL']
+    assert sub_locations('Chicago, IL', PLACES) == ['Chicago, IL 60601', 'Chicago, IL 60602']
+    assert sub_locations('Unknown, IL', PLACES) == []
+    assert sub_locations('Chicago, IL 60601', PLACES) == []
+
+
+def test_follow_ups_page_through_then_split_when_saturated():
+    planner = ShardPlanner(max_pages=2, places=PLACES)
+    unit = CrawlUnit('YellowPages', 'dentists', 'Illinois', 1)
+    planner.plan([unit])
+    assert planner.follow_ups(unit, True, leads('a', 'b')) == [unit._replace(page=2)]
+    children = planner.follow_ups(unit._replace(page=2), True, leads('c', 'd'))
+    assert [child.location for child in children] == ['Chicago, IL', 'Peoria, IL', 'Tiny, IL']
+    assert planner.split == 1
+    # Already planned: a second saturated search does not queue them again
+    assert planner.follow_ups(unit._replace(category='dentists', page=2), True, leads('e', 'f')) == []
+
+
+def test_unsaturated_last_page_stops():
+    planner = ShardPlanner(max_pages=1, places=PLACES)
+    unit = CrawlUnit('YellowPages', 'dentists', 'Illinois', 1)
+    planner.follow_ups(unit._replace(category='x'), False, leads('a', 'b', 'c'))
+    assert planner.follow_ups(unit, False, leads('d')) == []
+
+
+def test_search_with_only_known_leads_is_pruned():
+    planner = ShardPlanner(max_pages=1, places=PLACES)
+    first = CrawlUnit('YellowPages', 'dentists', 'Chicago, IL', 1)
+    assert len(planner.follow_ups(first, True, leads('a', 'b'))) == 2
+    again = first._replace(category='clinics')
+    assert planner.follow_ups(again, True, leads('a', 'b')) == []
+    assert planner.pruned == 1
+    # Another directory has not seen them
+    assert len(planner.follow_ups(first._replace(source='Superpages'), True, leads('a', 'b'))) == 2
+
+
+def test_manta_stops_at_cities_and_page_caps_apply():
+    planner = ShardPlanner(max_pages=50, places=PLACES)
+    manta = CrawlUnit('Manta', 'dentists', 'Chicago, IL', 50)
+    assert planner.follow_ups(manta, True, leads('a')) == []
+    assert planner.page_limit('Yelp') == 24
+    yelp = CrawlUnit('Yelp', 'dentists', 'Peoria, IL', 24)
+    assert [unit.location for unit in planner.follow_ups(yelp, True, leads('b'))] == ['Peoria, IL 61602']
+
@@ -0,0 +1,101 @@
+import time
+
+import pytest
+import requests
+
+from http_cache import HttpCache, install_cache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = HttpCache(str(tmp_path / 'cache'))
+    yield cache
+    cache.close()
+
+
+def cached_session(cache):
+    session = requests.Session()
+    install_cache(session, cache)
+    return session
+
+
+def test_key_varies_on_accept_headers_only():
+    url = 'https://www.yelp.com/search'
+    assert HttpCache.key(url, {}) == HttpCache.key(url, {'User-Agent': 'x'})
+    assert HttpCache.key(url, {}) != HttpCache.key(url, {'Accept-Language': 'de'})
+
+
+def test_store_and_lookup_round_trip(cache):
+    key = cache.key('http://a.example/', {})
+    cache.store(key, 'http://a.example/', 200, {'ETag': '"v1"', 'Content-Type': 'text/html'}, b'body')
+    entry = cache.lookup(key)
+    assert entry['etag'] == '"v1"'
+    assert cache.read_body(entry) == b'body'
+    assert cache.is_fresh('http://a.example/', {}, entry)
+    cache.set_ttl('a.example', 0)
+    assert not cache.is_fresh('http://a.example/', {}, entry)
+
+
+def test_lowercase_headers_keep_validators_and_drop_encoding(cache):
+    # Regression: the drop list and validator lookups used to be case-sensitive
+    key = cache.key('http://a.example/', {})
+    cache.store(key, 'http://a.example/', 200,
+                {'etag': '"v1"', 'last-modified': 'Mon, 05 Oct 2026 10:00:00 GMT',
+                 'content-encoding': 'gzip', 'content-length': '4', 'content-type': 'text/html'}, b'body')
+    entry = cache.lookup(key)
+    assert entry['etag'] == '"v1"'
+    assert entry['last_modified'] == 'Mon, 05 Oct 2026 10:00:00 GMT'
+    assert {name.lower() for name in entry['headers']} == {'etag', 'last-modified', 'content-type'}
+
+
+def test_size_cap_evicts_least_recently_used(tmp_path):
+    cache = HttpCache(str(tmp_path / 'cache'), max_bytes=10)
+    try:
+        for name in ('a', 'b', 'c'):
+            cache.store(name, 'http://a.example/' + name, 200, {}, name.encode() * 4)
+            time.sleep(0.01)
+        assert cache.lookup('a') is None
+        assert cache.lookup('b') is not None and cache.lookup('c') is not None
+        assert cache.counters['evicted'] == 1
+    finally:
+        cache.close()
+
+
+def test_fresh_hits_skip_the_network(stub_server, cache):
+    server = stub_server({'/a': b'hello'})
+    session = cached_session(cache)
+    first, second = session.get(server.url + '/a'), session.get(server.url + '/a')
+    assert (first.from_cache, second.from_cache) == (False, True)
+    assert second.text == 'hello'
+    assert server.requests == 1
+    assert cache.counters['hits'] == cache.counters['misses'] == 1
+
+
+def test_stale_entries_revalidate_with_etag(stub_server, cache):
+    server = stub_server({'/a': b'hello'})
+    cache.default_ttl = 0
+    session = cached_session(cache)
+    session.get(server.url + '/a')
+    reply = session.get(server.url + '/a')
+    assert reply.status_code == 200 and reply.text == 'hello' and reply.from_cache
+    assert server.requests == 2
+    assert cache.counters['revalidated'] == 1
+
+
+def test_gzip_bodies_are_stored_decoded(stub_server, cache):
+    body = b'<html>' + b'x' * 4000 + b'</html>'
+    server = stub_server({'/a': body}, gzip=True)
+    session = cached_session(cache)
+    assert session.get(server.url + '/a').content == body
+    cached = session.get(server.url + '/a')
+    assert cached.from_cache and cached.content == body
+    assert 'Content-Encoding' not in cached.headers
+
+
+def test_errors_are_not_stored(stub_server, cache):
+    server = stub_server({})
+    session = cached_session(cache)
+    session.get(server.url + '/missing')
+    session.get(server.url + '/missing')
+    assert server.requests == 2
+    assert cache.counters['stored'] == 0
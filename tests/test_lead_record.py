@@ -0,0 +1,82 @@
+import csv
+import io
+import pickle
+
+import pytest
+
+from lead_record import Lead, LeadBatch
+from lead_sink import FIELDNAMES
+
+
+def make_lead(name='Oak Clinic', phone='(217) 555-0101', category='Dentists', **fields):
+    lead = {'source': 'YellowPages', 'business_name': name, 'phone': phone,
+            'address': '1 Main St, Springfield, IL 62701', 'has_website': 'No', 'website': 'N/A',
+            'category': category, 'state': 'Illinois'}
+    lead.update(fields)
+    return lead
+
+
+def test_lead_reads_like_a_dict():
+    lead = Lead.from_dict(dict(make_lead(), extra='dropped'))
+    assert lead['business_name'] == 'Oak Clinic'
+    assert lead.get('extra', 'none') == 'none'
+    assert list(lead.keys()) == FIELDNAMES
+    assert lead == make_lead()
+    assert lead.to_dict() == make_lead()
+    with pytest.raises(KeyError):
+        lead['extra']
+    with pytest.raises(KeyError):
+        lead['extra'] = 'x'
+    assert not hasattr(lead, '__dict__')
+
+
+def test_lead_interns_repeated_values():
+    first, second = Lead.from_dict(make_lead()), Lead.from_dict(make_lead(category=''.join(['Dent', 'ists'])))
+    assert first.category is second.category
+    assert first.website is second.website
+
+
+def test_lead_pickles_and_writes_with_dictwriter():
+    lead = Lead.from_dict(make_lead())
+    assert pickle.loads(pickle.dumps(lead)) == lead
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=FIELDNAMES)
+    writer.writerow(lead)
+    assert out.getvalue().startswith('YellowPages,Oak Clinic,')
+
+
+def test_batch_round_trips_rows():
+    leads = [make_lead(f'Business {i}', category=('Dentists', 'Law Firms')[i % 2]) for i in range(10)]
+    batch = LeadBatch(leads)
+    assert len(batch) == 10
+    assert [batch.row(i) for i in range(10)] == leads
+    assert list(batch) == leads
+    assert batch[-1] == leads[-1]
+    assert batch.count('category', 'Law Firms') == 5
+    assert batch.count('category', 'Plumbers') == 0
+    assert batch.statistics() == {'total': 10, 'no_website': 10}
+
+
+def test_batch_take_slice_and_overwrite():
+    batch = LeadBatch(make_lead(f'Business {i}') for i in range(5))
+    assert batch[1:3].column('business_name') == ['Business 1', 'Business 2']
+    taken = batch.take([4, 0])
+    taken[0] = make_lead('Merged', source='YellowPages;Manta', has_website='Yes')
+    assert taken.row(0)['source'] == 'YellowPages;Manta'
+    assert batch.row(4)['source'] == 'YellowPages'
+    assert taken.column('business_name') == ['Merged', 'Business 0']
+
+
+def test_batch_widens_codes_past_65535_values():
+    batch = LeadBatch()
+    for i in range(70000):
+        batch.append({'business_name': 'x', 'category': str(i)})
+    assert batch._codes['category'].typecode == 'I'
+    assert batch.row(69999)['category'] == '69999'
+
+
+def test_batch_csv_round_trip(tmp_path):
+    path = str(tmp_path / 'leads.csv')
+    batch = LeadBatch([make_lead(), make_lead('Elm Dental', has_website='Yes', website='https://elm.example')])
+    assert batch.write_csv(path) == 2
+    assert list(LeadBatch.read_csv(path)) == list(batch)
@@ -0,0 +1,89 @@
+import csv
+import os
+import stat
+
+import pytest
+
+from lead_sink import FIELDNAMES, CsvLeadSink, lead_key, replace_file
+
+
+def make_lead(name='Oak Clinic', phone='(217) 555-0101', website='N/A'):
+    return {'source': 'YellowPages', 'business_name': name, 'phone': phone,
+            'address': '1 Main St, Springfield, IL 62701', 'has_website': 'No' if website == 'N/A' else 'Yes',
+            'website': website, 'category': 'Dentists', 'state': 'Illinois'}
+
+
+def read_rows(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def test_lead_key_ignores_name_case():
+    assert lead_key(make_lead('Oak Clinic')) == lead_key(make_lead('OAK CLINIC'))
+    assert lead_key(make_lead(phone='(217) 555-0101')) != lead_key(make_lead(phone='(217) 555-0102'))
+
+
+def test_writes_unique_named_leads(tmp_path):
+    path = tmp_path / 'leads.csv'
+    with CsvLeadSink(str(path)) as sink:
+        assert sink.add(make_lead())
+        assert not sink.add(make_lead('OAK CLINIC'))
+        assert not sink.add(make_lead('N/A'))
+        assert sink.add(make_lead('Elm Dental', '(312) 555-0102', 'https://elm.example'))
+    assert [row['business_name'] for row in read_rows(path)] == ['Oak Clinic', 'Elm Dental']
+    assert (sink.total, sink.duplicates, sink.no_website) == (2, 1, 1)
+
+
+def test_rows_reach_the_file_per_batch(tmp_path):
+    path = tmp_path / 'leads.csv'
+    sink = CsvLeadSink(str(path), batch_size=2)
+    sink.add(make_lead('A', '1'))
+    assert len(read_rows(path)) == 0
+    sink.add(make_lead('B', '2'))
+    assert len(read_rows(path)) == 2
+    sink.close()
+
+
+def test_resume_continues_the_file(tmp_path):
+    path = tmp_path / 'leads.csv'
+    with CsvLeadSink(str(path)) as sink:
+        sink.add(make_lead('A', '1'))
+        sink.add(make_lead('B', '2', 'https://b.example'))
+    with CsvLeadSink(str(path)) as sink:
+        assert (sink.total, sink.no_website) == (2, 1)
+        assert not sink.add(make_lead('a', '1'))
+        assert sink.add(make_lead('C', '3'))
+    rows = read_rows(path)
+    assert [row['business_name'] for row in rows] == ['A', 'B', 'C']
+    with open(path, encoding='utf-8') as f:
+        assert f.read().count(','.join(FIELDNAMES)) == 1
+
+
+def test_empty_file_is_removed_on_close(tmp_path):
+    path = tmp_path / 'leads.csv'
+    CsvLeadSink(str(path)).close()
+    assert not path.exists()
+
+
+def test_replace_file_swaps_in_the_new_content(tmp_path):
+    path = tmp_path / 'leads.csv'
+    path.write_text('old\n')
+    os.chmod(path, 0o640)
+    with replace_file(str(path)) as f:
+        f.write('new\n')
+        assert path.read_text() == 'old\n'
+    assert path.read_text() == 'new\n'
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+    assert os.listdir(tmp_path) == ['leads.csv']
+
+
+def test_replace_file_keeps_the_old_file_on_error(tmp_path):
+    # Regression: rewriting a CSV in place truncated it if the write failed
+    path = tmp_path / 'leads.csv'
+    path.write_text('old\n')
+    with pytest.raises(KeyboardInterrupt):
+        with replace_file(str(path)) as f:
+            f.write('half')
+            raise KeyboardInterrupt
+    assert path.read_text() == 'old\n'
+    assert os.listdir(tmp_path) == ['leads.csv']
@@ -0,0 +1,102 @@
+import csv
+import sys
+from datetime import datetime
+
+import pytest
+
+import leadscraper
+from lead_store import CHANGED, NEW, UNCHANGED, LeadStore, normalize_phone, normalize_text, parse_since
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = LeadStore(str(tmp_path / 'leads.sqlite3'))
+    yield store
+    store.close()
+
+
+def make_lead(source='YellowPages', name='Oak Clinic, LLC', phone='(217) 555-0101',
+              address='1 Main St, Springfield, IL 62701', website='N/A'):
+    return {'source': source, 'business_name': name, 'phone': phone, 'address': address,
+            'has_website': 'No' if website == 'N/A' else 'Yes', 'website': website,
+            'category': 'Dentists', 'state': 'Illinois'}
+
+
+def test_normalizers():
+    assert normalize_text('  Oak  Clinic, L.L.C. ') == 'oak clinic l l c'
+    assert normalize_text('N/A') == ''
+    assert normalize_phone('+1 (217) 555-0101') == '2175550101'
+    assert normalize_phone('217.555.0101') == '2175550101'
+
+
+def test_new_then_unchanged_then_changed(store):
+    assert store.add(make_lead()) == NEW
+    assert store.add(make_lead(name='OAK CLINIC LLC')) == UNCHANGED
+    assert store.add(make_lead(website='https://oak.example')) == CHANGED
+    assert store.counts == {NEW: 1, CHANGED: 1, UNCHANGED: 1}
+    assert store.total() == 1
+    assert store.find(phone='2175550101')[0]['website'] == 'https://oak.example'
+
+
+def test_changes_are_tracked_per_source(store):
+    # Regression: one content hash per lead made two directories that format
+    # the same address differently flip the lead to "changed" on every run
+    yellowpages = make_lead('YellowPages', address='1 Main St, Springfield, IL 62701')
+    manta = make_lead('Manta', address='1 Main Street, Springfield, Illinois')
+    assert store.add(yellowpages) == NEW
+    assert store.add(manta) == UNCHANGED
+    for _ in range(2):
+        assert store.add(yellowpages) == UNCHANGED
+        assert store.add(manta) == UNCHANGED
+    assert store.add(make_lead('Manta', address='9 Elm St, Peoria, IL')) == CHANGED
+
+
+def test_na_names_are_ignored(store):
+    assert store.add(make_lead(name='N/A')) == UNCHANGED
+    assert store.total() == 0
+
+
+def test_find_by_normalized_fields(store):
+    store.add(make_lead())
+    store.add(make_lead(name='Elm Dental', phone='(312) 555-0102'))
+    assert [lead['business_name'] for lead in store.find(name='oak clinic llc')] == ['Oak Clinic, LLC']
+    assert len(store.find(address='1 MAIN ST SPRINGFIELD IL 62701')) == 2
+    assert len(store.find()) == 2
+
+
+def test_export_changes_since(store, tmp_path):
+    store.add(make_lead(), seen_at=1000.0)
+    store.add(make_lead(name='Elm Dental', phone='(312) 555-0102'), seen_at=2000.0)
+    path = tmp_path / 'changes.csv'
+    assert store.export_changes(str(path), since=1500.0) == 1
+    with open(path, newline='', encoding='utf-8') as f:
+        assert [row['business_name'] for row in csv.DictReader(f)] == ['Elm Dental']
+    assert store.export_changes(str(path), since=0) == 2
+    assert [p.name for p in tmp_path.iterdir() if p.name.endswith('.tmp')] == []
+
+
+def test_parse_since():
+    assert parse_since('2024-11-01') == datetime(2024, 11, 1).timestamp()
+    assert parse_since('2024-11-01T08:30') == datetime(2024, 11, 1, 8, 30).timestamp()
+
+
+@pytest.mark.parametrize('argv, error', [
+    (['--since', '2024-11-01'], '--since needs --export-changes'),
+    (['--export-changes', 'out.csv', '--join'], 'not --join'),
+    (['--export-changes', 'out.csv', '--since', 'last week'], 'invalid parse_since value'),
+])
+def test_export_flags_are_validated(monkeypatch, capsys, argv, error):
+    monkeypatch.setattr(sys, 'argv', ['leadscraper.py'] + argv)
+    with pytest.raises(SystemExit):
+        leadscraper.parse_args()
+    assert error in capsys.readouterr().err
+
+
+def test_export_store_changes_writes_the_flagged_path(monkeypatch, store, tmp_path):
+    path = tmp_path / 'changes.csv'
+    monkeypatch.setattr(sys, 'argv', ['leadscraper.py', '--export-changes', str(path), '--since', '2000-01-01'])
+    args = leadscraper.parse_args()
+    store.add(make_lead())
+    leadscraper.export_store_changes(store, args)
+    with open(path, newline='', encoding='utf-8') as f:
+        assert len(list(csv.DictReader(f))) == 1
@@ -0,0 +1,76 @@
+import json
+import math
+
+from metrics import LATENCY_BUCKETS, Histogram, Metrics
+
+
+def test_histogram_buckets_and_quantiles():
+    histogram = Histogram((0.1, 1))
+    for value in (0.05, 0.1, 0.5, 2, 3):
+        histogram.observe(value)
+    assert histogram.counts == [2, 1, 2]
+    assert histogram.cumulative() == [(0.1, 2), (1, 3), (math.inf, 5)]
+    assert histogram.quantile(0.4) == 0.1
+    assert histogram.quantile(0.6) == 1
+    assert histogram.quantile(0.99) == math.inf
+    assert Histogram((1,)).quantile(0.5) is None
+
+
+def test_counters_total_by_source_and_label():
+    metrics = Metrics()
+    metrics.inc('requests', 'Yelp', status=200)
+    metrics.inc('requests', 'Yelp', status=200)
+    metrics.inc('requests', 'Yelp', status=503)
+    metrics.inc('requests', 'Manta', status=200)
+    assert metrics.total('requests') == 4
+    assert metrics.total('requests', 'Yelp') == 3
+    assert metrics.total('requests', status=200) == 3
+    assert metrics.sources() == ['Manta', 'Yelp']
+
+
+def test_swallowed_counts_exception_type():
+    metrics = Metrics()
+    metrics.swallowed('Yelp', 'parse_listing', KeyError('name'))
+    assert metrics.total('exceptions', where='parse_listing', type='KeyError') == 1
+
+
+def test_merge_adds_counters_and_histograms():
+    parent, worker = Metrics(), Metrics()
+    parent.inc('listings_found', 'Yelp', 2)
+    parent.observe('parse_seconds', 'Yelp', 0.002)
+    worker.inc('listings_found', 'Yelp', 3)
+    worker.observe('parse_seconds', 'Yelp', 0.02)
+    worker.observe('request_seconds', 'Manta', 0.3)
+    parent.merge(worker)
+    assert parent.total('listings_found') == 5
+    assert parent.histograms[('parse_seconds', (('source', 'Yelp'),))].count == 2
+    assert parent.histograms[('request_seconds', (('source', 'Manta'),))].bounds == LATENCY_BUCKETS
+
+
+def test_json_and_prometheus_reports(tmp_path):
+    metrics = Metrics()
+    metrics.inc('requests', 'Yelp', status=200)
+    metrics.observe('request_seconds', 'Yelp', 0.3)
+    metrics.inc('exceptions', 'Yelp', where='say "hi"', type='ValueError')
+    metrics.write_json(str(tmp_path / 'run.metrics.json'))
+    with open(tmp_path / 'run.metrics.json', encoding='utf-8') as f:
+        report = json.load(f)
+    assert {'name': 'requests', 'labels': {'source': 'Yelp', 'status': 200}, 'value': 1} in report['counters']
+    assert report['histograms'][0]['buckets']['inf'] == 1
+    metrics.write_prometheus(str(tmp_path / 'run.prom'))
+    text = (tmp_path / 'run.prom').read_text()
+    assert '# TYPE leadscraper_requests_total counter' in text
+    assert 'leadscraper_requests_total{source="Yelp",status="200"} 1' in text
+    assert 'leadscraper_request_seconds_bucket{source="Yelp",le="0.5"} 1' in text
+    assert 'leadscraper_request_seconds_bucket{source="Yelp",le="+Inf"} 1' in text
+    assert 'where="say \\"hi\\""' in text
+
+
+def test_report_line_per_source(capsys):
+    metrics = Metrics()
+    metrics.inc('requests', 'Yelp', status=503)
+    metrics.inc('listings_found', 'Yelp', 7)
+    metrics.report()
+    out = capsys.readouterr().out
+    assert 'Yelp: 1 responses | 1 non-2xx' in out
+    assert '7 listings' in out
@@ -0,0 +1,156 @@
+import os
+import threading
+import time
+
+import requests
+
+from leadscraper import IllinoisLeadScraper
+from pagination import PageStream, has_next_page, iter_leads, iter_pages, stream_leads
+
+NEXT = b'<a class="next ajax-page" href="?page=2">Next</a>'
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'fixtures')
+
+
+class FakeResponse:
+    def __init__(self, content, status_code=200):
+        self.content = content
+        self.status_code = status_code
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name + '.html'), 'rb') as f:
+        return f.read()
+
+
+def page_url(page):
+    return f'https://directory.example/search?page={page}'
+
+
+def paged_fetch(pages, fetched=None):
+    """fetch() over pages[0..]: each but the last links to the next"""
+    def fetch(url):
+        page = int(url.rsplit('=', 1)[1])
+        if fetched is not None:
+            fetched.append(page)
+        body = pages[page - 1] + (NEXT if page < len(pages) else b'')
+        return FakeResponse(body)
+    return fetch
+
+
+def test_has_next_page_variants():
+    assert has_next_page(NEXT)
+    assert has_next_page('<a rel="next" href="/p2">')
+    assert has_next_page(b'<A ARIA-LABEL="Next page" href="/p2">')
+    assert not has_next_page(b'<a class="nextdoor" href="/x">')
+    assert not has_next_page(b'<a href="/p2">2</a>')
+
+
+def test_iter_pages_follows_next_links_up_to_max_pages():
+    fetch = paged_fetch([b'one', b'two', b'three', b'four'])
+    assert [page for page, _ in iter_pages(fetch, page_url, max_pages=3)] == [1, 2, 3]
+    assert [page for page, _ in iter_pages(fetch, page_url, max_pages=10)] == [1, 2, 3, 4]
+
+
+def test_iter_pages_stops_on_error_status():
+    def fetch(url):
+        return FakeResponse(NEXT, status_code=200 if url.endswith('=1') else 503)
+    
+    assert [page for page, _ in iter_pages(fetch, page_url, max_pages=5)] == [1]
+
+
+def test_iter_pages_prefetches_the_next_page():
+    fetched = []
+    pages = iter_pages(paged_fetch([b'one', b'two', b'three'], fetched), page_url)
+    next(pages)
+    deadline = time.monotonic() + 2
+    while len(fetched) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert fetched == [1, 2]
+    pages.close()
+
+
+def test_closing_iter_pages_does_not_wait_for_the_prefetch():
+    # Regression: close() used to block until the in-flight prefetch finished
+    release = threading.Event()
+    
+    def fetch(url):
+        if not url.endswith('=1'):
+            release.wait(5)
+        return FakeResponse(NEXT)
+    
+    pages = iter_pages(fetch, page_url, max_pages=3)
+    next(pages)
+    started = time.monotonic()
+    pages.close()
+    assert time.monotonic() - started < 1
+    release.set()
+
+
+def test_iter_leads_stops_at_max_leads():
+    fetched = []
+    fetch = paged_fetch([b'a b c', b'd e f', b'g h i'], fetched)
+    
+    def parse(content):
+        return content.split(NEXT)[0].split()
+    
+    assert list(iter_leads(fetch, page_url, parse, max_pages=3)) == list(b'a b c d e f g h i'.split())
+    assert list(iter_leads(fetch, page_url, parse, max_leads=4)) == [b'a', b'b', b'c', b'd']
+
+
+def test_page_stream_spots_a_next_link_split_across_chunks(stub_server):
+    body = b'<html>' + b'x' * 100 + NEXT + b'y' * 100 + b'</html>'
+    server = stub_server({'/p': body})
+    response = requests.get(server.url + '/p', stream=True)
+    stream = PageStream(response, chunk_size=7)
+    assert b''.join(stream) == body
+    assert stream.has_next and stream.complete and stream.bytes == len(body)
+
+
+def test_page_stream_caches_only_complete_bodies(stub_server):
+    server = stub_server({'/p': b'z' * 1000})
+    stored = []
+    for read_all in (True, False):
+        response = requests.get(server.url + '/p', stream=True)
+        response.cache_store = stored.append
+        stream = PageStream(response, chunk_size=100)
+        for i, chunk in enumerate(stream):
+            if not read_all and i == 2:
+                break
+        response.close()
+    assert stored == [b'z' * 1000]
+
+
+def test_stream_leads_stops_reading_at_max_leads(stub_server):
+    listing = b'<p>lead</p>'
+    server = stub_server({'/search': listing * 2000 + NEXT}, chunk_size=1024, chunk_delay=0.001)
+    
+    def parse(stream):
+        for chunk in stream:
+            yield from [chunk] * chunk.count(b'</p>')
+    
+    fetch = lambda url: requests.get(url, stream=True)
+    leads = list(stream_leads(fetch, lambda page: server.url + '/search', parse, max_leads=10))
+    assert len(leads) == 10
+    time.sleep(0.1)
+    assert server.sent < len(listing) * 2000
+
+
+def test_stream_leads_follows_next_links(stub_server):
+    pages = {'/1': b'<p>a</p>' + NEXT, '/2': b'<p>b</p><p>c</p>'}
+    server = stub_server(pages)
+    
+    def parse(stream):
+        return b''.join(stream).split(NEXT)[0].replace(b'</p>', b'').split(b'<p>')[1:]
+    
+    fetch = lambda url: requests.get(url, stream=True)
+    assert list(stream_leads(fetch, lambda page: f'{server.url}/{page}', parse, max_pages=5)) == [
+        b'a', b'b', b'c']
+
+
+def test_scraper_streams_the_same_leads_it_parses_whole(stub_server):
+    server = stub_server({'/search': fixture('yellowpages')}, chunk_size=4096)
+    scraper = IllinoisLeadScraper(min_delay=0, max_delay=0, cache_dir=None, quiet=True, stream_pages=True)
+    scraper.base_urls['YellowPages'] = server.url
+    streamed = list(scraper.iter_yellowpages('dentists', max_pages=1))
+    assert streamed == list(scraper.parse_yellowpages(fixture('yellowpages'), 'dentists'))
+    assert list(scraper.iter_yellowpages('dentists', max_pages=1, max_leads=3)) == streamed[:3]
@@ -0,0 +1,70 @@
+import asyncio
+import os
+
+import requests
+
+import parse_pool
+from crawl_ledger import CrawlUnit
+from extraction import SourceSpec, subtract_counters
+from fetch_engine import AsyncFetchEngine
+from leadscraper import IllinoisLeadScraper
+from parse_pool import ParsePool, default_workers, parse_page
+from rate_limiter import HostRateLimiter, limit_from_delays
+
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                       'benchmarks', 'fixtures', 'yellowpages.html')
+UNIT = CrawlUnit('YellowPages', 'dentists', 'Chicago, IL', 1)
+
+
+def fixture():
+    with open(FIXTURE, 'rb') as f:
+        return f.read()
+
+
+def test_default_workers_leaves_a_core():
+    assert default_workers() == max(0, (os.cpu_count() or 1) - 1)
+
+
+def test_counters_round_trip_through_add_counters():
+    fields = {'name': ['h3', 'a.business-name']}
+    worker, parent = SourceSpec('Test', ['div.result'], fields), SourceSpec('Test', ['div.result'], fields)
+    page = '<div class="result"><a class="business-name">Oak</a></div>' * 2
+    before = worker.counters()
+    for element in worker.listings(page):
+        worker.extract(element)
+    parent.add_counters(subtract_counters(worker.counters(), before))
+    assert parent.counters() == worker.counters()
+    assert [s.spec for s in parent.fields['name'].selectors] == ['a.business-name', 'h3']
+
+
+def test_parse_page_returns_leads_log_and_counter_deltas():
+    parse_pool._init_worker(IllinoisLeadScraper, {})
+    parsed = parse_page((UNIT, 'https://www.yellowpages.com/search'), fixture())
+    assert len(parsed.leads) == 30
+    assert parsed.log.count('✓ Found:') == 30
+    assert parsed.counters['pages'] == 1
+    assert parsed.counters['chains']['name'][0] == 30
+    # Deltas, not totals: a second page counts once more
+    assert parse_page((UNIT, ''), fixture()).counters['pages'] == 1
+
+
+def test_pool_parses_in_worker_processes():
+    with ParsePool(IllinoisLeadScraper, workers=1, scraper_kwargs={'quiet': True}) as pool:
+        assert pool.queue_size == 2
+        parsed = asyncio.run(pool.parse((UNIT, ''), fixture()))
+    assert len(parsed.leads) == 30
+    assert parsed.log == ''
+
+
+def test_engine_hands_parsed_pages_to_the_callback(stub_server):
+    server = stub_server({'/search': fixture(), '/missing': (404, {}, b'')})
+    results = {}
+    
+    def callback(job, response, error):
+        results[job[1].rsplit('/', 1)[1]] = getattr(response, 'parsed', None)
+    
+    with ParsePool(IllinoisLeadScraper, workers=1, scraper_kwargs={'quiet': True}) as pool:
+        engine = AsyncFetchEngine(requests.Session(), HostRateLimiter(limit_from_delays(0, 0)), parser=pool)
+        engine.fetch_all([(UNIT, server.url + '/search'), (UNIT, server.url + '/missing')], callback)
+    assert len(results['search'].leads) == 30
+    assert results['missing'] is None
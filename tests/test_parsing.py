@@ -0,0 +1,82 @@
+import os
+
+import pytest
+from bs4 import BeautifulSoup
+
+from leadscraper import IllinoisLeadScraper
+from parsing import (FALLBACK_PARSER, STREAMING, attr_strainer, class_strainer, element_soup, listing_soup,
+                     pull_elements, release)
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'fixtures')
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name + '.html'), 'rb') as f:
+        return f.read()
+
+
+def test_class_strainer_matches_whole_class_words():
+    html = ('<div class="result big">a</div><div class="results">b</div>'
+            '<div class="srp result">c</div><span class="result">d</span>')
+    soup = listing_soup(html, class_strainer('div', 'result'))
+    assert [div.text for div in soup.find_all('div')] == ['a', 'c']
+
+
+def test_class_strainer_accepts_several_classes():
+    html = '<div class="card">a</div><div class="listing">b</div><div class="ad">c</div>'
+    soup = listing_soup(html, class_strainer('div', 'card', 'listing'))
+    assert [div.text for div in soup.find_all('div')] == ['a', 'b']
+
+
+def test_attr_strainer():
+    html = '<li data-id="1">a</li><li>b</li>'
+    assert [li.text for li in listing_soup(html, attr_strainer('li', **{'data-id': True})).find_all('li')] == ['a']
+
+
+def test_listing_soup_falls_back_to_html_parser():
+    soup = listing_soup('<p class="x">hi</p>', parser='no-such-parser')
+    assert soup.find('p').text == 'hi'
+
+
+@pytest.mark.parametrize('source, container', [
+    ('yellowpages', 'div.result'), ('manta', 'div.card-body'), ('superpages', 'div.listing')])
+def test_fixture_pages_parse_every_listing(source, container):
+    html = fixture(source)
+    scraper = IllinoisLeadScraper(cache_dir=None, quiet=True)
+    leads = list(getattr(scraper, 'parse_' + source)(html, 'Dentists'))
+    expected = BeautifulSoup(html, FALLBACK_PARSER).select(container)
+    assert len(leads) == len(expected) > 0
+    assert all(lead['business_name'] != 'N/A' and lead['phone'].startswith('(') for lead in leads)
+    assert all(lead['category'] == 'Dentists' and lead['state'] == 'Illinois' for lead in leads)
+
+
+@pytest.mark.skipif(not STREAMING, reason="incremental parsing needs lxml")
+def test_pull_elements_yields_each_element_as_it_closes():
+    chunks = [b'<html><body><div class="a">o', b'ne</div><div class="a">two</div>', b'<p>x</p></body></html>']
+    divs = [element_soup(element) for element in pull_elements(chunks) if element.tag == 'div']
+    assert [(div.name, div['class'], div.text) for div in divs] == [('div', ['a'], 'one'), ('div', ['a'], 'two')]
+
+
+@pytest.mark.skipif(not STREAMING, reason="incremental parsing needs lxml")
+def test_pull_elements_reads_only_the_chunks_it_needs():
+    read = []
+    
+    def chunks():
+        for chunk in (b'<div>one</div>', b'<div>two</div>', b'<div>three</div>'):
+            read.append(chunk)
+            yield chunk
+    
+    elements = pull_elements(chunks())
+    assert next(element for element in elements if element.tag == 'div').text == 'one'
+    assert len(read) == 1
+
+
+@pytest.mark.skipif(not STREAMING, reason="incremental parsing needs lxml")
+def test_release_drops_handled_siblings():
+    divs = []
+    for element in pull_elements([b'<body>' + b'<div>x</div>' * 5 + b'</body>']):
+        if element.tag == 'div':
+            divs.append(element)
+            release(element)
+    parent = divs[-1].getparent()
+    assert len(parent) == 1
@@ -0,0 +1,140 @@
+import time
+from email.utils import formatdate
+
+import requests
+
+from fetch_engine import AsyncFetchEngine
+from rate_limiter import HostRateLimiter, limit_from_delays
+from resilience import (CLOSED, HALF_OPEN, OPEN, Breakers, CircuitBreaker, CircuitOpenError, RetryPolicy,
+                        is_failure, retry_after)
+
+
+def response(status, **headers):
+    reply = requests.Response()
+    reply.status_code = status
+    reply.headers.update(headers)
+    return reply
+
+
+def test_retry_after_seconds_and_dates():
+    assert retry_after(response(429, **{'Retry-After': ' 120 '})) == 120.0
+    in_a_minute = retry_after(response(503, **{'Retry-After': formatdate(time.time() + 60, usegmt=True)}))
+    assert 55 < in_a_minute <= 60
+    assert retry_after(response(503, **{'Retry-After': formatdate(time.time() - 60, usegmt=True)})) == 0.0
+    assert retry_after(response(503, **{'Retry-After': 'soon'})) is None
+    assert retry_after(response(503)) is None
+    assert retry_after(None) is None
+
+
+def test_is_failure():
+    assert is_failure(response(403), None)
+    assert is_failure(response(429), None)
+    assert is_failure(response(502), None)
+    assert not is_failure(response(404), None)
+    assert is_failure(None, requests.Timeout())
+    assert not is_failure(None, ValueError())
+
+
+def test_backoff_retries_transient_failures_only():
+    policy = RetryPolicy(max_attempts=3, base=1.0, cap=5.0)
+    assert 0 <= policy.backoff(1, response(503)) <= 1
+    assert 0 <= policy.backoff(2, error=requests.ConnectionError()) <= 2
+    assert policy.backoff(3, response(503)) is None
+    assert policy.backoff(1, response(404)) is None
+    assert policy.backoff(1, error=requests.TooManyRedirects()) is None
+
+
+def test_backoff_honours_retry_after_up_to_the_cap():
+    policy = RetryPolicy(cap=30.0)
+    assert policy.backoff(1, response(429, **{'Retry-After': '7'})) == 7.0
+    assert policy.backoff(1, response(429, **{'Retry-After': '3600'})) == 30.0
+
+
+def elapse(breaker):
+    """Pretend the breaker's cooldown has passed"""
+    breaker.opened_at -= breaker.cooldown
+
+
+def test_breaker_opens_after_threshold_failures_in_a_row():
+    breaker = CircuitBreaker('a.example', threshold=3, cooldown=10)
+    breaker.record(response(503))
+    breaker.record(response(503))
+    breaker.record(response(200))
+    breaker.record(response(503))
+    breaker.record(response(503))
+    assert breaker.state == CLOSED
+    breaker.record(None, requests.Timeout())
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert 9 < breaker.retry_in() <= 10
+    assert (breaker.trips, breaker.rejected) == (1, 1)
+
+
+def test_probe_success_closes_the_breaker():
+    breaker = CircuitBreaker('a.example', threshold=1, cooldown=10)
+    breaker.record(response(429))
+    elapse(breaker)
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+    assert breaker.record(response(200))
+    assert breaker.state == CLOSED and breaker.retry_in() == 0.0
+
+
+def test_probe_failure_doubles_the_cooldown_up_to_the_max():
+    breaker = CircuitBreaker('a.example', threshold=1, cooldown=10, max_cooldown=30)
+    breaker.record(response(403))
+    for expected in (20, 30, 30):
+        elapse(breaker)
+        assert breaker.allow()
+        assert not breaker.record(response(403))
+        assert (breaker.state, breaker.cooldown) == (OPEN, expected)
+    elapse(breaker)
+    breaker.allow()
+    breaker.record(response(200))
+    assert breaker.cooldown == 10
+
+
+def test_breakers_are_per_host():
+    breakers = Breakers(threshold=1)
+    breakers.get('a.example').record(response(503))
+    assert breakers.get('a.example').state == OPEN
+    assert breakers.get('b.example').state == CLOSED
+    assert breakers.get('a.example') is breakers.get('a.example')
+
+
+def flaky(failures, status=503, headers=None):
+    """Page that answers `status` to the first `failures` requests, then 200"""
+    calls = []
+    
+    def page(path):
+        calls.append(path)
+        if len(calls) <= failures:
+            return status, dict(headers or {}), b''
+        return b'ok'
+    return page
+
+
+def engine(**options):
+    return AsyncFetchEngine(requests.Session(), HostRateLimiter(limit_from_delays(0, 0)), **options)
+
+
+def test_engine_retries_transient_failures(stub_server):
+    server = stub_server({'/a': flaky(2, headers={'Retry-After': '0'})})
+    results = []
+    fetcher = engine(retry=RetryPolicy(max_attempts=3))
+    fetcher.fetch_all([(0, server.url + '/a')], lambda job, reply, error: results.append(reply.status_code))
+    assert results == [200]
+    assert sum(fetcher.retried.values()) == 2
+
+
+def test_engine_fails_jobs_held_by_an_open_breaker(stub_server):
+    server = stub_server({f'/{i}': (403, {}, b'') for i in range(4)})
+    outcomes = []
+    breakers = Breakers(threshold=2, cooldown=60)
+    fetcher = engine(max_concurrency=1, breakers=breakers)
+    fetcher.fetch_all([(i, f'{server.url}/{i}') for i in range(4)],
+                      lambda job, reply, error: outcomes.append(type(error) if error else reply.status_code))
+    assert outcomes[:2] == [403, 403]
+    assert outcomes[2:] == [CircuitOpenError, CircuitOpenError]
+    assert server.requests == 2
@@ -0,0 +1,58 @@
+import gzip
+
+import requests
+
+
+def test_serves_pages_and_404s(stub_server):
+    server = stub_server({'/a': b'hello'})
+    assert requests.get(server.url + '/a').content == b'hello'
+    reply = requests.get(server.url + '/missing')
+    assert reply.status_code == 404
+    assert server.requests == 2
+
+
+def test_etag_revalidation_gets_304(stub_server):
+    server = stub_server({'/a': b'hello'})
+    etag = requests.get(server.url + '/a').headers['ETag']
+    reply = requests.get(server.url + '/a', headers={'If-None-Match': etag})
+    assert reply.status_code == 304
+
+
+def test_tuple_page_sets_status_and_headers(stub_server):
+    server = stub_server({'/old': (301, {'Location': '/new'}, b''), '/new': b'moved'})
+    reply = requests.get(server.url + '/old')
+    assert reply.text == 'moved'
+    assert reply.history[0].status_code == 301
+
+
+def test_head_refused_when_disallowed(stub_server):
+    server = stub_server({'/a': b'hello'}, allow_head=False)
+    assert requests.head(server.url + '/a').status_code == 405
+
+
+def test_error_rate_is_repeatable(stub_server):
+    runs = []
+    for _ in range(2):
+        server = stub_server({'/a': b'hello'}, error_rate=0.5, seed=7)
+        runs.append([requests.get(server.url + '/a').status_code for _ in range(20)])
+        assert server.errors == runs[-1].count(503)
+    assert runs[0] == runs[1]
+    assert 503 in runs[0] and 200 in runs[0]
+
+
+def test_keep_alive_reuses_connection(stub_server):
+    server = stub_server({'/a': b'hello'}, keep_alive=True)
+    with requests.Session() as session:
+        for _ in range(5):
+            session.get(server.url + '/a')
+    assert server.connections == 1
+
+
+def test_gzip_only_for_clients_that_accept_it(stub_server):
+    body = b'x' * 5000
+    server = stub_server({'/a': body}, gzip=True)
+    raw = requests.get(server.url + '/a', headers={'Accept-Encoding': 'gzip'}, stream=True).raw
+    assert gzip.decompress(raw.read()) == body
+    reply = requests.get(server.url + '/a', headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in reply.headers
+    assert reply.content == body
@@ -0,0 +1,120 @@
+from urllib.parse import urlsplit
+
+import pytest
+import requests
+
+from transport import (DEFAULT_POOL_SIZE, HostStats, TransportAdapter, accept_encoding,
+                       host_label, install_transport)
+
+BODY = b"<html><body>" + b"<p>Oak Street Dental</p>" * 400 + b"</body></html>"
+
+
+def session_with_transport(**kwargs):
+    session = requests.Session()
+    return session, install_transport(session, **kwargs)
+
+
+def label(server):
+    parts = urlsplit(server.url)
+    return host_label(parts.scheme, parts.hostname, parts.port)
+
+
+def test_accept_encoding_lists_only_decodable_codings():
+    codings = [coding.strip() for coding in accept_encoding().split(',')]
+    assert codings[:2] == ['gzip', 'deflate']
+    assert set(codings) <= {'gzip', 'deflate', 'br', 'zstd'}
+
+
+def test_host_label():
+    assert host_label('https', 'www.manta.com', 443) == 'www.manta.com'
+    assert host_label('http', 'www.manta.com', None) == 'www.manta.com'
+    assert host_label('http', '127.0.0.1', 8080) == '127.0.0.1:8080'
+
+
+def test_host_stats_reuse():
+    stats = HostStats()
+    assert stats.reuse() == 0.0
+    stats.requests, stats.connections = 10, 2
+    assert stats.reuse() == 0.8
+
+
+def test_install_transport():
+    session, adapter = session_with_transport()
+    assert session.get_adapter('https://www.yelp.com/') is adapter
+    assert session.get_adapter('http://www.manta.com/') is adapter
+    assert session.headers['Accept-Encoding'] == accept_encoding()
+
+
+def test_keep_alive_reuses_one_connection(stub_server):
+    server = stub_server({'/': BODY}, keep_alive=True)
+    session, adapter = session_with_transport()
+    for _ in range(5):
+        assert session.get(server.url + '/').content == BODY
+    stats = adapter.stats()[label(server)]
+    assert (stats.requests, stats.connections) == (5, 1)
+    assert stats.reuse() == 0.8
+
+
+def test_wire_and_decoded_bytes(stub_server):
+    server = stub_server({'/': BODY}, gzip=True)
+    session, adapter = session_with_transport()
+    response = session.get(server.url + '/')
+    assert response.content == BODY
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 0 < response.wire_bytes < len(BODY)
+    stats = adapter.stats()[label(server)]
+    assert stats.decoded_bytes == len(BODY)
+    assert stats.wire_bytes == response.wire_bytes
+
+
+def test_streamed_body_is_left_unread(stub_server):
+    # A streamed response is handed back unread and counted as a request only
+    server = stub_server({'/': BODY})
+    session, adapter = session_with_transport()
+    response = session.get(server.url + '/', stream=True)
+    assert not hasattr(response, 'wire_bytes')
+    assert response.raw.read() == BODY
+    stats = adapter.stats()[label(server)]
+    assert (stats.requests, stats.wire_bytes) == (1, 0)
+
+
+def test_size_pools():
+    adapter = TransportAdapter()
+    adapter.size_pools({'www.yelp.com': 8})
+    yelp = adapter.poolmanager.connection_from_url('https://www.yelp.com/')
+    manta = adapter.poolmanager.connection_from_url('https://www.manta.com/')
+    assert yelp.pool.maxsize == 8
+    assert manta.pool.maxsize == DEFAULT_POOL_SIZE
+
+
+def test_evicted_pools_keep_their_counts(stub_server):
+    servers = [stub_server({'/': BODY}, keep_alive=True) for _ in range(3)]
+    session, adapter = session_with_transport(pool_connections=1)
+    for server in servers:
+        session.get(server.url + '/')
+        session.get(server.url + '/')
+    stats = adapter.stats()
+    for server in servers:
+        host = stats[label(server)]
+        assert (host.requests, host.connections) == (2, 1)
+
+
+def test_no_http2_option():
+    # Regression: an HTTP/2 path that was never exercised against an h2 server
+    with pytest.raises(TypeError):
+        TransportAdapter(http2=True)
+
+
+def test_report(stub_server, capsys):
+    server = stub_server({'/': BODY}, keep_alive=True, gzip=True)
+    session, adapter = session_with_transport()
+    session.get(server.url + '/')
+    adapter.report()
+    out = capsys.readouterr().out
+    assert 'HTTP/1.1 keep-alive' in out
+    assert '1 requests over 1 connections' in out
+
+
+def test_report_without_requests_prints_nothing(capsys):
+    TransportAdapter().report()
+    assert capsys.readouterr().out == ""
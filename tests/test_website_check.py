@@ -0,0 +1,127 @@
+import csv
+import socket
+
+import pytest
+
+from website_check import (DEAD, LIVE, PARKED, REDIRECTED, DnsCache, WebsiteChecker, _is_parking_host,
+                           domain_of, normalize_url, verify_csv)
+
+HOME = b'<html><body><h1>Oak Clinic</h1><p>Open Monday to Friday</p></body></html>'
+PARKED_PAGE = b'<html><body>This domain is for sale! Buy this domain today.</body></html>'
+
+
+@pytest.fixture
+def checker():
+    checker = WebsiteChecker(max_concurrency=4, timeout=(2, 2))
+    yield checker
+    checker.session.close()
+
+
+def test_normalize_url_and_domain():
+    assert normalize_url(' www.oak.example ') == 'http://www.oak.example'
+    assert normalize_url('HTTPS://oak.example') == 'HTTPS://oak.example'
+    assert normalize_url('N/A') == normalize_url(None) == ''
+    assert domain_of('https://www.Oak.example:8443/a') == 'oak.example'
+
+
+def test_parking_hosts_match_subdomains_only():
+    assert _is_parking_host('sedoparking.com')
+    assert _is_parking_host('ww1.sedoparking.com')
+    assert not _is_parking_host('notsedoparking.com')
+
+
+def test_labels(stub_server, checker):
+    server = stub_server({'/': HOME, '/parked': PARKED_PAGE, '/gone': (410, {}, b''),
+                          '/moved': (301, {'Location': '/'}, b'')})
+    other = stub_server({'/away': (302, {'Location': server.url.replace('127.0.0.1', 'localhost') + '/'}, b'')})
+    dead = stub_server({})
+    dead_url = dead.url
+    dead.stop()
+    urls = [server.url + '/', server.url + '/parked', server.url + '/gone', server.url + '/moved',
+            other.url + '/away', dead_url + '/']
+    results = checker.check(urls)
+    assert [results[url].label for url in urls] == [LIVE, PARKED, DEAD, LIVE, REDIRECTED, DEAD]
+    assert results[dead_url + '/'].error
+
+
+def test_html_pages_are_sniffed_after_head(stub_server, checker):
+    # Regression: a parking page answering 200 to HEAD on the business's own
+    # domain was called live without its body being read
+    server = stub_server({'/': PARKED_PAGE})
+    assert checker.check_one(server.url + '/').label == PARKED
+    assert checker.requests == {'HEAD': 1, 'GET': 1}
+
+
+def test_non_html_pages_skip_the_get(stub_server, checker):
+    server = stub_server({'/menu.pdf': (200, {'Content-Type': 'application/pdf'}, b'%PDF')})
+    assert checker.check_one(server.url + '/menu.pdf').label == LIVE
+    assert checker.requests == {'HEAD': 1}
+
+
+def test_refused_head_falls_back_to_get(stub_server, checker):
+    server = stub_server({'/': HOME}, allow_head=False)
+    assert checker.check_one(server.url + '/').label == LIVE
+    assert checker.requests == {'HEAD': 1, 'GET': 1}
+
+
+def test_dns_cache_remembers_answers_and_failures():
+    calls = []
+    cache = DnsCache()
+    
+    def resolve(host, port, *args):
+        calls.append(host)
+        if host == 'nowhere.invalid':
+            raise socket.gaierror(socket.EAI_NONAME, 'not found')
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, '', ('127.0.0.1', port))]
+    
+    cache._resolve = resolve
+    for _ in range(2):
+        assert cache.getaddrinfo('oak.example', 80)[0][4] == ('127.0.0.1', 80)
+        with pytest.raises(socket.gaierror):
+            cache.getaddrinfo('nowhere.invalid', 80)
+    assert calls == ['oak.example', 'nowhere.invalid']
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_checker_resolves_through_its_cache_without_patching_socket(stub_server, checker):
+    # Regression: check() swapped socket.getaddrinfo process-wide while it ran
+    original = socket.getaddrinfo
+    patched = []
+    
+    def page(path):
+        patched.append(socket.getaddrinfo is not original)
+        return HOME
+    
+    server = stub_server({'/': page})
+    url = server.url.replace('127.0.0.1', 'localhost') + '/'
+    results = checker.check([url, url + '?again'])
+    assert {status.label for status in results.values()} == {LIVE}
+    assert patched and not any(patched)
+    assert checker.dns.misses == 1
+    assert checker.dns.hits >= 1
+
+
+def test_verify_csv_keeps_extra_columns(stub_server, tmp_path):
+    # Regression: verify_csv rewrote the file with only the standard columns
+    server = stub_server({'/': HOME, '/parked': PARKED_PAGE})
+    path = tmp_path / 'leads.csv'
+    fieldnames = ['business_name', 'website', 'has_website', 'street', 'city', 'zip']
+    rows = [{'business_name': 'Oak Clinic', 'website': server.url + '/', 'has_website': 'Yes',
+             'street': '1 Main St', 'city': 'Springfield', 'zip': '62701'},
+            {'business_name': 'Elm Dental', 'website': server.url + '/parked', 'has_website': 'Yes',
+             'street': '2 Elm St', 'city': 'Peoria', 'zip': '61602'},
+            {'business_name': 'Ash Law', 'website': 'N/A', 'has_website': 'No',
+             'street': '', 'city': '', 'zip': ''}]
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+    counts = verify_csv(str(path))
+    assert counts == {LIVE: 1, PARKED: 1}
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        checked = list(reader)
+    assert reader.fieldnames == fieldnames + ['website_status']
+    assert [(row['website_status'], row['has_website'], row['zip']) for row in checked] == [
+        (LIVE, 'Yes', '62701'), (PARKED, 'No', '61602'), ('', 'No', '')]
+    assert [p.name for p in tmp_path.iterdir()] == ['leads.csv']
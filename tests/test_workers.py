@@ -0,0 +1,133 @@
+import csv
+import time
+
+import pytest
+
+from crawl_ledger import DONE, FAILED, LEASED, MAX_ATTEMPTS, PENDING, CrawlLedger, CrawlUnit
+from lead_sink import CsvLeadSink
+from workers import lease_refill, merge_parts, part_filename, part_files
+
+
+def units(count, source='YellowPages'):
+    return [CrawlUnit(source, 'dentists', 'Illinois', page) for page in range(1, count + 1)]
+
+
+@pytest.fixture
+def ledger_path(tmp_path):
+    path = str(tmp_path / 'ledger.sqlite3')
+    planner = CrawlLedger(path)
+    planner.plan(units(4) + units(2, 'Manta'))
+    planner.close()
+    return path
+
+
+@pytest.fixture
+def worker(ledger_path):
+    opened = []
+    
+    def open_worker(owner, lease=60.0):
+        ledger = CrawlLedger(ledger_path)
+        ledger.owner, ledger.lease = owner, lease
+        opened.append(ledger)
+        return ledger
+    
+    yield open_worker
+    for ledger in opened:
+        ledger.close()
+
+
+def test_workers_never_claim_the_same_unit(worker):
+    a, b = worker('a'), worker('b')
+    first, second = a.claim(3), b.claim(10)
+    assert first == units(3)
+    assert set(first).isdisjoint(second) and len(second) == 3
+    assert a.claim(10) == []
+    assert a.counts()[LEASED] == 6
+    assert a.leased_elsewhere() == 3
+
+
+def test_claim_filters_by_source(worker):
+    assert worker('a').claim(10, sources=['Manta']) == units(2, 'Manta')
+
+
+def test_expired_leases_are_reclaimed(worker):
+    # A worker that stops heartbeating loses its units to the next claim
+    dead, alive = worker('dead', lease=0.05), worker('alive')
+    claimed = dead.claim(2)
+    time.sleep(0.1)
+    reclaimed = alive.claim(10)
+    assert set(claimed) <= set(reclaimed)
+    assert alive.counts() == {PENDING: 0, LEASED: 6, DONE: 0, FAILED: 0}
+
+
+def test_heartbeat_keeps_leases_alive(worker):
+    holder, other = worker('holder', lease=0.2), worker('other')
+    holder.claim(2)
+    for _ in range(3):
+        time.sleep(0.1)
+        assert holder.heartbeat() == 2
+    assert len(other.claim(10)) == 4
+
+
+def test_units_stop_coming_back_after_max_attempts(worker):
+    ledger = worker('a')
+    unit = units(1)[0]
+    for _ in range(MAX_ATTEMPTS):
+        assert unit in ledger.claim(10)
+        ledger.mark_failed(unit, 'HTTP 503')
+        for other in units(4)[1:] + units(2, 'Manta'):
+            ledger.mark_done(other)
+    assert ledger.claim(10) == []
+
+
+def test_release_hands_units_back(worker):
+    a, b = worker('a'), worker('b')
+    a.claim(6)
+    assert a.release() == 6
+    assert len(b.claim(10)) == 6
+
+
+def test_worker_plans_new_units_leased_to_itself(worker):
+    a, b = worker('a'), worker('b')
+    a.plan([CrawlUnit('YellowPages', 'dentists', 'Illinois', 5)])
+    assert a.counts()[LEASED] == 1
+    assert len(b.claim(10)) == 6
+
+
+def test_lease_refill_claims_waits_and_ends(worker):
+    a, b = worker('a'), worker('b')
+    claimed = []
+    refill = lease_refill(a, None, lambda unit: (unit, 'url'), on_claim=claimed.extend, batch=4)
+    assert [job[0] for job in refill(0)] == units(4)
+    assert refill(2) == []
+    assert len(refill(1)) == 2
+    assert len(claimed) == 6
+    b_units = [CrawlUnit('YellowPages', 'dentists', 'Illinois', 9)]
+    b.plan(b_units)
+    # b still holds a lease: keep waiting instead of ending the run
+    assert refill(0) == []
+    b.mark_done(b_units[0])
+    assert refill(1) == []
+    assert refill(0) is None
+
+
+def test_part_files(tmp_path):
+    filename = str(tmp_path / 'leads[1].csv')
+    assert part_filename(filename, 'host-7') == str(tmp_path / 'leads[1].worker-host-7.csv')
+    for worker_id in ('b', 'a'):
+        open(part_filename(filename, worker_id), 'w').close()
+    assert part_files(filename) == [part_filename(filename, 'a'), part_filename(filename, 'b')]
+
+
+def test_merge_parts_deduplicates_across_workers(tmp_path):
+    filename = str(tmp_path / 'leads.csv')
+    lead = {'source': 'Yelp', 'business_name': 'Oak', 'phone': '1', 'address': '', 'has_website': 'No',
+            'website': 'N/A', 'category': 'dentists', 'state': 'Illinois'}
+    for worker_id, names in (('a', ['Oak', 'Elm']), ('b', ['Oak', 'Ash'])):
+        with CsvLeadSink(part_filename(filename, worker_id)) as sink:
+            for name in names:
+                sink.add(dict(lead, business_name=name))
+    sink = merge_parts(filename)
+    assert sink.total == 3
+    with open(filename, newline='', encoding='utf-8') as f:
+        assert [row['business_name'] for row in csv.DictReader(f)] == ['Oak', 'Elm', 'Ash']
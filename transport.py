@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Pooled HTTP transport
+One TransportAdapter is mounted on a scraper's session and carries every
+request it makes: a keep-alive connection pool per host, sized to the
+number of requests the fetch engine sends that host at once (a pool smaller
+than that opens, and throws away, a fresh connection for every request that
+overflows it), kept open across categories, cities and pages. The session
+advertises only the content encodings urllib3 can decode here (gzip and
+deflate, plus br or zstd when brotli or zstandard is installed), so a
+directory never answers in an encoding we would hand on undecoded.
+
+Per host it reports requests, connections opened, and body bytes on the
+wire against bytes after decoding.
+"""
+
+import threading
+from urllib.parse import urlsplit
+
+import urllib3
+from requests.adapters import HTTPAdapter
+
+# Connections kept per host unless size_pools() gives it its own size
+DEFAULT_POOL_SIZE = 10
+# Hosts whose pools stay open at once: the directories, plus redirect
+# targets and detail-page hosts
+POOL_HOSTS = 32
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def accept_encoding():
+    """Accept-Encoding value listing only the codings urllib3 can decode in this install"""
+    return urllib3.util.make_headers(accept_encoding=True)['accept-encoding']
+
+
+def host_label(scheme, host, port):
+    """'www.manta.com', or 'host:port' for a non-default port"""
+    if port is None or port == DEFAULT_PORTS.get(scheme):
+        return host
+    return f"{host}:{port}"
+
+
+def _label_of(url):
+    parts = urlsplit(url)
+    return host_label(parts.scheme, parts.hostname, parts.port)
+
+
+class HostStats:
+    """Requests, connections and body bytes (on the wire and decoded) for one host"""
+
+    __slots__ = ('requests', 'connections', 'wire_bytes', 'decoded_bytes')
+
+    def __init__(self):
+        self.requests = 0
+        self.connections = 0
+        self.wire_bytes = 0
+        self.decoded_bytes = 0
+
+    def reuse(self):
+        """Share of requests sent over an already-open connection"""
+        if not self.requests:
+            return 0.0
+        return max(self.requests - self.connections, 0) / self.requests
+
+
+class _SizedPoolManager(urllib3.PoolManager):
+    """PoolManager giving each host its own pool size and remembering closed pools' counts"""
+
+    def __init__(self, sizes, retired, **kwargs):
+        super().__init__(**kwargs)
+        self.sizes = sizes
+        self.retired = retired
+        self.pools.dispose_func = self._retire
+
+    def _new_pool(self, scheme, host, port, request_context=None):
+        size = self.sizes.get(host_label(scheme, host, port))
+        if size is not None:
+            request_context = dict(request_context or self.connection_pool_kw)
+            request_context['maxsize'] = size
+        return super()._new_pool(scheme, host, port, request_context=request_context)
+
+    def _retire(self, pool):
+        # An evicted pool takes its counters with it
+        stats = self.retired.setdefault(host_label(pool.scheme, pool.host, pool.port),
+                                        HostStats())
+        stats.requests += pool.num_requests
+        stats.connections += pool.num_connections
+        pool.close()
+
+
+class TransportAdapter(HTTPAdapter):
+    """HTTPAdapter with per-host pool sizes and wire/decoded byte counts
+
+    Bodies of responses that are not streamed are read here, so their
+    size on the wire is known; a streamed body is counted as a request only.
+    """
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, **kwargs):
+        self.pool_sizes = {}
+        self._retired = {}
+        self._bytes = {}
+        self._lock = threading.Lock()
+        kwargs.setdefault('pool_connections', POOL_HOSTS)
+        kwargs.setdefault('pool_maxsize', pool_size)
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+        self.poolmanager = _SizedPoolManager(self.pool_sizes, self._retired, num_pools=connections,
+                                             maxsize=maxsize, block=block, **pool_kwargs)
+
+    def size_pools(self, sizes):
+        """Set the pool size of some hosts, {'www.yelp.com': 8}; applies to pools opened later"""
+        self.pool_sizes.update(sizes)
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        response = super().send(request, stream=stream, timeout=timeout, verify=verify,
+                                cert=cert, proxies=proxies)
+        if stream:
+            return response
+        # Read the body now, so its size on the wire is known
+        response.content
+        response.wire_bytes = response.raw.tell()
+        self._count_bytes(request.url, response.wire_bytes, len(response.content))
+        return response
+
+    def _count_bytes(self, url, wire, decoded):
+        with self._lock:
+            stats = self._bytes.setdefault(_label_of(url), HostStats())
+            stats.wire_bytes += wire
+            stats.decoded_bytes += decoded
+
+    def stats(self):
+        """{host: HostStats} over everything sent so far"""
+        result = {}
+
+        def add(label, sent, opened):
+            stats = result.setdefault(label, HostStats())
+            stats.requests += sent
+            stats.connections += opened
+
+        with self._lock:
+            for label, stats in self._retired.items():
+                add(label, stats.requests, stats.connections)
+            for key in self.poolmanager.pools.keys():
+                pool = self.poolmanager.pools.get(key)
+                if pool is not None:
+                    add(host_label(pool.scheme, pool.host, pool.port), pool.num_requests,
+                        pool.num_connections)
+            for label, stats in self._bytes.items():
+                result.setdefault(label, HostStats())
+                result[label].wire_bytes += stats.wire_bytes
+                result[label].decoded_bytes += stats.decoded_bytes
+        return result
+
+    def report(self):
+        stats = self.stats()
+        if not stats:
+            return
+        print(f"\n🔌 Transport (HTTP/1.1 keep-alive, Accept-Encoding: {accept_encoding()}):")
+        for label, host in sorted(stats.items()):
+            parts = [f"{host.requests} requests over {host.connections} connections "
+                     f"({host.reuse():.0%} reused)"]
+            if host.decoded_bytes:
+                parts.append(f"{host.wire_bytes / 1024:.0f} KB on the wire for "
+                             f"{host.decoded_bytes / 1024:.0f} KB decoded "
+                             f"({host.wire_bytes / host.decoded_bytes:.0%})")
+            print(f"   {label}: " + " | ".join(parts))
+
+
+def install_transport(session, **kwargs):
+    """Mount a TransportAdapter for http:// and https:// on session and set its Accept-Encoding"""
+    adapter = TransportAdapter(**kwargs)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['Accept-Encoding'] = accept_encoding()
+    return adapter
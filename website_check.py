@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Concurrent website verification
+Checks each lead's website with a HEAD request (then a GET when HEAD is
+refused or fails, or to sniff an HTML page for parking text), many sites at once over one shared connection pool and
+DNS cache, at most a few requests per domain, with short timeouts. Each site
+is labelled live, dead, redirected or parked, and has_website follows the
+label, so the "no website" prospect list reflects what is actually online.
+
+    python website_check.py illinois_leads_20241104_143022.csv [-o checked.csv]
+"""
+
+import argparse
+import asyncio
+import csv
+import functools
+import re
+import socket
+import threading
+import time
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+
+from fetch_engine import host_of
+from lead_sink import FIELDNAMES, replace_file
+
+LIVE = 'live'
+DEAD = 'dead'
+REDIRECTED = 'redirected'
+PARKED = 'parked'
+
+# Domain parking / for-sale services a dead business site often redirects to
+PARKING_HOSTS = (
+    'sedoparking.com', 'parkingcrew.net', 'bodis.com', 'hugedomains.com', 'afternic.com',
+    'dan.com', 'above.com', 'parklogic.com', 'domainmarket.com', 'undeveloped.com',
+)
+PARKED_RE = re.compile(
+    rb'this domain (?:name )?(?:is|may be) for sale|buy this domain|domain (?:is )?parked'
+    rb'|parked (?:free|domain)|this domain has expired', re.I)
+# Bytes of a GET body sniffed for parking-page text
+SNIFF_BYTES = 32 * 1024
+# Answers that prove a server is there even though it would not serve us
+BLOCKED_STATUSES = (401, 403, 429)
+
+WebsiteStatus = namedtuple('WebsiteStatus', ['label', 'status_code', 'final_url', 'error'])
+
+
+def normalize_url(url):
+    """'www.example.com' -> 'http://www.example.com'; '' for missing values"""
+    url = (url or "").strip()
+    if not url or url in ("N/A", "Unknown"):
+        return ""
+    if not re.match(r'^https?://', url, re.I):
+        url = "http://" + url
+    return url
+
+
+def domain_of(url):
+    """Host without port or a leading www."""
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def _is_parking_host(host):
+    return any(host == parked or host.endswith("." + parked) for parked in PARKING_HOSTS)
+
+
+class DnsCache:
+    """Memoizing getaddrinfo (failures included) for the checker's own connections"""
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._resolve = socket.getaddrinfo
+
+    def getaddrinfo(self, host, port, *args, **kwargs):
+        key = (host, port, args, tuple(sorted(kwargs.items())))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                result, error = entry[1], entry[2]
+                if error is not None:
+                    raise error
+                return result
+            self.misses += 1
+        try:
+            result = self._resolve(host, port, *args, **kwargs)
+        except socket.gaierror as e:
+            with self._lock:
+                self._entries[key] = (now + self.ttl, None, e)
+            raise
+        with self._lock:
+            self._entries[key] = (now + self.ttl, result, None)
+        return result
+
+
+class _ResolvingConnection:
+    """urllib3 connection that looks its host up in a DnsCache, then connects to each address
+
+    Only the checker's connections use the cache: socket.getaddrinfo is
+    left alone for every other thread in the process.
+    """
+
+    def __init__(self, *args, dns_cache, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.dns_cache = dns_cache
+
+    def _new_conn(self):
+        host = self._dns_host
+        try:
+            addresses = self.dns_cache.getaddrinfo(host.strip('[]'), self.port,
+                                                   allowed_gai_family(), socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            raise NewConnectionError(self, f"Failed to resolve {host}: {e}")
+        error = None
+        try:
+            for *_, sockaddr in addresses:
+                # A literal address: urllib3 connects without another lookup
+                self._dns_host = sockaddr[0]
+                try:
+                    return super()._new_conn()
+                except (NewConnectionError, ConnectTimeoutError) as e:
+                    error = e
+        finally:
+            self._dns_host = host
+        raise error or NewConnectionError(self, f"No addresses for {host}")
+
+
+class _ResolvingHTTPConnection(_ResolvingConnection, HTTPConnection):
+    pass
+
+
+class _ResolvingHTTPSConnection(_ResolvingConnection, HTTPSConnection):
+    pass
+
+
+class _ResolvingHTTPPool(HTTPConnectionPool):
+    ConnectionCls = _ResolvingHTTPConnection
+
+
+class _ResolvingHTTPSPool(HTTPSConnectionPool):
+    ConnectionCls = _ResolvingHTTPSConnection
+
+
+class ResolvingAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections resolve hosts through a DnsCache"""
+
+    def __init__(self, dns_cache, **kwargs):
+        self.dns_cache = dns_cache
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        # Bound here rather than in the pool kwargs, which urllib3 turns into pool keys
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': functools.partial(_ResolvingHTTPPool, dns_cache=self.dns_cache),
+            'https': functools.partial(_ResolvingHTTPSPool, dns_cache=self.dns_cache),
+        }
+
+
+class WebsiteChecker:
+    """Check many websites concurrently; labels each as live/dead/redirected/parked"""
+
+    def __init__(self, max_concurrency=16, per_domain=2, timeout=(3, 5), user_agent=None):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.per_domain = max(1, int(per_domain))
+        self.timeout = timeout
+        self.dns = DnsCache()
+        # One pool shared by every check; sized so no worker waits for a socket
+        self.session = requests.Session()
+        adapter = ResolvingAdapter(self.dns, pool_connections=self.max_concurrency,
+                                   pool_maxsize=self.max_concurrency, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        if user_agent:
+            self.session.headers['User-Agent'] = user_agent
+        self.requests = Counter()
+
+    def _classify(self, url, response, body=b""):
+        final_url = response.url or url
+        final_host = (urlparse(final_url).hostname or "").lower()
+        status = response.status_code
+        if _is_parking_host(final_host) or PARKED_RE.search(body):
+            label = PARKED
+        elif status >= 400 and status not in BLOCKED_STATUSES:
+            label = DEAD
+        elif domain_of(final_url) != domain_of(url):
+            label = REDIRECTED
+        else:
+            label = LIVE
+        return WebsiteStatus(label, status, final_url, None)
+
+    def _get(self, url):
+        self.requests['GET'] += 1
+        with self.session.get(url, timeout=self.timeout, allow_redirects=True, stream=True) as response:
+            body = b""
+            for chunk in response.iter_content(8192):
+                body += chunk
+                if len(body) >= SNIFF_BYTES:
+                    break
+            return response, body
+
+    def check_one(self, url):
+        """HEAD, then GET when HEAD is refused or fails or an HTML page needs sniffing (blocking)
+
+        A parking page usually answers 200 on the business's own domain, so
+        a HEAD alone would call it live: an HTML answer is confirmed by
+        reading the start of its body.
+        """
+        try:
+            self.requests['HEAD'] += 1
+            response = self.session.head(url, timeout=self.timeout, allow_redirects=True)
+            if response.status_code < 400:
+                result = self._classify(url, response)
+                content_type = response.headers.get('Content-Type', "").lower()
+                if result.label == PARKED or (content_type and 'html' not in content_type):
+                    return result
+        except requests.exceptions.ConnectionError as e:
+            # DNS failure or refused connection: GET would fail the same way
+            return WebsiteStatus(DEAD, None, url, str(e)[:200])
+        except requests.RequestException:
+            pass
+        try:
+            response, body = self._get(url)
+        except requests.RequestException as e:
+            return WebsiteStatus(DEAD, None, url, str(e)[:200])
+        return self._classify(url, response, body)
+
+    async def _check_all(self, urls, on_result):
+        loop = asyncio.get_event_loop()
+        domains = {}
+        results = {}
+
+        async def check(url):
+            limit = domains.setdefault(host_of(url), asyncio.Semaphore(self.per_domain))
+            async with limit:
+                result = await loop.run_in_executor(executor, functools.partial(self.check_one, url))
+            results[url] = result
+            if on_result is not None:
+                on_result(url, result)
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            await asyncio.gather(*(check(url) for url in urls))
+        return results
+
+    def check(self, urls, on_result=None):
+        """{url: WebsiteStatus} for every distinct URL; on_result(url, status) as each finishes"""
+        urls = list(dict.fromkeys(url for url in urls if url))
+        return asyncio.run(self._check_all(urls, on_result))
+
+
+def verify_leads(leads, checker=None, progress=True):
+    """Check every lead's website in place; returns {label: count}
+
+    Adds a 'website_status' field and sets has_website to Yes for live and
+    redirected sites and No for dead and parked ones.
+    """
+    checker = checker or WebsiteChecker()
+    urls = {id(lead): normalize_url(lead.get('website')) for lead in leads}
+    total = len({url for url in urls.values() if url})
+    done = [0]
+
+    def on_result(url, status):
+        done[0] += 1
+        if progress and (done[0] % 25 == 0 or done[0] == total):
+            print(f"   checked {done[0]}/{total} websites")
+
+    started = time.perf_counter()
+    results = checker.check(urls.values(), on_result)
+    counts = Counter()
+    for lead in leads:
+        url = urls[id(lead)]
+        if not url:
+            lead['website_status'] = ""
+            continue
+        label = results[url].label
+        lead['website_status'] = label
+        lead['has_website'] = "Yes" if label in (LIVE, REDIRECTED) else "No"
+        counts[label] += 1
+    if progress:
+        print(f"\n🌐 Checked {total} websites in {time.perf_counter() - started:.1f}s "
+              f"({checker.requests['HEAD']} HEAD, {checker.requests['GET']} GET, "
+              f"DNS cache {checker.dns.hits} hits / {checker.dns.misses} lookups): "
+              + " | ".join(f"{label} {counts[label]}" for label in (LIVE, REDIRECTED, PARKED, DEAD)))
+    return counts
+
+
+def verify_csv(input_file, output_file=None, **checker_options):
+    """Verify websites in a lead CSV (in place by default); returns {label: count}"""
+    with open(input_file, newline='', encoding='utf-8') as csvfile:
+        reader = csv.DictReader(csvfile)
+        leads = list(reader)
+        # Keep every column the file already has (address columns and the like)
+        fieldnames = list(reader.fieldnames or FIELDNAMES)
+    if 'website_status' not in fieldnames:
+        fieldnames.append('website_status')
+    counts = verify_leads(leads, WebsiteChecker(**checker_options))
+    with replace_file(output_file or input_file) as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(leads)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check which lead websites are actually online")
+    parser.add_argument('input')
+    parser.add_argument('-o', '--output', help="output CSV (default: overwrite input)")
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--per-domain', type=int, default=2)
+    args = parser.parse_args()
+    verify_csv(args.input, args.output, max_concurrency=args.concurrency,
+               per_domain=args.per_domain)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Multi-worker crawls over a shared ledger
+One process plans the crawl into the ledger; any number of workers then
+claim units from it under leases (see CrawlLedger.join), share each host's
+rate limit through the same file (SharedRateLimiter), and write their leads
+to their own part CSV. When every worker has finished, the parts are merged
+into the run's output file.
+"""
+
+import csv
+import glob
+import os
+import socket
+import subprocess
+import sys
+
+from lead_sink import CsvLeadSink
+
+# Units a worker keeps claimed at once, topped up when half are done
+CLAIM_BATCH = 16
+
+
+def default_worker_id():
+    """'<hostname>-<pid>', unique among the workers of one machine"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def part_filename(filename, worker):
+    """illinois_leads_X.csv -> illinois_leads_X.worker-<worker>.csv"""
+    stem, extension = os.path.splitext(filename)
+    return f"{stem}.worker-{worker}{extension}"
+
+
+def part_files(filename):
+    stem, extension = os.path.splitext(filename)
+    return sorted(glob.glob(f"{glob.escape(stem)}.worker-*{extension}"))
+
+
+def lease_refill(ledger, sources, make_job, on_claim=None, batch=CLAIM_BATCH):
+    """AsyncFetchEngine refill that claims ledger units for this worker
+
+    Claims more once fewer than half a batch are outstanding. With nothing
+    left to claim it keeps the engine waiting while other workers still hold
+    leases (they may fail, or die and let their leases expire), and ends the
+    run once they hold none.
+    """
+    def refill(outstanding):
+        if outstanding >= batch // 2:
+            return []
+        units = ledger.claim(batch - outstanding, sources)
+        if units:
+            if on_claim is not None:
+                on_claim(units)
+            return [make_job(unit) for unit in units]
+        if outstanding or ledger.leased_elsewhere():
+            return []
+        return None
+    return refill
+
+
+def spawn_workers(count, argv):
+    """Start count copies of this script with argv (plus --join); returns the processes"""
+    command = [sys.executable, os.path.abspath(sys.argv[0]), '--join'] + list(argv)
+    return [subprocess.Popen(command) for _ in range(count)]
+
+
+def wait_for(processes):
+    """Wait for every worker; returns how many exited with an error"""
+    try:
+        return sum(1 for process in processes if process.wait() != 0)
+    except KeyboardInterrupt:
+        # Workers got the same Ctrl-C; let them hand their leases back
+        for process in processes:
+            process.wait()
+        raise
+
+
+def merge_parts(filename):
+    """Append every worker's part CSV into filename (deduplicated); returns the closed sink"""
+    parts = part_files(filename)
+    with CsvLeadSink(filename) as sink:
+        before = sink.total
+        for part in parts:
+            with open(part, newline='', encoding='utf-8') as csvfile:
+                for lead in csv.DictReader(csvfile):
+                    sink.add(lead)
+        added = sink.total - before
+    print(f"\n🧩 Merged {len(parts)} worker files into {filename}: {added} new leads")
+    return sink